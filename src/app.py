@@ -1,14 +1,23 @@
 from __future__ import annotations
 
 import asyncio
+
 import streamlit as st
+
+from pension_planning_agent.http_client import http_client_lifespan
+from pension_planning_agent.metrics import start_metrics_server
 from pension_planning_agent.streamlit import (
     display_message_part,
+    render_what_if_panel,
     run_agent,
 )
+from settings import settings
 
 
 async def main():
+    if settings.METRICS_ENABLED:
+        start_metrics_server()
+
     st.title("🔥 FIRE Agent")
     st.write(
         """
@@ -41,8 +50,10 @@ async def main():
     for msg in st.session_state.messages:
         display_message_part(msg)
 
-    # Chat input for the user
-    user_input = st.chat_input("Please write here.")
+    # Chat input for the user, or a scenario sent from the what-if panel
+    user_input = st.chat_input("Please write here.") or st.session_state.pop(
+        "pending_prompt", None
+    )
 
     if user_input:
         # Append user message to session state
@@ -54,9 +65,14 @@ async def main():
 
         # Display the assistant's response
         with st.chat_message("assistant"):
-            # Run the agent (now async)
-            await run_agent(user_input)
+            # Every rerun has its own event loop, so the turn's pooled client
+            # is closed with it instead of being left open
+            async with http_client_lifespan():
+                await run_agent(user_input)
 
 
 if __name__ == "__main__":
     asyncio.run(main())
+    # After the chat's event loop, since the panel runs its own
+    with st.sidebar:
+        render_what_if_panel()
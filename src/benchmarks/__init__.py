@@ -0,0 +1 @@
+"""Benchmarks for the FIRE Pension Planning Agent (run from the `src` directory)."""
@@ -0,0 +1,254 @@
+"""
+End-to-end latency and throughput of the agent against local fake services.
+
+Starts the fakes from `benchmarks.fakes`, points the agent at them and
+measures:
+
+- `fire_calculator`: latency per call and calls per second
+- `runner`: latency per conversation turn (user message to final reply),
+  `fire_calculator` latency inside the turn, and sessions per second
+
+Results are written as JSON to `benchmark_results/e2e-<commit>.json`, so runs
+on different commits can be compared. Run from the `src` directory:
+
+    python -m benchmarks.e2e --sessions 50 --concurrency 10
+    python -m benchmarks.e2e --compare benchmark_results/e2e-abc1234.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from pathlib import Path
+
+from loguru import logger
+
+from benchmarks.fakes import (
+    SCRIPTED_INPUTS,
+    FakeConfig,
+    FakeServices,
+    prepare_offline_litellm,
+)
+from benchmarks.report import compare_results, latency_summary, write_results
+from settings import settings
+
+USER_MESSAGE = (
+    "Jeg hedder Carina, er 44 år. Min bruttoløn plus min arbejdsgiverpension er "
+    "45.000 kr. om måneden. Jeg kan godt leve med 22.000 kr. om måneden og vil "
+    "gerne kunne stoppe som 60 årig."
+)
+
+
+def use_fake_services(services: FakeServices, cache: bool) -> None:
+    """
+    Point the agent and calculator at the fakes; call before the runner is built.
+
+    Args:
+        services: Running fake services
+        cache: Keep the projection cache enabled
+    """
+    prepare_offline_litellm()
+    os.environ.setdefault("LOGFIRE_CONSOLE", "false")
+    settings.OPEN_ROUTER_API_BASE = services.llm_base_url
+    settings.OPEN_ROUTER_API_KEY = "fake-key"
+    settings.BUSINESSLOGIC_URL = services.execute_url
+    settings.FIRE_BACKEND = "remote"
+    settings.FIRE_CACHE_ENABLED = cache
+
+
+async def bench_fire_calculator(calls: int, concurrency: int) -> dict:
+    """
+    Call `fire_calculator` directly, `concurrency` calls at a time.
+
+    Args:
+        calls: Total number of calls
+        concurrency: Calls in flight at once
+
+    Returns:
+        dict: Latency summary and calls per second
+    """
+    from pension_planning_agent.agent import fire_calculator
+
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: list[float] = []
+
+    async def call() -> None:
+        async with semaphore:
+            started = time.perf_counter()
+            await fire_calculator(**SCRIPTED_INPUTS)
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(call() for _ in range(calls)))
+    elapsed = time.perf_counter() - started
+    return {
+        "latency": latency_summary(latencies),
+        "calls_per_second": calls / elapsed,
+    }
+
+
+async def run_turn(user_id: str, session_id: str, text: str) -> dict:
+    """
+    Run one conversation turn through the runner.
+
+    Args:
+        user_id: ADK user ID
+        session_id: ADK session ID
+        text: User message
+
+    Returns:
+        dict: Turn latency, tool latencies in seconds and the reply text
+    """
+    from google.genai import types
+
+    from pension_planning_agent.agent import get_runner
+
+    started = time.perf_counter()
+    tool_started: dict[str, float] = {}
+    tool_latencies: list[float] = []
+    reply = ""
+    async for event in get_runner().run_async(
+        user_id=user_id,
+        session_id=session_id,
+        new_message=types.Content(role="user", parts=[types.Part(text=text)]),
+    ):
+        for call in event.get_function_calls():
+            tool_started[call.id] = time.perf_counter()
+        for response in event.get_function_responses():
+            if response.id in tool_started:
+                tool_latencies.append(
+                    time.perf_counter() - tool_started.pop(response.id)
+                )
+        if event.content and event.content.parts and not event.partial:
+            reply += "".join(part.text or "" for part in event.content.parts)
+
+    return {
+        "latency": time.perf_counter() - started,
+        "tool_latencies": tool_latencies,
+        "reply": reply,
+    }
+
+
+async def bench_runner(sessions: int, concurrency: int, turns: int) -> dict:
+    """
+    Run `sessions` conversations of `turns` turns, `concurrency` at a time.
+
+    Args:
+        sessions: Number of conversations
+        concurrency: Conversations in flight at once
+        turns: Turns per conversation
+
+    Returns:
+        dict: Turn and tool latency summaries, sessions per second and errors
+    """
+    from pension_planning_agent.agent import APP_NAME, get_session_service
+
+    semaphore = asyncio.Semaphore(concurrency)
+    turn_latencies: list[float] = []
+    tool_latencies: list[float] = []
+    errors: list[str] = []
+
+    async def conversation(index: int) -> None:
+        async with semaphore:
+            user_id, session_id = f"user-{index}", f"session-{index}"
+            await get_session_service().create_session(
+                app_name=APP_NAME, user_id=user_id, session_id=session_id
+            )
+            for _ in range(turns):
+                try:
+                    turn = await run_turn(user_id, session_id, USER_MESSAGE)
+                except Exception as e:
+                    errors.append(f"{type(e).__name__}: {e}")
+                    return
+                turn_latencies.append(turn["latency"])
+                tool_latencies.extend(turn["tool_latencies"])
+
+    started = time.perf_counter()
+    await asyncio.gather(*(conversation(i) for i in range(sessions)))
+    elapsed = time.perf_counter() - started
+    return {
+        "turn_latency": latency_summary(turn_latencies),
+        "tool_latency": latency_summary(tool_latencies),
+        "sessions_per_second": (sessions - len(errors)) / elapsed,
+        "errors": len(errors),
+        "error_samples": errors[:5],
+    }
+
+
+async def run(args: argparse.Namespace) -> dict:
+    """Run both benchmarks against fresh fake services."""
+    config = FakeConfig(llm_delay=args.llm_delay, execute_delay=args.execute_delay)
+    with FakeServices(config) as services:
+        use_fake_services(services, cache=args.cache)
+        # Build the runner (and import the agent framework) before timing
+        from pension_planning_agent.agent import get_runner
+
+        get_runner()
+        results = {
+            "config": {
+                "sessions": args.sessions,
+                "concurrency": args.concurrency,
+                "turns": args.turns,
+                "calls": args.calls,
+                "llm_delay_s": args.llm_delay,
+                "execute_delay_s": args.execute_delay,
+                "cache": args.cache,
+                "session_backend": settings.SESSION_BACKEND,
+            },
+            "fire_calculator": await bench_fire_calculator(
+                args.calls, args.concurrency
+            ),
+            "runner": await bench_runner(args.sessions, args.concurrency, args.turns),
+        }
+        results["fake_requests"] = {
+            "chat": services.stats.chat_requests,
+            "execute": services.stats.execute_requests,
+        }
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sessions", type=int, default=50)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--turns", type=int, default=1, help="Turns per session")
+    parser.add_argument("--calls", type=int, default=200, help="fire_calculator calls")
+    parser.add_argument("--llm-delay", type=float, default=0.05, help="Seconds")
+    parser.add_argument("--execute-delay", type=float, default=0.02, help="Seconds")
+    parser.add_argument("--cache", action="store_true", help="Use projection cache")
+    parser.add_argument("--output", type=Path, default=None)
+    parser.add_argument("--compare", type=Path, default=None, help="Baseline JSON")
+    args = parser.parse_args()
+
+    logger.remove()
+    logger.add(sys.stderr, level="WARNING")
+    baseline = json.loads(args.compare.read_text()) if args.compare else None
+    results = asyncio.run(run(args))
+    path = write_results("e2e", results, args.output)
+
+    runner = results["runner"]
+    calculator = results["fire_calculator"]
+    print(f"Results written to {path}")
+    print(
+        f"runner: turn p50/p95/p99 {runner['turn_latency'].get('p50_ms', 0):.0f}/"
+        f"{runner['turn_latency'].get('p95_ms', 0):.0f}/"
+        f"{runner['turn_latency'].get('p99_ms', 0):.0f} ms, "
+        f"{runner['sessions_per_second']:.1f} sessions/s, {runner['errors']} errors"
+    )
+    print(
+        f"fire_calculator: p50/p95/p99 {calculator['latency']['p50_ms']:.1f}/"
+        f"{calculator['latency']['p95_ms']:.1f}/"
+        f"{calculator['latency']['p99_ms']:.1f} ms, "
+        f"{calculator['calls_per_second']:.0f} calls/s"
+    )
+    if baseline:
+        print(f"\n{'metric':<45}{'baseline':>12}{'current':>12}{'change':>10}")
+        print("\n".join(compare_results(baseline, json.loads(path.read_text()))))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,263 @@
+"""
+Local stand-ins for OpenRouter and the BusinessLogic API.
+
+`FakeServices` starts one threaded HTTP server on localhost that speaks just
+enough of both protocols for the agent to run a full turn offline:
+
+- `POST /api/v1/chat/completions`: the OpenAI-compatible chat API that LiteLLM
+  targets for `openrouter/...` models. The first user messages of a
+  conversation are answered with the configured questions, the next one with a
+  `fire_calculator` tool call, and a tool result with a short text reply.
+  Streaming (`"stream": true`) responses are sent as SSE chunks. Requests
+  with a JSON schema `response_format` (slot extraction) are answered with the
+  `name=value` pairs of the latest user message.
+- `POST /execute`: the BusinessLogic calculation, answered with the local
+  projection engine.
+
+Both endpoints wait a configurable delay before answering, to emulate upstream
+latency.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import re
+import threading
+import time
+import uuid
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from pension_planning_agent import engine
+
+# Profile sent in every scripted tool call (the inputs of `agent.main()`)
+SCRIPTED_INPUTS = {
+    "manedslon": 75700,
+    "alder": 52,
+    "pensionInd_ar": 85000,
+    "skat_percentage": 33,
+    "forbrugsmal_md": 34100,
+    "frie_midler": 935000,
+    "holding_midler": 0,
+    "rate_and_liv": 4190000,
+    "fire_alder": 62,
+}
+
+
+def prepare_offline_litellm() -> None:
+    """
+    Keep LiteLLM from downloading its model cost map and tokenizer.
+
+    Must be called before LiteLLM is first used.
+    """
+    os.environ.setdefault("LITELLM_LOCAL_MODEL_COST_MAP", "True")
+    import litellm
+
+    # Points tiktoken at the tokenizer files bundled with LiteLLM
+    import litellm.litellm_core_utils.default_encoding  # noqa: F401
+
+    litellm.suppress_debug_info = True
+
+
+@dataclass
+class FakeConfig:
+    """Behaviour of the fake services."""
+
+    llm_delay: float = 0.05  # Seconds before each chat completion
+    execute_delay: float = 0.02  # Seconds before each /execute response
+    stream_chunks: int = 5  # Chunks per streamed text reply
+    reply: str = "Din plan giver et positivt resultat ved 95 år."
+    # Asked in turn before the tool is called, e.g. the system prompt's flow
+    questions: tuple[str, ...] = ()
+
+
+@dataclass
+class FakeStats:
+    """Requests served by the fake services."""
+
+    chat_requests: int = 0
+    extraction_requests: int = 0  # Of the chat requests, structured extractions
+    execute_requests: int = 0
+    lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def count(self, name: str) -> None:
+        with self.lock:
+            setattr(self, name, getattr(self, name) + 1)
+
+
+def _completion_message(messages: list[dict], config: FakeConfig) -> dict:
+    """Scripted assistant message: ask the questions, call the tool, then reply."""
+    if messages and messages[-1].get("role") == "tool":
+        return {"role": "assistant", "content": config.reply}
+    user_messages = sum(1 for message in messages if message.get("role") == "user")
+    if user_messages <= len(config.questions):
+        return {"role": "assistant", "content": config.questions[user_messages - 1]}
+    return {
+        "role": "assistant",
+        "content": None,
+        "tool_calls": [
+            {
+                "id": f"call_{uuid.uuid4().hex[:12]}",
+                "type": "function",
+                "function": {
+                    "name": "fire_calculator",
+                    "arguments": json.dumps(SCRIPTED_INPUTS),
+                },
+            }
+        ],
+    }
+
+
+def _extraction_message(messages: list[dict], response_format: dict) -> dict:
+    """Structured extraction: the schema's fields given as `name=value`."""
+    properties = response_format["json_schema"]["schema"]["properties"]
+    text = messages[-1].get("content") or ""
+    values = dict.fromkeys(properties)
+    for name, value in re.findall(r"(\w+)\s*[=:]\s*(-?\d+(?:\.\d+)?)", text):
+        if name in values:
+            values[name] = float(value)
+    return {"role": "assistant", "content": json.dumps(values)}
+
+
+def _usage(messages: list[dict]) -> dict:
+    """Token usage estimated at four characters per token."""
+    prompt = len(json.dumps(messages)) // 4
+    return {
+        "prompt_tokens": prompt,
+        "completion_tokens": 20,
+        "total_tokens": prompt + 20,
+    }
+
+
+class _Handler(BaseHTTPRequestHandler):
+    """Request handler; `server.config` and `server.stats` are set by FakeServices."""
+
+    protocol_version = "HTTP/1.1"
+    # Headers and body are written separately; avoid delayed-ACK stalls
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args) -> None:
+        pass
+
+    def _send_json(self, payload: dict) -> None:
+        body = json.dumps(payload).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self) -> None:
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        config: FakeConfig = self.server.config
+        stats: FakeStats = self.server.stats
+
+        if self.path.endswith("/chat/completions"):
+            stats.count("chat_requests")
+            if body.get("response_format"):
+                stats.count("extraction_requests")
+            time.sleep(config.llm_delay)
+            self._chat_completion(body, config)
+        elif self.path == "/execute":
+            stats.count("execute_requests")
+            time.sleep(config.execute_delay)
+            self._send_json(engine.project(body))
+        else:
+            self.send_error(404)
+
+    def _chat_completion(self, body: dict, config: FakeConfig) -> None:
+        messages = body.get("messages", [])
+        if body.get("response_format"):
+            message = _extraction_message(messages, body["response_format"])
+        else:
+            message = _completion_message(messages, config)
+        finish_reason = "tool_calls" if message.get("tool_calls") else "stop"
+        common = {
+            "id": f"chatcmpl-{uuid.uuid4().hex[:12]}",
+            "created": int(time.time()),
+            "model": body.get("model", "fake"),
+        }
+
+        if not body.get("stream"):
+            self._send_json(
+                {
+                    **common,
+                    "object": "chat.completion",
+                    "choices": [
+                        {"index": 0, "message": message, "finish_reason": finish_reason}
+                    ],
+                    "usage": _usage(messages),
+                }
+            )
+            return
+
+        if message.get("tool_calls"):
+            call = message["tool_calls"][0]
+            deltas = [{"role": "assistant", "tool_calls": [{**call, "index": 0}]}]
+        else:
+            text = message["content"]
+            size = -(-len(text) // config.stream_chunks)
+            deltas = [
+                {"role": "assistant", "content": text[i : i + size]}
+                for i in range(0, len(text), size)
+            ]
+
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        chunks = [
+            {"choices": [{"index": 0, "delta": delta, "finish_reason": None}]}
+            for delta in deltas
+        ]
+        chunks.append(
+            {
+                "choices": [{"index": 0, "delta": {}, "finish_reason": finish_reason}],
+                "usage": _usage(messages),
+            }
+        )
+        for chunk in chunks:
+            payload = {**common, "object": "chat.completion.chunk", **chunk}
+            self.wfile.write(f"data: {json.dumps(payload)}\n\n".encode())
+            self.wfile.flush()
+        self.wfile.write(b"data: [DONE]\n\n")
+        self.close_connection = True
+
+
+class FakeServices:
+    """
+    Fake OpenRouter and BusinessLogic endpoints on a local port.
+
+    Use as a context manager; `llm_base_url` and `execute_url` are valid while
+    the block runs.
+    """
+
+    def __init__(self, config: FakeConfig | None = None):
+        self.config = config or FakeConfig()
+        self.stats = FakeStats()
+        self._server: ThreadingHTTPServer | None = None
+
+    def __enter__(self) -> FakeServices:
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+        self._server.daemon_threads = True
+        self._server.config = self.config
+        self._server.stats = self.stats
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self._server.server_port}"
+
+    @property
+    def llm_base_url(self) -> str:
+        return f"{self.base_url}/api/v1"
+
+    @property
+    def execute_url(self) -> str:
+        return f"{self.base_url}/execute"
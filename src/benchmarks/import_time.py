@@ -0,0 +1,106 @@
+"""
+Import time of the package modules, measured with `python -X importtime`.
+
+Every module is imported in a fresh interpreter. The script exits with status 1
+if a module exceeds its time budget or imports one of the heavy dependencies
+that must only be loaded on first use. Run from the `src` directory:
+
+    python -m benchmarks.import_time --budget-ms 3000
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import re
+import subprocess
+import sys
+from pathlib import Path
+
+SRC_DIR = Path(__file__).resolve().parents[1]
+
+# Module -> heavy dependencies it is allowed to import eagerly
+MODULES = {
+    "pension_planning_agent.agent": (),
+    "pension_planning_agent.calculator": (),
+    "pension_planning_agent.fast_path": (),
+    "pension_planning_agent.slots": (),
+    "pension_planning_agent.streamlit": ("streamlit",),
+}
+
+# Only needed once the agent runs; importing them costs seconds. logfire is not
+# listed since pydantic loads it through its plugin entry point on first use.
+HEAVY_MODULES = ("google.adk", "litellm", "streamlit")
+
+IMPORTTIME_LINE = re.compile(r"import time:\s+\d+ \|\s+(\d+) \|\s*(\S+)")
+
+
+def measure(module: str, allowed: tuple[str, ...] = ()) -> dict:
+    """
+    Import `module` in a fresh interpreter.
+
+    Args:
+        module: Dotted module name
+        allowed: Heavy modules `module` may import
+
+    Returns:
+        dict: Cumulative import time in milliseconds and the heavy modules that
+            were imported along with it
+    """
+    code = (
+        f"import sys, json; import {module}; "
+        f"print(json.dumps([m for m in {HEAVY_MODULES!r} if m in sys.modules]))"
+    )
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=SRC_DIR,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    cumulative_us = {
+        match[2]: int(match[1]) for match in IMPORTTIME_LINE.finditer(completed.stderr)
+    }
+    return {
+        "module": module,
+        "import_ms": cumulative_us[module] / 1000,
+        "heavy_imports": [
+            name
+            for name in json.loads(completed.stdout.strip().splitlines()[-1])
+            if name not in allowed
+        ],
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        "--budget-ms", type=float, default=None, help="Fail above this import time"
+    )
+    parser.add_argument("--json", action="store_true", help="Print JSON results")
+    args = parser.parse_args()
+
+    results = [measure(module, allowed) for module, allowed in MODULES.items()]
+    failed = False
+    for result in results:
+        over_budget = (
+            args.budget_ms is not None and result["import_ms"] > args.budget_ms
+        )
+        result["ok"] = not over_budget and not result["heavy_imports"]
+        failed |= not result["ok"]
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        for result in results:
+            heavy = ", ".join(result["heavy_imports"]) or "-"
+            status = "ok" if result["ok"] else "FAIL"
+            print(
+                f"{result['module']:<40}{result['import_ms']:>9.0f} ms"
+                f"  heavy: {heavy:<30}{status}"
+            )
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,296 @@
+"""
+Concurrent multi-session load generator for the agent runner.
+
+Drives many synthetic users through `runner` and the session service, fully
+offline against the fakes from `benchmarks.fakes`. Every user follows the
+seven-question flow of `system_prompt` with a Carina-style persona, one answer
+per turn; the fake model asks the next question until the last answer, which
+triggers `fire_calculator`.
+
+Users start according to a ramp-up profile, and all turns together are paced to
+an optional target rate. The report covers turn latency (summary and
+histogram), event-loop lag, memory growth per session and error rates, and is
+written to `benchmark_results/load-<commit>.json`. Run from the `src` directory:
+
+    python -m benchmarks.load --users 200 --ramp-up 20 --profile linear
+    python -m benchmarks.load --users 500 --ramp-up 30 --profile step --rps 50
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import resource
+import sys
+import time
+from collections import Counter
+
+from loguru import logger
+
+from benchmarks.e2e import run_turn, use_fake_services
+from benchmarks.fakes import FakeConfig, FakeServices
+from benchmarks.report import latency_summary, write_results
+from settings import settings
+
+# The fake model's side of the seven-question flow in `system_prompt`
+QUESTIONS = (
+    "Hvad er din månedsløn, og hvornår vil du gerne stoppe (FIRE alder)?",
+    "Hvor meget har du i frie midler og i holding?",
+    "Hvor meget indbetaler du om året til pension (ratepension + livrente)?",
+    "Hvad er din skatteprocent efter AMB?",
+    "Hvad er dit forbrugsmål om måneden?",
+    "Hvor meget har du i rate- og livrente?",
+)
+
+PERSONAS = ("Carina", "Mads", "Sofie", "Jonas", "Emma", "Lars")
+
+# Upper bounds of the latency histogram buckets in milliseconds
+HISTOGRAM_BUCKETS_MS = (50, 100, 250, 500, 1000, 2500, 5000, 10000, float("inf"))
+
+
+def conversation_script(index: int) -> list[str]:
+    """
+    User answers for one synthetic conversation, one per turn.
+
+    Args:
+        index: User number, varies the persona and figures
+
+    Returns:
+        list[str]: Seven messages following the question order in `system_prompt`
+    """
+    name = PERSONAS[index % len(PERSONAS)]
+    age = 30 + index % 25
+    salary = 35_000 + 1_000 * (index % 30)
+    return [
+        f"Jeg hedder {name} og er {age} år.",
+        f"Min bruttoløn plus arbejdsgiverpension er {salary} kr. om måneden, "
+        f"og jeg vil gerne stoppe som {age + 15} årig.",
+        "Jeg har 150000 kr. i frie midler og 0 kr. i holding.",
+        f"Jeg betaler 10% til pension, det er {salary * 12 // 10} kr. om året.",
+        "Min skatteprocent er 37.",
+        f"Jeg kan godt leve med {salary // 2} kr. om måneden.",
+        "Jeg har 400000 kr. i rate og liv.",
+    ]
+
+
+def start_offsets(users: int, ramp_up: float, profile: str, steps: int) -> list[float]:
+    """
+    Start time of every user, in seconds after the run begins.
+
+    Args:
+        users: Number of users
+        ramp_up: Seconds until the last user has started
+        profile: `instant` (all at once), `linear` (evenly spread) or `step`
+            (`steps` equal batches)
+        steps: Batches for the `step` profile
+
+    Returns:
+        list[float]: Offset per user
+    """
+    if profile == "instant" or users <= 1 or ramp_up <= 0:
+        return [0.0] * users
+    if profile == "linear":
+        return [ramp_up * i / (users - 1) for i in range(users)]
+    batch = -(-users // steps)
+    interval = ramp_up / max(steps - 1, 1)
+    return [interval * (i // batch) for i in range(users)]
+
+
+class Pacer:
+    """Spaces turns across all users to at most `rate` per second."""
+
+    def __init__(self, rate: float | None):
+        self._interval = 1 / rate if rate else 0.0
+        self._next = 0.0
+        self._lock = asyncio.Lock()
+
+    async def wait(self) -> None:
+        if not self._interval:
+            return
+        async with self._lock:
+            now = time.perf_counter()
+            self._next = max(self._next, now)
+            delay = self._next - now
+            self._next += self._interval
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+
+async def monitor_loop_lag(samples: list[float], interval: float = 0.05) -> None:
+    """Record how late the event loop wakes up from `interval`-second sleeps."""
+    while True:
+        started = time.perf_counter()
+        await asyncio.sleep(interval)
+        samples.append(max(time.perf_counter() - started - interval, 0.0))
+
+
+def rss_bytes() -> int:
+    """Current resident set size of the process (peak RSS where unavailable)."""
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except OSError:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == "darwin" else peak * 1024
+
+
+def histogram(samples: list[float]) -> dict[str, int]:
+    """Count latencies (in seconds) per bucket of `HISTOGRAM_BUCKETS_MS`."""
+    labels = [f"<={bound:g}ms" for bound in HISTOGRAM_BUCKETS_MS[:-1]] + ["inf"]
+    counts = dict.fromkeys(labels, 0)
+    for sample in samples:
+        ms = sample * 1000
+        bucket = next(i for i, bound in enumerate(HISTOGRAM_BUCKETS_MS) if ms <= bound)
+        counts[labels[bucket]] += 1
+    return counts
+
+
+async def run_load(args: argparse.Namespace) -> dict:
+    """
+    Run all synthetic users and collect the measurements.
+
+    Args:
+        args: Parsed command line arguments
+
+    Returns:
+        dict: Configuration and results
+    """
+    from pension_planning_agent.agent import (
+        APP_NAME,
+        get_runner,
+        get_session_service,
+    )
+
+    get_runner()
+    session_service = get_session_service()
+    pacer = Pacer(args.rps)
+    turn_latencies: list[float] = []
+    loop_lag: list[float] = []
+    errors: Counter[str] = Counter()
+    completed_sessions = 0
+    attempted_turns = 0
+    offsets = start_offsets(args.users, args.ramp_up, args.profile, args.steps)
+
+    async def user(index: int) -> None:
+        nonlocal completed_sessions, attempted_turns
+        await asyncio.sleep(offsets[index])
+        user_id, session_id = f"load-user-{index}", f"load-session-{index}"
+        await session_service.create_session(
+            app_name=APP_NAME, user_id=user_id, session_id=session_id
+        )
+        for message in conversation_script(index):
+            await pacer.wait()
+            attempted_turns += 1
+            try:
+                turn = await asyncio.wait_for(
+                    run_turn(user_id, session_id, message), args.turn_timeout
+                )
+            except Exception as e:
+                errors[type(e).__name__] += 1
+                return
+            turn_latencies.append(turn["latency"])
+            if args.think_time:
+                await asyncio.sleep(args.think_time)
+        completed_sessions += 1
+
+    rss_before = rss_bytes()
+    monitor = asyncio.create_task(monitor_loop_lag(loop_lag))
+    started = time.perf_counter()
+    await asyncio.gather(*(user(i) for i in range(args.users)))
+    elapsed = time.perf_counter() - started
+    monitor.cancel()
+    rss_after = rss_bytes()
+
+    failed_turns = sum(errors.values())
+    return {
+        "config": {
+            "users": args.users,
+            "profile": args.profile,
+            "ramp_up_s": args.ramp_up,
+            "steps": args.steps,
+            "target_rps": args.rps,
+            "think_time_s": args.think_time,
+            "llm_delay_s": args.llm_delay,
+            "execute_delay_s": args.execute_delay,
+            "session_backend": settings.SESSION_BACKEND,
+        },
+        "duration_s": elapsed,
+        "turns_per_second": len(turn_latencies) / elapsed,
+        "sessions_completed": completed_sessions,
+        "turn_latency": latency_summary(turn_latencies),
+        "turn_latency_histogram": histogram(turn_latencies),
+        "event_loop_lag": latency_summary(loop_lag),
+        "memory": {
+            "rss_before_mb": rss_before / 2**20,
+            "rss_after_mb": rss_after / 2**20,
+            "growth_per_session_kb": (rss_after - rss_before)
+            / max(args.users, 1)
+            / 1024,
+        },
+        "errors": {
+            "turns_attempted": attempted_turns,
+            "turns_failed": failed_turns,
+            "error_rate": failed_turns / max(attempted_turns, 1),
+            "by_type": dict(errors),
+        },
+    }
+
+
+def print_report(results: dict) -> None:
+    """Print a human-readable summary of `results`."""
+    latency = results["turn_latency"]
+    lag = results["event_loop_lag"]
+    memory = results["memory"]
+    errors = results["errors"]
+    print(
+        f"{results['sessions_completed']}/{results['config']['users']} sessions, "
+        f"{results['turns_per_second']:.1f} turns/s in {results['duration_s']:.1f} s"
+    )
+    if latency["count"]:
+        print(
+            f"turn latency p50/p95/p99: {latency['p50_ms']:.0f}/"
+            f"{latency['p95_ms']:.0f}/{latency['p99_ms']:.0f} ms"
+        )
+    if lag["count"]:
+        print(f"event loop lag p95/max: {lag['p95_ms']:.1f}/{lag['max_ms']:.1f} ms")
+    print(
+        f"memory: {memory['rss_before_mb']:.0f} -> {memory['rss_after_mb']:.0f} MB "
+        f"({memory['growth_per_session_kb']:.1f} KB per session)"
+    )
+    print(f"error rate: {errors['error_rate']:.2%} {errors['by_type'] or ''}")
+    total = max(sum(results["turn_latency_histogram"].values()), 1)
+    for bucket, count in results["turn_latency_histogram"].items():
+        print(f"  {bucket:>10} {count:>7} {'#' * round(40 * count / total)}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--users", type=int, default=100)
+    parser.add_argument("--ramp-up", type=float, default=10.0, help="Seconds")
+    parser.add_argument(
+        "--profile", choices=("instant", "linear", "step"), default="linear"
+    )
+    parser.add_argument("--steps", type=int, default=5, help="Batches for 'step'")
+    parser.add_argument("--rps", type=float, default=None, help="Target turns/s")
+    parser.add_argument("--think-time", type=float, default=0.0, help="Seconds")
+    parser.add_argument("--turn-timeout", type=float, default=60.0, help="Seconds")
+    parser.add_argument("--llm-delay", type=float, default=0.2, help="Seconds")
+    parser.add_argument("--execute-delay", type=float, default=0.05, help="Seconds")
+    args = parser.parse_args()
+
+    logger.remove()
+    logger.add(sys.stderr, level="WARNING")
+    config = FakeConfig(
+        llm_delay=args.llm_delay, execute_delay=args.execute_delay, questions=QUESTIONS
+    )
+    with FakeServices(config) as services:
+        use_fake_services(services, cache=True)
+        results = asyncio.run(run_load(args))
+
+    print_report(results)
+    print(f"Results written to {write_results('load', results)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""Latency statistics and machine-readable benchmark results."""
+
+from __future__ import annotations
+
+import json
+import platform
+import subprocess
+from datetime import datetime, timezone
+from pathlib import Path
+
+import numpy as np
+
+RESULTS_DIR = Path("benchmark_results")
+
+
+def latency_summary(samples: list[float]) -> dict[str, float]:
+    """
+    Summarize latencies given in seconds.
+
+    Args:
+        samples: Latency per operation in seconds
+
+    Returns:
+        dict[str, float]: Count, mean, p50, p95, p99 and max in milliseconds
+    """
+    if not samples:
+        return {"count": 0}
+    ms = np.asarray(samples) * 1000
+    p50, p95, p99 = np.percentile(ms, [50, 95, 99])
+    return {
+        "count": len(samples),
+        "mean_ms": float(ms.mean()),
+        "p50_ms": float(p50),
+        "p95_ms": float(p95),
+        "p99_ms": float(p99),
+        "max_ms": float(ms.max()),
+    }
+
+
+def git_commit() -> str:
+    """Short hash of the checked-out commit, or "unknown" outside a git checkout."""
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def write_results(name: str, results: dict, output: Path | None = None) -> Path:
+    """
+    Write benchmark results as JSON, together with the commit and environment.
+
+    Args:
+        name: Benchmark name, used in the default file name
+        results: Metrics to store
+        output: Target file, defaults to `benchmark_results/<name>-<commit>.json`
+
+    Returns:
+        Path: The written file
+    """
+    commit = git_commit()
+    output = output or RESULTS_DIR / f"{name}-{commit}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    document = {
+        "benchmark": name,
+        "commit": commit,
+        "created": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        **results,
+    }
+    output.write_text(json.dumps(document, indent=2))
+    return output
+
+
+def _flatten(data: dict, prefix: str = "") -> dict[str, float]:
+    """Numeric leaves of a nested dict, keyed by dotted path."""
+    flat = {}
+    for key, value in data.items():
+        path = f"{prefix}{key}"
+        if isinstance(value, dict):
+            flat.update(_flatten(value, f"{path}."))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            flat[path] = float(value)
+    return flat
+
+
+def compare_results(baseline: dict, current: dict) -> list[str]:
+    """
+    Relative change of every metric present in both result documents.
+
+    Args:
+        baseline: Earlier results, e.g. from the main branch
+        current: New results
+
+    Returns:
+        list[str]: One line per metric
+    """
+    before, after = _flatten(baseline), _flatten(current)
+    lines = []
+    for key in sorted(before.keys() & after.keys()):
+        old, new = before[key], after[key]
+        change = f"{(new - old) / old:+.1%}" if old else "n/a"
+        lines.append(f"{key:<45}{old:>12.2f}{new:>12.2f}{change:>10}")
+    return lines
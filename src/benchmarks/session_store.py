@@ -0,0 +1,105 @@
+"""
+Append and read latency per event for the session services.
+
+Run from the `src` directory:
+
+    python -m benchmarks.session_store --sessions 20 --events 50
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+from google.adk.events import Event
+from google.adk.sessions import BaseSessionService, InMemorySessionService
+from google.adk.sessions.sqlite_session_service import SqliteSessionService
+from google.genai import types
+
+from pension_planning_agent.sessions import PooledSqliteSessionService
+
+APP = "session_benchmark"
+
+
+def _percentile(samples: list[float], q: float) -> float:
+    """The `q`-th percentile of `samples`, in microseconds."""
+    ordered = sorted(samples)
+    return ordered[min(int(q / 100 * len(ordered)), len(ordered) - 1)] * 1e6
+
+
+async def measure(
+    service: BaseSessionService, sessions: int, events: int
+) -> dict[str, float]:
+    """
+    Append `events` events to each of `sessions` sessions, then read each back.
+
+    Args:
+        service: Session service under test
+        sessions: Number of sessions
+        events: Events appended per session
+
+    Returns:
+        dict[str, float]: Median and p95 microseconds per appended and per read
+            event
+    """
+    append, read = [], []
+    for s in range(sessions):
+        session = await service.create_session(
+            app_name=APP, user_id="user", session_id=f"s{s}"
+        )
+        for e in range(events):
+            event = Event(
+                invocation_id=f"inv{e}",
+                author="user",
+                content=types.Content(
+                    role="user", parts=[types.Part(text=f"manedslon={e}")]
+                ),
+            )
+            started = time.perf_counter()
+            await service.append_event(session, event)
+            append.append(time.perf_counter() - started)
+
+        started = time.perf_counter()
+        await service.get_session(app_name=APP, user_id="user", session_id=f"s{s}")
+        read.append((time.perf_counter() - started) / events)
+
+    return {
+        "append_p50_us": statistics.median(append) * 1e6,
+        "append_p95_us": _percentile(append, 95),
+        "read_p50_us": statistics.median(read) * 1e6,
+        "read_p95_us": _percentile(read, 95),
+    }
+
+
+async def main(sessions: int, events: int) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        services: dict[str, BaseSessionService] = {
+            "memory": InMemorySessionService(),
+            "adk-sqlite": SqliteSessionService(str(Path(tmp) / "adk.db")),
+            "pooled-sqlite": PooledSqliteSessionService(str(Path(tmp) / "pooled.db")),
+        }
+        print(f"{sessions} sessions x {events} events, microseconds per event")
+        print(
+            f"{'service':<15}{'append p50':>12}{'append p95':>12}"
+            f"{'read p50':>12}{'read p95':>12}"
+        )
+        for name, service in services.items():
+            result = await measure(service, sessions, events)
+            print(
+                f"{name:<15}{result['append_p50_us']:>12.0f}"
+                f"{result['append_p95_us']:>12.0f}{result['read_p50_us']:>12.0f}"
+                f"{result['read_p95_us']:>12.0f}"
+            )
+        await services["pooled-sqlite"].close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sessions", type=int, default=20)
+    parser.add_argument("--events", type=int, default=50)
+    args = parser.parse_args()
+    asyncio.run(main(args.sessions, args.events))
@@ -0,0 +1,314 @@
+"""
+Admission control for agent turns.
+
+Every agent turn makes one or more model calls, so a load spike that starts
+all turns at once runs into OpenRouter rate limits and slows everyone down.
+Turns therefore pass through `admit_turn()` before the runner is called:
+
+- per-user token buckets limit how fast one user can send turns
+- a global cap limits the turns running at once
+- turns beyond the cap wait in a bounded FIFO queue, for a limited time
+
+A turn that cannot be admitted fails fast with `AdmissionRejected`, which
+carries a message for the user instead of leaving the request hanging.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Callable
+
+from loguru import logger
+
+from pension_planning_agent.metrics import (
+    ADMISSION_IN_FLIGHT,
+    ADMISSION_QUEUE_DEPTH,
+    ADMISSION_REJECTIONS,
+    ADMISSION_WAIT_SECONDS,
+)
+from settings import settings
+
+REJECTION_MESSAGES = {
+    "rate_limited": "You are sending messages faster than I can answer. "
+    "Please wait {retry_after} seconds and try again.",
+    "queue_full": "Many people are planning their FIRE right now. "
+    "Please try again in {retry_after} seconds.",
+    "timeout": "Many people are planning their FIRE right now and your message "
+    "waited too long. Please try again in {retry_after} seconds.",
+}
+
+
+class AdmissionRejected(Exception):
+    """Raised when an agent turn is not admitted."""
+
+    def __init__(self, reason: str, retry_after: float):
+        """
+        Args:
+            reason: "rate_limited", "queue_full" or "timeout"
+            retry_after: Suggested seconds before trying again
+        """
+        self.reason = reason
+        self.retry_after = retry_after
+        super().__init__(f"Agent turn rejected: {reason}")
+
+    @property
+    def message(self) -> str:
+        """Explanation for the user."""
+        retry_after = max(1, round(self.retry_after))
+        return REJECTION_MESSAGES[self.reason].format(retry_after=retry_after)
+
+
+class TokenBucket:
+    """Allows `burst` turns at once, refilled at `rate` turns per second."""
+
+    def __init__(self, rate: float, burst: int, now: float):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = now
+
+    def take(self, now: float) -> float:
+        """
+        Take one token if available.
+
+        Args:
+            now: Current monotonic time in seconds
+
+        Returns:
+            float: 0 if a token was taken, otherwise seconds until one is available
+        """
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+
+class _Waiter:
+    """A queued turn, woken on its own event loop when it is granted a slot."""
+
+    __slots__ = ("loop", "future", "granted")
+
+    def __init__(self, loop: asyncio.AbstractEventLoop):
+        self.loop = loop
+        self.future: asyncio.Future[None] = loop.create_future()
+        self.granted = False
+
+
+def _wake(future: asyncio.Future[None]) -> None:
+    if not future.done():
+        future.set_result(None)
+
+
+class AdmissionController:
+    """
+    Global concurrency cap with a bounded wait queue and per-user rate limits.
+
+    Thread-safe: Streamlit runs every browser session on its own event loop,
+    and one controller covers all of them. A released slot is handed directly
+    to the longest-waiting turn, so queued turns are admitted in order.
+    """
+
+    def __init__(
+        self,
+        max_concurrent: int,
+        max_queue: int,
+        queue_timeout: float,
+        user_rate: float,
+        user_burst: int,
+        max_users: int = 10_000,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """
+        Args:
+            max_concurrent: Turns running at once
+            max_queue: Turns waiting for a slot before new ones are rejected
+            queue_timeout: Seconds a turn may wait for a slot
+            user_rate: Turns per second per user, 0 disables the rate limit
+            user_burst: Turns a user may send back to back
+            max_users: Token buckets kept; the least recently active user's
+                bucket is dropped beyond this, which only forgives that user
+            clock: Monotonic clock, replaceable in tests
+        """
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.user_rate = user_rate
+        self.user_burst = user_burst
+        self.max_users = max_users
+        self._clock = clock
+        self._in_flight = 0
+        self._queue: deque[_Waiter] = deque()
+        self._buckets: OrderedDict[str, TokenBucket] = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    @property
+    def queue_depth(self) -> int:
+        return len(self._queue)
+
+    @asynccontextmanager
+    async def admit(self, user_id: str) -> AsyncIterator[float]:
+        """
+        Hold a slot for the duration of the block.
+
+        Args:
+            user_id: Key of the user's rate limit
+
+        Yields:
+            float: Seconds waited for the slot
+
+        Raises:
+            AdmissionRejected: If the user is rate limited, the queue is full
+                or no slot became free within `queue_timeout`
+        """
+        waited = await self.acquire(user_id)
+        try:
+            yield waited
+        finally:
+            self.release()
+
+    async def acquire(self, user_id: str) -> float:
+        """
+        Take a slot, waiting in the queue if all are in use.
+
+        Every successful call must be paired with `release()`; prefer `admit()`.
+
+        Args:
+            user_id: Key of the user's rate limit
+
+        Returns:
+            float: Seconds waited for the slot
+
+        Raises:
+            AdmissionRejected: See `admit()`
+        """
+        waiter = None
+        with self._lock:
+            retry_after = self._take_token(user_id)
+            if retry_after:
+                reason = "rate_limited"
+            elif self._in_flight < self.max_concurrent and not self._queue:
+                self._in_flight += 1
+                reason = None
+            elif len(self._queue) >= self.max_queue:
+                reason, retry_after = "queue_full", self.queue_timeout
+            else:
+                reason = None
+                waiter = _Waiter(asyncio.get_running_loop())
+                self._queue.append(waiter)
+            self._update_gauges()
+
+        if reason is not None:
+            self._reject(reason, retry_after)
+        if waiter is None:
+            ADMISSION_WAIT_SECONDS.observe(0.0, outcome="admitted")
+            return 0.0
+
+        started = time.perf_counter()
+        try:
+            await asyncio.wait_for(waiter.future, self.queue_timeout)
+        except BaseException as e:
+            with self._lock:
+                granted = waiter.granted
+                if not granted:
+                    self._queue.remove(waiter)
+                    self._update_gauges()
+            # The slot was handed over just as the wait ended: pass it on
+            if granted:
+                self.release()
+            # Not the builtin TimeoutError before Python 3.11
+            if not isinstance(e, asyncio.TimeoutError):
+                raise
+            ADMISSION_WAIT_SECONDS.observe(
+                time.perf_counter() - started, outcome="timeout"
+            )
+            self._reject("timeout", self.queue_timeout)
+
+        waited = time.perf_counter() - started
+        ADMISSION_WAIT_SECONDS.observe(waited, outcome="admitted")
+        return waited
+
+    def release(self) -> None:
+        """Free a slot, handing it to the longest-waiting turn if there is one."""
+        with self._lock:
+            while self._queue:
+                waiter = self._queue.popleft()
+                waiter.granted = True
+                try:
+                    waiter.loop.call_soon_threadsafe(_wake, waiter.future)
+                except RuntimeError:
+                    # The waiter's event loop is closed, try the next one
+                    continue
+                break
+            else:
+                self._in_flight -= 1
+            self._update_gauges()
+
+    def reset(self) -> None:
+        """Forget all rate limits; slots in use are not affected."""
+        with self._lock:
+            self._buckets.clear()
+
+    def _take_token(self, user_id: str) -> float:
+        if self.user_rate <= 0:
+            return 0.0
+        now = self._clock()
+        bucket = self._buckets.get(user_id)
+        if bucket is None:
+            bucket = self._buckets[user_id] = TokenBucket(
+                self.user_rate, self.user_burst, now
+            )
+            if len(self._buckets) > self.max_users:
+                self._buckets.popitem(last=False)
+        else:
+            self._buckets.move_to_end(user_id)
+        return bucket.take(now)
+
+    def _update_gauges(self) -> None:
+        ADMISSION_IN_FLIGHT.set(self._in_flight)
+        ADMISSION_QUEUE_DEPTH.set(len(self._queue))
+
+    def _reject(self, reason: str, retry_after: float) -> None:
+        ADMISSION_REJECTIONS.inc(reason=reason)
+        logger.warning(
+            f"Agent turn rejected: {reason}, retry after {retry_after:.1f} s"
+        )
+        raise AdmissionRejected(reason, retry_after)
+
+
+turn_admission = AdmissionController(
+    max_concurrent=settings.ADMISSION_MAX_CONCURRENT,
+    max_queue=settings.ADMISSION_MAX_QUEUE,
+    queue_timeout=settings.ADMISSION_QUEUE_TIMEOUT,
+    user_rate=settings.ADMISSION_USER_RATE,
+    user_burst=settings.ADMISSION_USER_BURST,
+)
+
+
+@asynccontextmanager
+async def admit_turn(user_id: str) -> AsyncIterator[None]:
+    """
+    Admit one agent turn through the process-wide `turn_admission`.
+
+    Does nothing when `settings.ADMISSION_ENABLED` is off.
+
+    Args:
+        user_id: Key of the user's rate limit
+
+    Raises:
+        AdmissionRejected: If the turn is not admitted
+    """
+    if not settings.ADMISSION_ENABLED:
+        yield
+        return
+    async with turn_admission.admit(user_id):
+        yield
@@ -1,28 +1,46 @@
-"""FIRE Pension Planning Agent using Google ADK and OpenRouter."""
+"""FIRE Pension Planning Agent using Google ADK and OpenRouter.
+
+The model, agent, session service and runner are built on first use by the
+cached `get_*` factories, so importing this module (e.g. for `fire_calculator`)
+does not import google-adk, LiteLLM or Streamlit.
+"""
 
 from __future__ import annotations
 
+from functools import cache
+from typing import TYPE_CHECKING, Any
+
 import httpx
-import logfire
-from google.adk import Runner
-from google.adk.agents import Agent
-from google.adk.models import LiteLlm
-from google.adk.sessions import InMemorySessionService
 from loguru import logger
-from pydantic import ValidationError
 
-from pension_planning_agent.schemas import FireCalculatorInput
-from pension_planning_agent.system_prompt import system_prompt
+# Re-exported for existing callers
+from pension_planning_agent.calculator import convert_percentage_to_float  # noqa: F401
+from pension_planning_agent.http_client import close_http_client
+from pension_planning_agent.metrics import CALCULATOR_STAGE_SECONDS, timed
+from pension_planning_agent.resilience import CircuitOpenError
+from pension_planning_agent.schemas import (
+    FireCalculatorInput,
+    FireCalculatorOutput,
+    validate_calculator_input,
+)
+from pension_planning_agent.trajectory import (
+    TRAJECTORY_STATE_KEY,
+    calculate_output,
+    trajectory_state,
+)
 from settings import settings
 
-logfire.configure(send_to_logfire="if-token-present")
+if TYPE_CHECKING:
+    from google.adk import Runner
+    from google.adk.agents import Agent
+    from google.adk.models import BaseLlm
+    from google.adk.sessions import BaseSessionService
 
+APP_NAME = "fire_pension_agent"
+AGENT_NAME = "fire_pension_agent"
 
-async def convert_percentage_to_float(percentage: float) -> float:
-    """
-    Convert a percentage string to a float.
-    """
-    return percentage / 100 if percentage > 1 else percentage
+# Optional: reasoning parameters for thinking models
+MODEL_EXTRA_PARAMS: dict[str, Any] = {"reasoning_effort": "high"}
 
 
 def generate_final_message(response: dict | None) -> str:
@@ -43,8 +61,14 @@ def generate_final_message(response: dict | None) -> str:
     if opsparing_ar is None or result is None:
         return "Agenten kunne ikke beregne pensionsplanen. Prøv igen med andre værdier."
 
+    # Answered by the local engine while the BusinessLogic API is unavailable
+    fallback = (
+        "Beregningsservicen er midlertidigt utilgængelig, så beregningen er lavet med en lokal tilnærmelse.\n"
+        if response.get("engine") == "local" and settings.FIRE_BACKEND == "remote"
+        else ""
+    )
     return f"""
-Hvis du sparer {opsparing_ar:,.0f} kr. om året i løbet af dine arbejdsår, vil din nettofortjeneste i frie midler ved din alder 95 være {result:,.0f} kr.
+{fallback}Hvis du sparer {opsparing_ar:,.0f} kr. om året i løbet af dine arbejdsår, vil din nettofortjeneste i frie midler ved din alder 95 være {result:,.0f} kr.
 
 Hvis beløbet er positivt, er du på rette vej. Hvis det er negativt, skal du enten spare mere op eller reducere dit forventede forbrug.
 
@@ -68,9 +92,12 @@ async def fire_calculator(
     holding_midler: float,
     rate_and_liv: float,
     fire_alder: int,
+    # ADK's ToolContext, injected by name; ADK resolves tool annotations at
+    # runtime, and importing it here would load google-adk on import
+    tool_context: Any = None,
 ) -> str:
     """
-    Call the BusinessLogic API to calculate the pension plan.
+    Calculate the pension plan with the configured projection backend.
 
     Args:
         manedslon: Monthly salary
@@ -87,110 +114,227 @@ async def fire_calculator(
         str: Final message with pension plan calculation results
     """
     # Validate inputs using Pydantic
-    try:
-        calculator_input = FireCalculatorInput(
-            manedslon=manedslon,
-            alder=alder,
-            pensionInd_ar=pensionInd_ar,
-            skat_percentage=skat_percentage,
-            forbrugsmal_md=forbrugsmal_md,
-            frie_midler=frie_midler,
-            holding_midler=holding_midler,
-            rate_and_liv=rate_and_liv,
-            fire_alder=fire_alder,
-        )
-    except ValidationError as e:
-        error_msg = "Invalid input parameters:\n"
-        for error in e.errors():
-            field = " -> ".join(str(loc) for loc in error["loc"])
-            error_msg += f"- {field}: {error['msg']}\n"
-        logger.error(f"Validation error: {error_msg}")
-        return error_msg
-
-    skat_percentage = await convert_percentage_to_float(
-        calculator_input.skat_percentage
-    )
-    folkepensionsalder = 70  # TODO: Calculate based on birth year
+    with timed(
+        CALCULATOR_STAGE_SECONDS, "fire_calculator.validation", stage="validation"
+    ):
+        calculator_input = validate_calculator_input(locals())
+    if isinstance(calculator_input, str):
+        return calculator_input
+
+    reply, output = await calculate_plan(calculator_input)
+    if tool_context is not None and output is not None:
+        # Follow-up questions are answered from it by `fire_trajectory`
+        tool_context.state[TRAJECTORY_STATE_KEY] = trajectory_state(output)
+    return reply
+
+
+async def calculate_plan(
+    calculator_input: FireCalculatorInput,
+) -> tuple[str, FireCalculatorOutput | None]:
+    """
+    Calculate a validated plan and write the final message.
+
+    Args:
+        calculator_input: Validated calculator input
 
+    Returns:
+        tuple[str, FireCalculatorOutput | None]: The final message, and the
+            calculated output, or None if the calculation failed and the
+            message says why
+    """
     try:
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            response = await client.post(
-                "https://api.businesslogic.online/execute",
-                headers={
-                    "X-Auth-Token": settings.BUSINESSLOGIC_TOKEN,
-                    "Content-Type": "application/json",
-                },
-                json={
-                    "manedslon": calculator_input.manedslon,
-                    "alder": calculator_input.alder,
-                    "pensionInd_ar": calculator_input.pensionInd_ar,
-                    "skat_percentage": skat_percentage,
-                    "forbrugsmal_md": calculator_input.forbrugsmal_md,
-                    "frie_midler": calculator_input.frie_midler,
-                    "holding_midler": calculator_input.holding_midler,
-                    "rate_and_liv": calculator_input.rate_and_liv,
-                    "folkepensionsalder": folkepensionsalder,
-                    "fire_alder": calculator_input.fire_alder,
-                },
-            )
-            response.raise_for_status()
-            return generate_final_message(response.json())
+        with timed(
+            CALCULATOR_STAGE_SECONDS, "fire_calculator.projection", stage="projection"
+        ):
+            output = await calculate_output(calculator_input)
+        return generate_final_message(output.model_dump(exclude={"trajectory"})), output
+    except CircuitOpenError:
+        error_msg = "BusinessLogic API is unavailable, circuit breaker open."
+        logger.error(error_msg)
+        return (
+            "The calculation service is temporarily unavailable. Please try again in a minute.",
+            None,
+        )
     except httpx.TimeoutException:
         error_msg = "Request timed out. Please try again later."
         logger.error(error_msg)
-        return error_msg
+        return error_msg, None
     except httpx.HTTPStatusError as e:
         error_msg = f"API error: {e.response.status_code} - {e.response.text}"
         logger.error(error_msg)
         return (
-            f"Failed to calculate pension plan. Please check your inputs and try again."
+            f"Failed to calculate pension plan. Please check your inputs and try again.",
+            None,
         )
     except Exception as e:
         error_msg = f"Unexpected error: {str(e)}"
         logger.error(error_msg)
-        return "An unexpected error occurred. Please try again later."
+        return "An unexpected error occurred. Please try again later.", None
+
+
+@cache
+def configure_logfire() -> None:
+    """Configure logfire once per process."""
+    import logfire
 
+    logfire.configure(send_to_logfire="if-token-present")
 
-# Get API key from environment or Streamlit secrets
-try:
-    import streamlit as st
 
-    api_key = (
-        settings.OPEN_ROUTER_API_KEY
-        if settings.OPEN_ROUTER_API_KEY != "open-key"
-        else st.secrets.get("OPEN_ROUTER_API_KEY")
+def get_api_key() -> str:
+    """
+    Get the OpenRouter API key from the environment or Streamlit secrets.
+
+    Returns:
+        str: API key
+    """
+    try:
+        import streamlit as st
+
+        return (
+            settings.OPEN_ROUTER_API_KEY
+            if settings.OPEN_ROUTER_API_KEY != "open-key"
+            else st.secrets.get("OPEN_ROUTER_API_KEY")
+        )
+    except Exception:
+        return settings.OPEN_ROUTER_API_KEY
+
+
+@cache
+def get_model() -> BaseLlm:
+    """
+    Get the LiteLLM model configured to use OpenRouter, creating it on first use.
+
+    With `settings.LLM_ROUTING_ENABLED`, every model request is routed to the
+    model and reasoning effort configured for its kind of turn instead.
+
+    Returns:
+        BaseLlm: Shared model instance
+    """
+    from google.adk.models import LiteLlm
+
+    if settings.LLM_ROUTING_ENABLED:
+        from pension_planning_agent.routing import RoutedLlm
+
+        return RoutedLlm(
+            model=settings.LLM_MODEL,
+            routes=settings.LLM_ROUTES,
+            first_response_slo=settings.LLM_ROUTE_FIRST_RESPONSE_SLO,
+            model_kwargs={
+                "api_key": get_api_key(),
+                "api_base": settings.OPEN_ROUTER_API_BASE,
+            },
+        )
+    return LiteLlm(
+        model=settings.LLM_MODEL,
+        api_key=get_api_key(),
+        api_base=settings.OPEN_ROUTER_API_BASE,
+        extra_params=MODEL_EXTRA_PARAMS,
     )
-except Exception:
-    api_key = settings.OPEN_ROUTER_API_KEY
 
 
-# Configure LiteLLM to use OpenRouter
-model = LiteLlm(
-    model=settings.LLM_MODEL,
-    api_key=api_key,
-    api_base="https://openrouter.ai/api/v1",
-    # Optional: Add reasoning parameters for thinking models
-    extra_params={"reasoning_effort": "high"},  # For reasoning models
-)
+def model_params() -> dict[str, Any]:
+    """
+    Parameters besides the model name that shape the model's responses.
 
-fire_agent = Agent(
-    name="fire_pension_agent",
-    model=model,
-    instruction=system_prompt,
-    description="AI agent for personalized pension planning, offering savings projections, retirement income analysis, and contribution optimization.",
-    tools=[fire_calculator],
-)
+    Returns:
+        dict[str, Any]: Reasoning parameters, or the routing policy
+    """
+    if settings.LLM_ROUTING_ENABLED:
+        return {"routes": settings.LLM_ROUTES}
+    return MODEL_EXTRA_PARAMS
 
-# Create session service and runner
-session_service = InMemorySessionService()
-runner = Runner(
-    app_name="fire_pension_agent", agent=fire_agent, session_service=session_service
-)
+
+@cache
+def get_agent() -> Agent:
+    """
+    Get the FIRE pension agent with its tools, creating it on first use.
+
+    Returns:
+        Agent: Shared agent instance
+    """
+    from google.adk.agents import Agent
+
+    from pension_planning_agent.backtest import fire_backtest
+    from pension_planning_agent.compaction import compact_history
+    from pension_planning_agent.scenarios import fire_scenario_grid
+    from pension_planning_agent.sensitivity import fire_sensitivity
+    from pension_planning_agent.simulation import fire_monte_carlo
+    from pension_planning_agent.solver import fire_goal_seek
+    from pension_planning_agent.system_prompt import build_system_prompt
+    from pension_planning_agent.trajectory import fire_trajectory
+
+    tools = [fire_calculator, fire_scenario_grid, fire_goal_seek, fire_sensitivity]
+    if settings.FIRE_ENGINE_TOOLS_ENABLED:
+        tools += [fire_trajectory, fire_monte_carlo, fire_backtest]
+    return Agent(
+        name=AGENT_NAME,
+        model=get_model(),
+        instruction=build_system_prompt(settings.FIRE_ENGINE_TOOLS_ENABLED),
+        description="AI agent for personalized pension planning, offering savings projections, retirement income analysis, and contribution optimization.",
+        tools=tools,
+        before_model_callback=compact_history,
+    )
+
+
+@cache
+def get_session_service() -> BaseSessionService:
+    """
+    Get the session service selected in settings, creating it on first use.
+
+    Returns:
+        BaseSessionService: Shared session service
+    """
+    from pension_planning_agent.sessions import create_session_service
+
+    return create_session_service()
+
+
+@cache
+def get_runner() -> Runner:
+    """
+    Get the runner for the agent and session service, creating it on first use.
+
+    Returns:
+        Runner: Shared runner instance
+    """
+    from google.adk import Runner
+    from google.adk.apps import App
+
+    from pension_planning_agent.instrumentation import MetricsPlugin
+
+    configure_logfire()
+    plugins = [MetricsPlugin()]
+    if settings.LLM_CACHE_ENABLED:
+        from pension_planning_agent.llm_cache import create_llm_cache_plugin
+
+        # First, so a cache hit skips the model call and its timing
+        plugins.insert(0, create_llm_cache_plugin(settings.LLM_MODEL, model_params()))
+    app = App(name=APP_NAME, root_agent=get_agent(), plugins=plugins)
+    return Runner(app=app, session_service=get_session_service())
+
+
+# Former module globals, now created lazily on first access
+_LAZY_GLOBALS = {
+    "api_key": get_api_key,
+    "model": get_model,
+    "fire_agent": get_agent,
+    "session_service": get_session_service,
+    "runner": get_runner,
+}
+
+
+def __getattr__(name: str) -> Any:
+    """Create the former module globals (`runner`, `fire_agent`, ...) on access."""
+    if name in _LAZY_GLOBALS:
+        return _LAZY_GLOBALS[name]()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 async def main():
     from google.genai import types
 
+    from pension_planning_agent.fast_path import run_fast_path
+
     text_1 = """"
             Jeg hedder Carina, er 44 år. Jeg arbejder i Penly med marketing, kundeservice, og alt muligt andet. Min bruttoløn plus min arbejdsgiverpension er 45.000 kr. om måneden. Jeg betaler 10% til pension.
             Jeg får cirka 25.000 kr. udbetalt hver måned efter skat og indbetaling til pensioner. Og jeg sætter pt 0 kr til side.
@@ -203,37 +347,40 @@ async def main():
     # Create a session first (await the async method)
     user_id = "test_user"
     session_id = "test_session"
-    app_name = "fire_pension_agent"
-    await session_service.create_session(
+    app_name = APP_NAME
+    await get_session_service().create_session(
         app_name=app_name, user_id=user_id, session_id=session_id
     )
 
-    # Create user message content
-    new_message = types.Content(parts=[types.Part(text=text_2)])
-
-    # Run the agent
-    result_text = ""
+    # Structured input is answered without a model call
+    result_text = await run_fast_path(user_id, session_id, text_2) or ""
     last_event = None
-    for event in runner.run(
-        user_id=user_id, session_id=session_id, new_message=new_message
-    ):
-        last_event = event
-        # Process events to extract the response
-        if hasattr(event, "text") and event.text:
-            result_text += event.text
-        elif hasattr(event, "content") and event.content:
-            # Handle Content object with parts
-            content = event.content
-            if hasattr(content, "parts"):
-                for part in content.parts:
-                    if hasattr(part, "text") and part.text:
-                        result_text += part.text
+
+    if not result_text:
+        # Create user message content
+        new_message = types.Content(parts=[types.Part(text=text_2)])
+
+        for event in get_runner().run(
+            user_id=user_id, session_id=session_id, new_message=new_message
+        ):
+            last_event = event
+            # Process events to extract the response
+            if hasattr(event, "text") and event.text:
+                result_text += event.text
+            elif hasattr(event, "content") and event.content:
+                # Handle Content object with parts
+                content = event.content
+                if hasattr(content, "parts"):
+                    for part in content.parts:
+                        if hasattr(part, "text") and part.text:
+                            result_text += part.text
 
     print(
         result_text
         if result_text
         else (str(last_event) if last_event else "No response")
     )
+    await close_http_client()
 
 
 if __name__ == "__main__":
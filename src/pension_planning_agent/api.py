@@ -0,0 +1,299 @@
+"""
+Headless HTTP API for the FIRE Pension Planning Agent.
+
+An ASGI app (FastAPI) sharing `runner` and the session service with the
+Streamlit UI:
+
+- `POST /sessions`: create a conversation
+- `POST /sessions/{session_id}/messages`: send a user message; the agent's
+  events are streamed back as Server-Sent Events
+- `POST /calculate`: run `fire_calculator` directly
+- `GET /metrics`: Prometheus metrics, `GET /healthz`: liveness
+
+Everything on the request path is async, so one process serves many
+concurrent conversations on a single event loop. Run from the `src` directory:
+
+    uvicorn pension_planning_agent.api:app --host 0.0.0.0 --port 8000
+"""
+
+from __future__ import annotations
+
+import json
+import time
+import uuid
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+
+from fastapi import FastAPI, HTTPException
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from loguru import logger
+from pydantic import BaseModel, Field
+
+from pension_planning_agent.admission import AdmissionRejected, admit_turn
+from pension_planning_agent.agent import (
+    APP_NAME,
+    calculate_plan,
+    get_runner,
+    get_session_service,
+)
+from pension_planning_agent.fast_path import run_fast_path
+from pension_planning_agent.http_client import http_client_lifespan
+from pension_planning_agent.metrics import (
+    CONTENT_TYPE,
+    FIRST_CHUNK_SECONDS,
+    TURN_SECONDS,
+    render_metrics,
+    tracer,
+)
+from pension_planning_agent.schemas import FireCalculatorInput, FireCalculatorOutput
+from pension_planning_agent.slots import run_slot_filling
+from settings import settings
+
+
+class CreateSessionRequest(BaseModel):
+    """Body of `POST /sessions`."""
+
+    user_id: str = Field(min_length=1, description="Caller's user ID")
+    session_id: str | None = Field(
+        default=None, description="Session ID to use, generated if omitted"
+    )
+
+
+class SessionResponse(BaseModel):
+    """A created conversation."""
+
+    user_id: str
+    session_id: str
+
+
+class MessageRequest(BaseModel):
+    """Body of `POST /sessions/{session_id}/messages`."""
+
+    user_id: str = Field(min_length=1, description="Owner of the session")
+    text: str = Field(min_length=1, description="User message")
+
+
+class CalculationResponse(BaseModel):
+    """Result of `POST /calculate`."""
+
+    message: str = Field(description="fire_calculator's message for the user")
+    projection: FireCalculatorOutput | None = Field(
+        default=None,
+        description="Projection the message was written from, None if it failed",
+    )
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    """Build the runner before serving and close shared clients on shutdown."""
+    get_runner()
+    async with http_client_lifespan():
+        yield
+    close = getattr(get_session_service(), "close", None)
+    if close is not None:
+        await close()
+
+
+app = FastAPI(
+    title=settings.NAME,
+    description="FIRE pension planning agent with streamed replies.",
+    lifespan=lifespan,
+)
+
+
+def sse_event(event: str, data: dict) -> str:
+    """
+    Format one Server-Sent Event.
+
+    Args:
+        event: Event type
+        data: JSON payload
+
+    Returns:
+        str: The event, terminated by a blank line
+    """
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+async def stream_turn(user_id: str, session_id: str, text: str) -> AsyncIterator[str]:
+    """
+    Run one conversation turn and yield its events as SSE.
+
+    Event types:
+
+    - `text`: model text, `partial` for streamed deltas; the final text of a
+      model response repeats the deltas streamed before it
+    - `tool_call` and `tool_result`: the agent's tool use
+    - `done`: the complete reply and the turn latency
+    - `error`: the turn failed; when the service is overloaded or the user
+      sends too fast, it also has a `reason` and `retry_after` seconds
+
+    Args:
+        user_id: ADK user ID
+        session_id: ADK session ID
+        text: User message
+
+    Yields:
+        str: Formatted SSE events
+    """
+    from google.adk.agents.run_config import RunConfig, StreamingMode
+    from google.genai import types
+
+    started = time.perf_counter()
+    path, outcome = "agent", "ok"
+    reply = ""
+    first_chunk = True
+    with tracer.start_as_current_span("agent_turn") as span:
+        try:
+            fast_reply = await run_fast_path(user_id, session_id, text)
+            if fast_reply is not None:
+                path, reply = "fast", fast_reply
+                yield sse_event("text", {"text": reply, "partial": False})
+            else:
+                async with admit_turn(user_id):
+                    # Collects the calculator inputs without an agent turn
+                    slot_reply = await run_slot_filling(user_id, session_id, text)
+                    if slot_reply is not None:
+                        path, reply = "slots", slot_reply
+                        yield sse_event("text", {"text": reply, "partial": False})
+                    else:
+                        events = get_runner().run_async(
+                            user_id=user_id,
+                            session_id=session_id,
+                            new_message=types.Content(
+                                role="user", parts=[types.Part(text=text)]
+                            ),
+                            run_config=RunConfig(streaming_mode=StreamingMode.SSE),
+                        )
+                        try:
+                            async for event in events:
+                                for call in event.get_function_calls():
+                                    yield sse_event(
+                                        "tool_call",
+                                        {
+                                            "id": call.id,
+                                            "name": call.name,
+                                            "args": call.args,
+                                        },
+                                    )
+                                for response in event.get_function_responses():
+                                    yield sse_event(
+                                        "tool_result",
+                                        {
+                                            "id": response.id,
+                                            "name": response.name,
+                                            "response": response.response,
+                                        },
+                                    )
+                                parts = event.content.parts if event.content else None
+                                event_text = "".join(
+                                    part.text
+                                    for part in parts or []
+                                    if part.text and not part.thought
+                                )
+                                if not event_text:
+                                    continue
+                                if first_chunk:
+                                    first_chunk = False
+                                    FIRST_CHUNK_SECONDS.observe(
+                                        time.perf_counter() - started
+                                    )
+                                if not event.partial:
+                                    reply += event_text
+                                yield sse_event(
+                                    "text",
+                                    {
+                                        "text": event_text,
+                                        "partial": bool(event.partial),
+                                    },
+                                )
+                        finally:
+                            # Cancels the agent turn when the client disconnects
+                            await events.aclose()
+
+            latency = time.perf_counter() - started
+            yield sse_event(
+                "done",
+                {"reply": reply, "path": path, "latency_ms": round(latency * 1000)},
+            )
+        except AdmissionRejected as e:
+            outcome = "rejected"
+            yield sse_event(
+                "error",
+                {
+                    "message": e.message,
+                    "reason": e.reason,
+                    "retry_after": round(e.retry_after, 1),
+                },
+            )
+        except Exception as e:
+            outcome = "error"
+            logger.exception(f"⛔️ Agent turn failed: {e}")
+            yield sse_event("error", {"message": f"An error occurred: {e}"})
+        except BaseException:
+            outcome = "cancelled"
+            logger.info("Agent turn cancelled, client disconnected")
+            raise
+        finally:
+            TURN_SECONDS.observe(
+                time.perf_counter() - started, path=path, outcome=outcome
+            )
+            span.set_attributes({"path": path, "outcome": outcome})
+
+
+@app.post("/sessions", status_code=201)
+async def create_session(request: CreateSessionRequest) -> SessionResponse:
+    """Create a conversation for `user_id`."""
+    session_service = get_session_service()
+    session_id = request.session_id or str(uuid.uuid4())
+    existing = await session_service.get_session(
+        app_name=APP_NAME, user_id=request.user_id, session_id=session_id
+    )
+    if existing is not None:
+        raise HTTPException(status_code=409, detail="Session already exists")
+    session = await session_service.create_session(
+        app_name=APP_NAME, user_id=request.user_id, session_id=session_id
+    )
+    logger.info(f"Created new session: {session.id}")
+    return SessionResponse(user_id=request.user_id, session_id=session.id)
+
+
+@app.post("/sessions/{session_id}/messages")
+async def post_message(session_id: str, request: MessageRequest) -> StreamingResponse:
+    """Send a user message and stream the agent's reply as Server-Sent Events."""
+    session = await get_session_service().get_session(
+        app_name=APP_NAME, user_id=request.user_id, session_id=session_id
+    )
+    if session is None:
+        raise HTTPException(status_code=404, detail="Session not found")
+    return StreamingResponse(
+        stream_turn(request.user_id, session_id, request.text),
+        media_type="text/event-stream",
+        # Keep proxies from buffering the stream
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@app.post("/calculate")
+async def calculate(request: FireCalculatorInput) -> CalculationResponse:
+    """Calculate a pension plan like `fire_calculator`, without the agent."""
+    message, projection = await calculate_plan(request)
+    return CalculationResponse(message=message, projection=projection)
+
+
+@app.get("/metrics")
+async def metrics() -> PlainTextResponse:
+    """Prometheus metrics of this process."""
+    return PlainTextResponse(render_metrics(), media_type=CONTENT_TYPE)
+
+
+@app.get("/healthz")
+async def healthz() -> dict[str, str]:
+    """Liveness probe."""
+    return {"status": "ok"}
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    uvicorn.run(app, host=settings.API_HOST, port=settings.API_PORT)
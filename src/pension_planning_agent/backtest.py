@@ -0,0 +1,261 @@
+"""
+Historical backtest of FIRE plans over rolling windows of market history.
+
+A deterministic projection grows every balance by the same real return each
+year, which hides sequence-of-returns risk. The backtest replays a plan over
+every rolling window of the bundled annual returns and inflation (one window
+per start year, long enough to reach `engine.END_AGE`) and projects all
+windows in one vectorized engine call.
+
+The dataset is `data/market_history.npy`, a structured NumPy array opened as a
+read-only memory map, so loading it costs no parsing and no copy. It is built
+from the reviewable `data/market_history.csv` (annual total returns of US
+stocks and 10-year Treasury bonds, and US CPI inflation, 1928 onwards):
+
+    python -m pension_planning_agent.backtest  # Rebuild the .npy from the .csv
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+from functools import cache
+from pathlib import Path
+
+import numpy as np
+from loguru import logger
+from pydantic import BaseModel
+
+from pension_planning_agent import engine
+from pension_planning_agent.calculator import build_payload
+from pension_planning_agent.schemas import validate_calculator_input
+from settings import settings
+
+DATA_DIR = Path(__file__).parent / "data"
+DATASET_PATH = DATA_DIR / "market_history.npy"
+DATASET_SOURCE = DATA_DIR / "market_history.csv"
+DATASET_DTYPE = np.dtype(
+    [("year", "<i2"), ("stocks", "<f8"), ("bonds", "<f8"), ("inflation", "<f8")]
+)
+
+
+class BacktestWindow(BaseModel):
+    """Outcome of a plan replayed from one historical start year."""
+
+    start_year: int
+    result: float  # Free funds at age 95
+    depleted_at: int | None  # First age with negative free funds, if any
+
+
+class BacktestResult(BaseModel):
+    """Outcome of a plan over every rolling historical window."""
+
+    windows: int
+    first_year: int  # Start year of the first window
+    last_year: int  # Start year of the last window
+    failure_rate: float  # Share of windows with negative free funds at age 95
+    worst: BacktestWindow
+    median: BacktestWindow
+    best: BacktestWindow
+    elapsed_ms: float
+
+
+def build_dataset(source: Path = DATASET_SOURCE, path: Path = DATASET_PATH) -> None:
+    """
+    Convert the CSV source of the market history into the memory-mapped format.
+
+    Args:
+        source: CSV with `year`, `stocks`, `bonds` and `inflation` columns, as
+            fractions
+        path: `.npy` file to write
+    """
+    rows = np.loadtxt(source, delimiter=",", skiprows=1, ndmin=2)
+    history = np.empty(len(rows), dtype=DATASET_DTYPE)
+    for index, name in enumerate(DATASET_DTYPE.names):
+        history[name] = rows[:, index]
+    if np.any(np.diff(history["year"]) != 1):
+        raise ValueError(f"{source} must have one row per consecutive year")
+    np.save(path, history)
+
+
+@cache
+def load_history(path: str | None = None) -> np.ndarray:
+    """
+    Open the market history as a read-only memory map, once per process.
+
+    Args:
+        path: `.npy` dataset, defaults to `settings.FIRE_BACKTEST_DATASET` or
+            the bundled dataset
+
+    Returns:
+        np.ndarray: Structured array with `year`, `stocks`, `bonds` and
+            `inflation` per year
+    """
+    history = np.load(
+        path or settings.FIRE_BACKTEST_DATASET or DATASET_PATH, mmap_mode="r"
+    )
+    if history.dtype != DATASET_DTYPE:
+        raise ValueError(f"Unexpected market history format: {history.dtype}")
+    return history
+
+
+def rolling_growth(history: np.ndarray, years: int, equity_share: float) -> np.ndarray:
+    """
+    Real growth factors of every rolling window of `years` consecutive years.
+
+    Args:
+        history: Market history, see `load_history`
+        years: Length of each window
+        equity_share: Share of stocks in the portfolio, the rest is bonds,
+            rebalanced every year
+
+    Returns:
+        np.ndarray: (windows, years) view, one row per start year
+    """
+    returns = equity_share * history["stocks"] + (1 - equity_share) * history["bonds"]
+    growth = np.maximum(1 + returns, 0.0) / (1 + history["inflation"])
+    return np.lib.stride_tricks.sliding_window_view(growth, years)
+
+
+def backtest(
+    payload: dict,
+    equity_share: float | None = None,
+    history: np.ndarray | None = None,
+) -> BacktestResult:
+    """
+    Replay a plan over every rolling window of the market history at once.
+
+    Args:
+        payload: BusinessLogic request payload, see `calculator.build_payload`
+        equity_share: Share of stocks in the portfolio, defaults to settings
+        history: Market history, defaults to `load_history()`
+
+    Returns:
+        BacktestResult: Failure rate, and the worst, median and best window
+            by free funds at age 95
+    """
+    started = time.perf_counter()
+    history = load_history() if history is None else history
+    equity_share = (
+        settings.FIRE_BACKTEST_EQUITY_SHARE if equity_share is None else equity_share
+    )
+
+    years = max(int(engine.END_AGE - payload["alder"]), 1)
+    if years > len(history):
+        raise ValueError(
+            f"The market history covers {len(history)} years, "
+            f"the plan needs {years}"
+        )
+    projection = engine.project_batch(
+        **{field: payload[field] for field in engine.PROJECTION_FIELDS},
+        growth=rolling_growth(history, years, equity_share),
+        return_balances=True,
+    )
+    results = projection["result"]
+    free_funds = projection["free_funds"]
+    start_years = history["year"][: len(results)]
+
+    def window(index: int) -> BacktestWindow:
+        negative = np.flatnonzero(free_funds[index] < 0)
+        return BacktestWindow(
+            start_year=int(start_years[index]),
+            result=float(results[index]),
+            depleted_at=int(payload["alder"] + negative[0]) if negative.size else None,
+        )
+
+    order = np.argsort(results, kind="stable")
+    return BacktestResult(
+        windows=len(results),
+        first_year=int(start_years[0]),
+        last_year=int(start_years[-1]),
+        failure_rate=float(np.mean(results < 0)),
+        worst=window(order[0]),
+        median=window(order[(len(order) - 1) // 2]),
+        best=window(order[-1]),
+        elapsed_ms=(time.perf_counter() - started) * 1000,
+    )
+
+
+def format_backtest_result(result: BacktestResult) -> str:
+    """
+    Summarize a backtest for the model.
+
+    Args:
+        result: Backtest outcome
+
+    Returns:
+        str: Failure rate, and the worst, median and best historical window
+    """
+    lines = [
+        f"Share of historical start years {result.first_year}-{result.last_year} "
+        f"where the free funds ran out before age 95: {result.failure_rate:.0%} "
+        f"({result.windows} windows, {result.elapsed_ms:.1f} ms)",
+        "| outcome | start year | free funds at 95 | free funds run out at age |",
+        "|---|---|---|---|",
+    ]
+    for name in ("worst", "median", "best"):
+        window = getattr(result, name)
+        depleted = "-" if window.depleted_at is None else str(window.depleted_at)
+        lines.append(
+            f"| {name} | {window.start_year} | {window.result:,.0f} | {depleted} |"
+        )
+    return "\n".join(lines)
+
+
+async def fire_backtest(
+    manedslon: float,
+    alder: int,
+    pensionInd_ar: float,
+    skat_percentage: float,
+    forbrugsmal_md: float,
+    frie_midler: float,
+    holding_midler: float,
+    rate_and_liv: float,
+    fire_alder: int,
+) -> str:
+    """
+    Test the pension plan against real market history: the plan is replayed
+    with the actual yearly returns and inflation from every historical start
+    year. Use this when the user asks how the plan would have done in past
+    markets, e.g. a crash right after they stop working.
+
+    Args:
+        manedslon: Monthly salary
+        alder: Current age
+        pensionInd_ar: Annual pension contributions
+        skat_percentage: Tax percentage after AMB
+        forbrugsmal_md: Monthly consumption target
+        frie_midler: Initial free funds balance
+        holding_midler: Initial holding balance
+        rate_and_liv: Rate and annuity pension
+        fire_alder: Target FIRE age
+
+    Returns:
+        str: Share of historical start years where the plan failed, and the
+            worst, median and best start year
+    """
+    calculator_input = validate_calculator_input(locals())
+    if isinstance(calculator_input, str):
+        return calculator_input
+
+    try:
+        result = await engine.run_in_thread(
+            backtest, await build_payload(calculator_input)
+        )
+    except Exception as e:
+        logger.error(f"Backtest failed: {e}")
+        return "An unexpected error occurred. Please try again later."
+    logger.info(f"Backtested {result.windows} windows in {result.elapsed_ms:.1f} ms")
+    return format_backtest_result(result)
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Rebuild the market history dataset")
+    parser.add_argument("--source", type=Path, default=DATASET_SOURCE)
+    parser.add_argument("--output", type=Path, default=DATASET_PATH)
+    args = parser.parse_args(argv)
+    build_dataset(args.source, args.output)
+
+
+if __name__ == "__main__":
+    main()
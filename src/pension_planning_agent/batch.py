@@ -0,0 +1,339 @@
+"""
+Bulk FIRE projections for client portfolios, from CSV or Parquet.
+
+Rows are read in chunks, validated with `FireCalculatorInput`, evaluated with
+`scenarios.evaluate_scenarios` (bounded concurrency over the pooled client,
+or one vectorized call of the local engine) and appended to a CSV or JSON
+Lines output in input order. Only one chunk is held in memory, whatever the
+size of the input.
+
+After every chunk the output is flushed and a checkpoint next to it
+(`<output>.checkpoint`) records the rows done and the output size, so an
+interrupted run resumes where it stopped. Run from the `src` directory:
+
+    python -m pension_planning_agent.batch clients.parquet projections.csv
+    python -m pension_planning_agent.batch clients.csv projections.jsonl --backend local
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import csv
+import json
+import os
+import sys
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Iterator
+
+from loguru import logger
+from pydantic import ValidationError
+
+from pension_planning_agent.http_client import http_client_lifespan
+from pension_planning_agent.scenarios import evaluate_scenarios
+from pension_planning_agent.schemas import (
+    FireCalculatorInput,
+    format_validation_error_line,
+)
+from settings import settings
+
+INPUT_FIELDS: tuple[str, ...] = tuple(FireCalculatorInput.model_fields)
+RESULT_COLUMNS = ("opsparing_ar", "result", "engine", "error")
+
+
+@dataclass
+class Checkpoint:
+    """Progress of a batch run, saved after every chunk."""
+
+    input: str
+    rows: int = 0  # Input rows done
+    output_bytes: int = 0  # Output size after those rows
+
+    @classmethod
+    def load(cls, path: Path) -> Checkpoint | None:
+        if not path.exists():
+            return None
+        return cls(**json.loads(path.read_text()))
+
+    def save(self, path: Path) -> None:
+        """Write the checkpoint atomically, so a crash never leaves it torn."""
+        temporary = path.with_suffix(".tmp")
+        temporary.write_text(json.dumps(asdict(self)))
+        os.replace(temporary, path)
+
+
+@dataclass
+class BatchStats:
+    """Summary of a batch run."""
+
+    rows: int = 0  # Rows processed in this run
+    errors: int = 0
+    skipped: int = 0  # Rows done by an earlier, interrupted run
+    seconds: float = 0.0
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.rows / self.seconds if self.seconds else 0.0
+
+
+def read_columns(path: Path) -> list[str]:
+    """
+    Column names of a CSV or Parquet file.
+
+    Args:
+        path: Input file
+
+    Returns:
+        list[str]: Column names in file order
+    """
+    if path.suffix == ".parquet":
+        import pyarrow.parquet as pq
+
+        return pq.ParquetFile(path).schema_arrow.names
+    with path.open(newline="") as file:
+        return next(csv.reader(file), [])
+
+
+def iter_chunks(
+    path: Path, chunk_size: int, skip: int = 0
+) -> Iterator[list[dict[str, Any]]]:
+    """
+    Stream the rows of a CSV or Parquet file in chunks.
+
+    Args:
+        path: Input file
+        chunk_size: Rows per chunk
+        skip: Leading rows to skip, e.g. when resuming
+
+    Yields:
+        list[dict[str, Any]]: Up to `chunk_size` rows keyed by column
+    """
+    if path.suffix == ".parquet":
+        import pyarrow.parquet as pq
+
+        parquet = pq.ParquetFile(path)
+        # Skip whole row groups without reading them
+        row_groups = []
+        for index in range(parquet.num_row_groups):
+            num_rows = parquet.metadata.row_group(index).num_rows
+            if skip >= num_rows and not row_groups:
+                skip -= num_rows
+            else:
+                row_groups.append(index)
+        chunk: list[dict[str, Any]] = []
+        for record_batch in parquet.iter_batches(
+            batch_size=chunk_size, row_groups=row_groups
+        ):
+            rows = record_batch.to_pylist()
+            if skip:
+                rows, skip = rows[skip:], max(skip - len(rows), 0)
+            chunk.extend(rows)
+            while len(chunk) >= chunk_size:
+                yield chunk[:chunk_size]
+                chunk = chunk[chunk_size:]
+        if chunk:
+            yield chunk
+        return
+
+    with path.open(newline="") as file:
+        chunk = []
+        for number, row in enumerate(csv.DictReader(file)):
+            if number < skip:
+                continue
+            chunk.append(row)
+            if len(chunk) == chunk_size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+
+
+async def evaluate_rows(
+    rows: list[dict[str, Any]], concurrency: int
+) -> list[dict[str, Any]]:
+    """
+    Validate and project a chunk of rows.
+
+    Args:
+        rows: Input rows; columns other than the calculator inputs are kept
+        concurrency: Maximum parallel backend calls
+
+    Returns:
+        list[dict[str, Any]]: Each row with `opsparing_ar`, `result`, the
+            `engine` that answered and `error`
+    """
+    results = [
+        {**row, "opsparing_ar": None, "result": None, "engine": None, "error": None}
+        for row in rows
+    ]
+    valid: list[tuple[int, FireCalculatorInput]] = []
+    for index, row in enumerate(rows):
+        fields = {field: row[field] for field in INPUT_FIELDS if field in row}
+        try:
+            valid.append((index, FireCalculatorInput(**fields)))
+        except ValidationError as e:
+            results[index]["error"] = format_validation_error_line(e)
+
+    outcomes = await evaluate_scenarios(
+        [calculator_input for _, calculator_input in valid], concurrency
+    )
+    for (index, _), outcome in zip(valid, outcomes):
+        if isinstance(outcome, Exception):
+            results[index]["error"] = f"{type(outcome).__name__}: {outcome}"
+        else:
+            results[index]["opsparing_ar"] = outcome["opsparing_ar"]
+            results[index]["result"] = outcome["result"]
+            results[index]["engine"] = outcome["engine"]
+    return results
+
+
+class ResultWriter:
+    """Appends result rows to a CSV or JSON Lines file."""
+
+    def __init__(self, path: Path, columns: list[str], resume_at: int | None):
+        """
+        Args:
+            path: Output file, `.csv`, `.jsonl` or `.ndjson`
+            columns: Output columns, in order
+            resume_at: Output size to truncate to and append after, or None to
+                start a new file
+        """
+        if path.suffix not in (".csv", ".jsonl", ".ndjson"):
+            raise ValueError(f"Unsupported output format: {path.suffix}")
+        self.columns = columns
+        self._csv = path.suffix == ".csv"
+        if resume_at is not None:
+            # Drop rows written after the last checkpoint
+            os.truncate(path, resume_at)
+        self._file = path.open("a" if resume_at is not None else "w", newline="")
+        self._writer = csv.DictWriter(self._file, columns) if self._csv else None
+        if self._csv and resume_at is None:
+            self._writer.writeheader()
+
+    def write(self, rows: list[dict[str, Any]]) -> int:
+        """
+        Append rows and flush them to disk.
+
+        Returns:
+            int: Output size in bytes after the rows
+        """
+        for row in rows:
+            if self._writer is not None:
+                self._writer.writerow(row)
+            else:
+                self._file.write(
+                    json.dumps(row, ensure_ascii=False, default=str) + "\n"
+                )
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        return os.fstat(self._file.fileno()).st_size
+
+    def close(self) -> None:
+        self._file.close()
+
+
+async def run_batch(
+    input_path: Path,
+    output_path: Path,
+    concurrency: int | None = None,
+    chunk_size: int | None = None,
+    restart: bool = False,
+) -> BatchStats:
+    """
+    Project every row of `input_path` into `output_path`, resuming if possible.
+
+    Args:
+        input_path: CSV or Parquet file with the `FireCalculatorInput` columns
+        output_path: CSV or JSON Lines file for the results
+        concurrency: Maximum parallel backend calls, defaults to settings
+        chunk_size: Rows per chunk and checkpoint, defaults to settings
+        restart: Ignore an existing checkpoint and start over
+
+    Returns:
+        BatchStats: Rows processed, errors and throughput
+    """
+    concurrency = concurrency or settings.BATCH_CONCURRENCY
+    chunk_size = chunk_size or settings.BATCH_CHUNK_SIZE
+    checkpoint_path = output_path.with_name(output_path.name + ".checkpoint")
+
+    input_name = str(input_path.resolve())
+    checkpoint = None if restart else Checkpoint.load(checkpoint_path)
+    if checkpoint is not None and checkpoint.input != input_name:
+        raise ValueError(
+            f"{checkpoint_path} belongs to {checkpoint.input}, use --restart to start over"
+        )
+    stats = BatchStats(skipped=checkpoint.rows if checkpoint else 0)
+    if checkpoint is None:
+        checkpoint = Checkpoint(input=input_name)
+        resume_at = None
+    else:
+        resume_at = checkpoint.output_bytes
+        logger.info(f"Resuming after {checkpoint.rows} rows")
+
+    columns = read_columns(input_path)
+    columns += [column for column in RESULT_COLUMNS if column not in columns]
+    writer = ResultWriter(output_path, columns, resume_at)
+    started = time.perf_counter()
+    try:
+        async with http_client_lifespan():
+            for chunk in iter_chunks(input_path, chunk_size, skip=checkpoint.rows):
+                results = await evaluate_rows(chunk, concurrency)
+                checkpoint.output_bytes = writer.write(results)
+                checkpoint.rows += len(chunk)
+                checkpoint.save(checkpoint_path)
+
+                stats.rows += len(chunk)
+                stats.errors += sum(1 for row in results if row["error"])
+                stats.seconds = time.perf_counter() - started
+                logger.info(
+                    f"{checkpoint.rows} rows done, "
+                    f"{stats.rows_per_second:,.0f} rows/s, {stats.errors} errors"
+                )
+    finally:
+        writer.close()
+
+    stats.seconds = time.perf_counter() - started
+    checkpoint_path.unlink(missing_ok=True)
+    return stats
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("input", type=Path, help="CSV or Parquet file")
+    parser.add_argument("output", type=Path, help="CSV or JSON Lines file")
+    parser.add_argument(
+        "--backend",
+        choices=("remote", "local", "local-with-remote-verify"),
+        default=None,
+        help="Projection backend, defaults to FIRE_BACKEND",
+    )
+    parser.add_argument("--concurrency", type=int, default=None)
+    parser.add_argument("--chunk-size", type=int, default=None)
+    parser.add_argument(
+        "--restart", action="store_true", help="Ignore an existing checkpoint"
+    )
+    args = parser.parse_args(argv)
+
+    if args.backend:
+        settings.FIRE_BACKEND = args.backend
+    stats = asyncio.run(
+        run_batch(
+            args.input,
+            args.output,
+            concurrency=args.concurrency,
+            chunk_size=args.chunk_size,
+            restart=args.restart,
+        )
+    )
+    print(
+        f"{stats.rows} rows in {stats.seconds:.1f} s "
+        f"({stats.rows_per_second:,.0f} rows/s), {stats.errors} errors"
+        + (f", {stats.skipped} rows done earlier" if stats.skipped else ""),
+        file=sys.stderr,
+    )
+
+
+if __name__ == "__main__":
+    main()
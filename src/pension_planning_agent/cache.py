@@ -0,0 +1,169 @@
+"""In-process TTL/LRU cache with single-flight deduplication."""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable
+
+
+def content_key(data: Any) -> str:
+    """
+    Build a stable content-addressed key for JSON-serializable data.
+
+    Args:
+        data: JSON-serializable value, typically a normalized payload dict
+
+    Returns:
+        str: SHA-256 hex digest of the canonical JSON encoding
+    """
+    encoded = json.dumps(data, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(encoded.encode()).hexdigest()
+
+
+class TTLCache:
+    """
+    Bounded cache whose entries expire after `ttl` seconds and are evicted
+    least-recently-used first once `maxsize` is reached.
+
+    Concurrent `get_or_compute` calls for the same key on the same event loop
+    share a single in-flight computation. The cache is safe to use from the
+    several threads/event loops the ADK runner and Streamlit create.
+    """
+
+    def __init__(
+        self,
+        maxsize: int,
+        ttl: float,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._clock = clock
+        self._entries: OrderedDict[str, tuple[float, Any]] = OrderedDict()
+        self._inflight: dict[tuple[int, str], asyncio.Future] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.coalesced = 0
+
+    def get(self, key: str) -> Any | None:
+        """Return the cached value for `key`, or None if missing or expired."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at <= self._clock():
+                del self._entries[key]
+                self.expirations += 1
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: Any) -> None:
+        """Store `value` under `key`, evicting the least recently used entries."""
+        with self._lock:
+            self._entries[key] = (self._clock() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    async def get_or_compute(
+        self,
+        key: str,
+        compute: Callable[[], Awaitable[Any]],
+        cacheable: Callable[[Any], bool] | None = None,
+    ) -> Any:
+        """
+        Return the cached value for `key` or compute, store and return it.
+
+        Callers awaiting a key that is already being computed on the same event
+        loop wait for that computation instead of starting another one. Failures
+        are propagated to every waiter and are not cached.
+
+        Args:
+            key: Cache key, see `content_key`
+            compute: Coroutine factory producing the value on a miss
+            cacheable: Whether a computed value may be stored; values it
+                rejects are still returned to every waiter
+
+        Returns:
+            Any: Cached or freshly computed value
+        """
+        value = self.get(key)
+        if value is not None:
+            with self._lock:
+                self.hits += 1
+            return value
+
+        inflight_key = (id(asyncio.get_running_loop()), key)
+        with self._lock:
+            future = self._inflight.get(inflight_key)
+            if future is None:
+                self.misses += 1
+                future = asyncio.get_running_loop().create_future()
+                self._inflight[inflight_key] = future
+                owner = True
+            else:
+                self.coalesced += 1
+                owner = False
+
+        if not owner:
+            try:
+                return await asyncio.shield(future)
+            except asyncio.CancelledError:
+                # The owner was cancelled, not us: compute it ourselves
+                if future.cancelled():
+                    return await self.get_or_compute(key, compute, cacheable)
+                raise
+
+        try:
+            value = await compute()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Mark the exception as retrieved when nobody else was waiting
+            future.exception()
+            raise
+        else:
+            if cacheable is None or cacheable(value):
+                self.set(key, value)
+            future.set_result(value)
+            return value
+        finally:
+            with self._lock:
+                self._inflight.pop(inflight_key, None)
+
+    def clear(self) -> None:
+        """Drop all cached entries and reset the counters."""
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = self.evictions = 0
+            self.expirations = self.coalesced = 0
+
+    def stats(self) -> dict[str, int]:
+        """
+        Snapshot of the cache counters.
+
+        Returns:
+            dict[str, int]: Size and hit/miss/eviction/expiration/coalesced counts
+        """
+        with self._lock:
+            return {
+                "size": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "coalesced": self.coalesced,
+            }
@@ -0,0 +1,307 @@
+"""Projection backends for the FIRE calculator: BusinessLogic API or local engine."""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from typing import Awaitable
+
+import httpx
+from loguru import logger
+from opentelemetry import trace
+
+from pension_planning_agent import engine
+from pension_planning_agent.cache import TTLCache, content_key
+from pension_planning_agent.http_client import get_http_client
+from pension_planning_agent.metrics import (
+    BREAKER_REJECTIONS,
+    BREAKER_STATE,
+    CACHE_REQUESTS,
+    HEDGES,
+    HTTP_SECONDS,
+    RETRIES,
+    HttpTimings,
+    timed,
+)
+from pension_planning_agent.resilience import (
+    CircuitBreaker,
+    CircuitOpenError,
+    LatencyTracker,
+    hedge,
+    is_client_error,
+    retry,
+)
+from pension_planning_agent.schemas import FireCalculatorInput
+from settings import settings
+
+FOLKEPENSIONSALDER = 70  # TODO: Calculate based on birth year
+
+# Results keyed on the normalized payload, shared by all sessions in the process
+projection_cache = TTLCache(
+    maxsize=settings.FIRE_CACHE_MAXSIZE, ttl=settings.FIRE_CACHE_TTL
+)
+
+# Latency of successful BusinessLogic calls, for the hedge delay
+remote_latency = LatencyTracker()
+
+BREAKER_STATE_VALUES = {
+    CircuitBreaker.CLOSED: 0,
+    CircuitBreaker.HALF_OPEN: 1,
+    CircuitBreaker.OPEN: 2,
+}
+
+# Shared by all sessions, so an outage is detected once for the whole process
+remote_breaker = CircuitBreaker(
+    error_rate=settings.FIRE_BREAKER_ERROR_RATE,
+    min_requests=settings.FIRE_BREAKER_MIN_REQUESTS,
+    window=settings.FIRE_BREAKER_WINDOW,
+    cooldown=settings.FIRE_BREAKER_COOLDOWN,
+    on_state_change=lambda state: BREAKER_STATE.set(BREAKER_STATE_VALUES[state]),
+)
+BREAKER_STATE.set(0)
+
+# Keep references to fire-and-forget verification tasks so they are not
+# garbage collected before they finish
+_background_tasks: set[asyncio.Task] = set()
+
+
+async def convert_percentage_to_float(percentage: float) -> float:
+    """
+    Convert a percentage string to a float.
+    """
+    return percentage / 100 if percentage > 1 else percentage
+
+
+async def build_payload(calculator_input: FireCalculatorInput) -> dict:
+    """
+    Build the BusinessLogic request payload from validated calculator input.
+
+    Args:
+        calculator_input: Validated calculator input
+
+    Returns:
+        dict: Payload with the tax rate as a fraction and the state pension age
+    """
+    return {
+        "manedslon": calculator_input.manedslon,
+        "alder": calculator_input.alder,
+        "pensionInd_ar": calculator_input.pensionInd_ar,
+        "skat_percentage": await convert_percentage_to_float(
+            calculator_input.skat_percentage
+        ),
+        "forbrugsmal_md": calculator_input.forbrugsmal_md,
+        "frie_midler": calculator_input.frie_midler,
+        "holding_midler": calculator_input.holding_midler,
+        "rate_and_liv": calculator_input.rate_and_liv,
+        "folkepensionsalder": FOLKEPENSIONSALDER,
+        "fire_alder": calculator_input.fire_alder,
+    }
+
+
+async def fetch_remote_projection(payload: dict) -> dict:
+    """
+    Call the BusinessLogic API to calculate the pension plan.
+
+    Args:
+        payload: BusinessLogic request payload
+
+    Returns:
+        dict: API response with `opsparing_ar` and `result`
+
+    Raises:
+        httpx.HTTPError: If the request fails or returns an error status
+    """
+    client = get_http_client()
+    started = time.perf_counter()
+    with timed(HTTP_SECONDS, "businesslogic.execute", phase="total") as span:
+        response = await client.post(
+            settings.BUSINESSLOGIC_URL,
+            headers={
+                "X-Auth-Token": settings.BUSINESSLOGIC_TOKEN,
+                "Content-Type": "application/json",
+            },
+            json=payload,
+            timeout=settings.FIRE_ATTEMPT_TIMEOUT,
+            extensions={"trace": HttpTimings()},
+        )
+        span.set_attribute("http.status_code", response.status_code)
+    elapsed = time.perf_counter() - started
+    logger.info(f"BusinessLogic call took {elapsed * 1000:.1f} ms")
+    response.raise_for_status()
+    remote_latency.record(elapsed)
+    return response.json()
+
+
+def _hedge_delay() -> float | None:
+    """Seconds before a hedged request is sent, or None if hedging is off."""
+    if not settings.FIRE_HEDGE_ENABLED:
+        return None
+    quantile = remote_latency.quantile(
+        settings.FIRE_HEDGE_QUANTILE, settings.FIRE_HEDGE_MIN_SAMPLES
+    )
+    if quantile is None:
+        return None
+    return max(quantile, settings.FIRE_HEDGE_MIN_DELAY)
+
+
+async def _fetch_hedged(payload: dict) -> dict:
+    """One attempt, hedged by a second request once it is slower than usual."""
+    response, winner = await hedge(
+        lambda: fetch_remote_projection(payload), _hedge_delay()
+    )
+    if winner is not None:
+        HEDGES.inc(winner=winner)
+    return response
+
+
+async def _fetch_within_deadline(payload: dict) -> dict:
+    """Retried, hedged attempts, stopped once `FIRE_TOTAL_TIMEOUT` has passed."""
+    try:
+        return await asyncio.wait_for(
+            retry(
+                lambda: _fetch_hedged(payload),
+                attempts=settings.FIRE_RETRY_ATTEMPTS,
+                base_delay=settings.FIRE_RETRY_BACKOFF,
+                max_delay=settings.FIRE_RETRY_MAX_BACKOFF,
+                on_retry=lambda e: RETRIES.inc(reason=type(e).__name__),
+            ),
+            settings.FIRE_TOTAL_TIMEOUT,
+        )
+    # Not the builtin TimeoutError before Python 3.11
+    except asyncio.TimeoutError as e:
+        raise httpx.TimeoutException(
+            f"No BusinessLogic response within {settings.FIRE_TOTAL_TIMEOUT} s"
+        ) from e
+
+
+def _project_locally(payload: dict) -> dict:
+    """Local engine projection, with the trajectory of the same computation."""
+    response, trajectory = engine.project_trajectory(payload)
+    return {**response, "engine": "local", "trajectory": trajectory}
+
+
+async def fetch_resilient_projection(payload: dict) -> dict:
+    """
+    Call the BusinessLogic API with retries, hedging and the circuit breaker.
+
+    The calculation is a pure function of the payload, so repeating the POST
+    is safe. Timeouts, connection errors and 429/502/503/504 responses are
+    retried with jittered exponential backoff, within `FIRE_TOTAL_TIMEOUT`
+    seconds for all attempts together; requests slower than the recent p95
+    latency are hedged (`FIRE_HEDGE_ENABLED`). While the breaker
+    is open, calls fail fast or, with `FIRE_BREAKER_FALLBACK="local"`, are
+    answered by the local engine.
+
+    Args:
+        payload: BusinessLogic request payload
+
+    Returns:
+        dict: Projection with `opsparing_ar`, `result` and the `engine` that
+            answered, "remote" or "local"
+
+    Raises:
+        httpx.HTTPError: If the call still fails after the retries, or
+            `httpx.TimeoutException` once `FIRE_TOTAL_TIMEOUT` has passed
+        CircuitOpenError: If the breaker is open and there is no fallback
+    """
+    if settings.FIRE_BREAKER_ENABLED and not remote_breaker.allow():
+        BREAKER_REJECTIONS.inc(fallback=settings.FIRE_BREAKER_FALLBACK)
+        if settings.FIRE_BREAKER_FALLBACK == "local":
+            logger.warning("BusinessLogic circuit open, using the local engine")
+            return _project_locally(payload)
+        raise CircuitOpenError("BusinessLogic API is unavailable")
+
+    try:
+        response = await _fetch_within_deadline(payload)
+    except Exception as e:
+        if is_client_error(e):
+            # The API is up and rejected this request; not an outage
+            remote_breaker.record_success()
+        else:
+            remote_breaker.record_failure()
+        raise
+    remote_breaker.record_success()
+    return {**response, "engine": "remote"}
+
+
+async def _verify_against_remote(payload: dict, local_response: dict) -> None:
+    """Compare a local projection with the BusinessLogic API and log mismatches."""
+    try:
+        remote_response = await fetch_remote_projection(payload)
+    except Exception as e:
+        logger.warning(f"Remote verification of local projection failed: {e}")
+        return
+
+    for key in ("opsparing_ar", "result"):
+        local_value = local_response[key]
+        remote_value = remote_response.get(key)
+        if remote_value is None:
+            logger.warning(f"Remote verification response is missing '{key}'")
+            continue
+        tolerance = settings.FIRE_VERIFY_TOLERANCE * max(abs(remote_value), 1.0)
+        if abs(local_value - remote_value) > tolerance:
+            logger.warning(
+                f"Local projection differs from BusinessLogic for '{key}': "
+                f"local={local_value:,.0f}, remote={remote_value:,.0f}, payload={payload}"
+            )
+
+
+async def _project(payload: dict) -> dict:
+    """Run the projection backend selected by `settings.FIRE_BACKEND`."""
+    if settings.FIRE_BACKEND == "remote":
+        return await fetch_resilient_projection(payload)
+
+    response = _project_locally(payload)
+    if settings.FIRE_BACKEND == "local-with-remote-verify":
+        task = asyncio.create_task(_verify_against_remote(payload, response))
+        _background_tasks.add(task)
+        task.add_done_callback(_background_tasks.discard)
+    return response
+
+
+async def calculate_projection(calculator_input: FireCalculatorInput) -> dict:
+    """
+    Calculate a projection with the backend selected by `settings.FIRE_BACKEND`.
+
+    - `remote`: BusinessLogic API
+    - `local`: local NumPy engine
+    - `local-with-remote-verify`: local engine, cross-checked against the API in
+      the background without delaying the answer
+
+    Results are cached on the normalized payload (see `projection_cache`), and
+    concurrent identical requests share one backend call. Local answers to a
+    `remote` backend (the open-breaker fallback) are not cached.
+
+    Args:
+        calculator_input: Validated calculator input
+
+    Returns:
+        dict: Projection with `opsparing_ar`, `result` and the `engine` that
+            answered, "remote" or "local"; local answers also carry their
+            `engine.Trajectory` under `trajectory`
+    """
+    payload = await build_payload(calculator_input)
+    span = trace.get_current_span()
+    if not settings.FIRE_CACHE_ENABLED:
+        CACHE_REQUESTS.inc(status="disabled")
+        span.set_attribute("cache.status", "disabled")
+        return await _project(payload)
+
+    computed = False
+
+    def compute() -> Awaitable[dict]:
+        nonlocal computed
+        computed = True
+        return _project(payload)
+
+    configured_engine = "remote" if settings.FIRE_BACKEND == "remote" else "local"
+    key = content_key({"backend": settings.FIRE_BACKEND, **payload})
+    response = await projection_cache.get_or_compute(
+        key, compute, cacheable=lambda value: value["engine"] == configured_engine
+    )
+    # Joining another caller's in-flight computation counts as a hit
+    status = "miss" if computed else "hit"
+    CACHE_REQUESTS.inc(status=status)
+    span.set_attribute("cache.status", status)
+    logger.debug(f"Projection cache stats: {projection_cache.stats()}")
+    return dict(response)
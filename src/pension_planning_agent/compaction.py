@@ -0,0 +1,176 @@
+"""Conversation history compaction ahead of each model call."""
+
+from __future__ import annotations
+
+import json
+
+from google.adk.agents.callback_context import CallbackContext
+from google.adk.models import LlmRequest, LlmResponse
+from google.genai import types
+from loguru import logger
+
+from pension_planning_agent.schemas import FireCalculatorInput
+from settings import settings
+
+INPUT_FIELDS: tuple[str, ...] = tuple(FireCalculatorInput.model_fields)
+
+
+def estimate_tokens(contents: list[types.Content]) -> int:
+    """
+    Roughly estimate the prompt tokens of `contents` (about 4 characters per token).
+
+    Args:
+        contents: Conversation contents
+
+    Returns:
+        int: Estimated token count
+    """
+    chars = 0
+    for content in contents:
+        for part in content.parts or []:
+            if part.text:
+                chars += len(part.text)
+            if part.function_call:
+                chars += len(json.dumps(part.function_call.args or {}, default=str))
+            if part.function_response:
+                chars += len(
+                    json.dumps(part.function_response.response or {}, default=str)
+                )
+    return chars // 4
+
+
+def _is_user_message(content: types.Content) -> bool:
+    """Check whether `content` is a user message, as opposed to a tool response."""
+    return content.role == "user" and any(part.text for part in content.parts or [])
+
+
+def turn_starts(contents: list[types.Content]) -> list[int]:
+    """
+    Indices of the contents that start a turn, i.e. user messages.
+
+    Args:
+        contents: Conversation contents
+
+    Returns:
+        list[int]: Index of every user message
+    """
+    return [i for i, content in enumerate(contents) if _is_user_message(content)]
+
+
+def summarize_contents(contents: list[types.Content]) -> str:
+    """
+    Fold earlier turns into a structured summary of the FIRE inputs the user gave
+    and the latest result of every tool.
+
+    Tool calls carry the inputs in structured form, so the latest value of each
+    `FireCalculatorInput` field is taken from their arguments. User messages are
+    kept as short excerpts, since they may contain inputs not yet passed to a
+    tool.
+
+    Args:
+        contents: Conversation contents to summarize
+
+    Returns:
+        str: Summary text
+    """
+    inputs: dict[str, object] = {}
+    results: dict[str, str] = {}
+    excerpts: list[str] = []
+    limit = settings.COMPACTION_EXCERPT_CHARS
+
+    for content in contents:
+        for part in content.parts or []:
+            if part.function_call:
+                args = part.function_call.args or {}
+                inputs.update({k: v for k, v in args.items() if k in INPUT_FIELDS})
+            elif part.function_response:
+                response = part.function_response.response or {}
+                text = str(response.get("result", response))
+                results[part.function_response.name] = text[:limit]
+            elif part.text and _is_user_message(content):
+                text = " ".join(part.text.split())
+                excerpts.append(text if len(text) <= limit else text[:limit] + "…")
+
+    lines = ["Summary of the earlier conversation (older messages were compacted):"]
+    if inputs:
+        lines.append(
+            "FIRE inputs collected: "
+            + ", ".join(f"{f}={inputs[f]}" for f in INPUT_FIELDS if f in inputs)
+        )
+    for name, text in results.items():
+        lines.append(f"Latest {name} result: {text}")
+    if excerpts:
+        lines.append("Earlier user messages:")
+        lines.extend(f"- {excerpt}" for excerpt in excerpts)
+    return "\n".join(lines)
+
+
+def compact_contents(
+    contents: list[types.Content],
+    keep_turns: int | None = None,
+    min_tokens: int | None = None,
+) -> tuple[list[types.Content], int]:
+    """
+    Replace all but the last `keep_turns` turns with a summary once the history
+    exceeds `min_tokens` estimated tokens.
+
+    The summary is prepended to the first kept user message, so roles keep
+    alternating and no tool call is separated from its response.
+
+    Args:
+        contents: Conversation contents, oldest first
+        keep_turns: Turns kept verbatim, defaults to settings
+        min_tokens: Estimated history size that triggers compaction, defaults to
+            settings
+
+    Returns:
+        tuple[list[types.Content], int]: Compacted contents and the estimated
+            tokens saved (0 if nothing was compacted)
+    """
+    keep_turns = keep_turns or settings.COMPACTION_KEEP_TURNS
+    min_tokens = settings.COMPACTION_MIN_TOKENS if min_tokens is None else min_tokens
+
+    starts = turn_starts(contents)
+    if len(starts) <= keep_turns:
+        return contents, 0
+    before = estimate_tokens(contents)
+    if before < min_tokens:
+        return contents, 0
+
+    cut = starts[-keep_turns]
+    first_kept = contents[cut]
+    summary = types.Part(text=summarize_contents(contents[:cut]))
+    compacted = [
+        types.Content(role="user", parts=[summary, *first_kept.parts]),
+        *contents[cut + 1 :],
+    ]
+    return compacted, before - estimate_tokens(compacted)
+
+
+def compact_history(
+    callback_context: CallbackContext, llm_request: LlmRequest
+) -> LlmResponse | None:
+    """
+    Agent `before_model_callback` that compacts the request history in place.
+
+    Only the outgoing request is changed; the session keeps the full history.
+
+    Args:
+        callback_context: ADK callback context
+        llm_request: Request about to be sent to the model
+
+    Returns:
+        None: The model call always proceeds
+    """
+    if not settings.COMPACTION_ENABLED:
+        return None
+
+    contents, saved = compact_contents(llm_request.contents)
+    if saved > 0:
+        logger.info(
+            f"Compacted {len(llm_request.contents) - len(contents) + 1} messages "
+            f"of session {callback_context.session.id}, "
+            f"saving ~{saved} tokens"
+        )
+        llm_request.contents = contents
+    return None
@@ -0,0 +1,418 @@
+"""Local, vectorized FIRE projection engine.
+
+A NumPy re-implementation of the BusinessLogic projection used by `fire_calculator`.
+All amounts are in today's DKK (real terms), and the projection runs year by year
+from the current age to `END_AGE`:
+
+- While working, the annual savings (`opsparing_ar`) go to free funds and
+  `pensionInd_ar` goes to the pension.
+- After the FIRE age the yearly consumption target is withdrawn from free funds.
+- From the state pension age the pension is paid out as an annuity until
+  `END_AGE`, and the state pension (folkepension) is added. Both are taxed.
+- Free funds (including holding funds) and pension grow with `RETURN_RATE`.
+
+`result` is the free funds balance at `END_AGE`.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from dataclasses import dataclass, fields
+from typing import Any, Callable, Mapping, TypeVar
+
+import numpy as np
+from numpy.typing import ArrayLike
+
+END_AGE = 95
+AM_BIDRAG = 0.08  # Labour market contribution
+RETURN_RATE = 0.0214  # Real annual return, not yet checked against the API (parity.py)
+FOLKEPENSION_AR = 84_000.0  # Annual state pension basic amount before tax
+
+T = TypeVar("T")
+
+PROJECTION_FIELDS = (
+    "manedslon",
+    "alder",
+    "pensionInd_ar",
+    "skat_percentage",
+    "forbrugsmal_md",
+    "frie_midler",
+    "holding_midler",
+    "rate_and_liv",
+    "folkepensionsalder",
+    "fire_alder",
+)
+
+
+def annual_savings(
+    manedslon: ArrayLike,
+    pensionInd_ar: ArrayLike,
+    skat_percentage: ArrayLike,
+    forbrugsmal_md: ArrayLike,
+) -> np.ndarray:
+    """
+    Calculate the yearly amount saved in free funds while working.
+
+    Args:
+        manedslon: Monthly salary
+        pensionInd_ar: Annual pension contributions
+        skat_percentage: Tax rate as a fraction (0.33 for 33%)
+        forbrugsmal_md: Monthly consumption target
+
+    Returns:
+        np.ndarray: Annual savings after AM-bidrag, pension, tax and consumption
+    """
+    manedslon, pensionInd_ar, skat_percentage, forbrugsmal_md = (
+        np.asarray(value, dtype=float)
+        for value in (manedslon, pensionInd_ar, skat_percentage, forbrugsmal_md)
+    )
+    net_income = (manedslon * 12 * (1 - AM_BIDRAG) - pensionInd_ar) * (
+        1 - skat_percentage
+    )
+    return net_income - forbrugsmal_md * 12
+
+
+def _accumulate(
+    initial: np.ndarray, flows: np.ndarray, growth: np.ndarray
+) -> np.ndarray:
+    """
+    Roll balances forward where each year's flow is added before growth is applied.
+
+    Solves `b[k + 1] = (b[k] + flows[k]) * growth[k]` for all years at once using
+    cumulative products and sums instead of a Python loop.
+
+    Args:
+        initial: Starting balances, shape (n, 1)
+        flows: Yearly flows, shape (n, years)
+        growth: Yearly growth factors, broadcastable with `flows`
+
+    Returns:
+        np.ndarray: Balances at the start of each year and after the last one,
+            shape (n, years + 1) broadcast with `growth`
+    """
+    shape = np.broadcast_shapes(flows.shape, growth.shape)
+    flows = np.broadcast_to(flows, shape)
+    growth = np.broadcast_to(growth, shape)
+    cumulative = np.cumprod(growth, axis=-1)
+    factors = np.concatenate([np.ones_like(cumulative[..., :1]), cumulative], axis=-1)
+    discounted = np.cumsum(flows / factors[..., :-1], axis=-1)
+    discounted = np.concatenate(
+        [np.zeros_like(discounted[..., :1]), discounted], axis=-1
+    )
+    return factors * (initial + discounted)
+
+
+def _annuity_factor(years: np.ndarray, rate: float) -> np.ndarray:
+    """Present value of 1 kr paid at the start of each of `years` years."""
+    years = np.maximum(years, 0)
+    if rate == 0:
+        return years.astype(float)
+    return (1 - (1 + rate) ** -years) * (1 + rate) / rate
+
+
+def project_batch(
+    *,
+    manedslon: ArrayLike,
+    alder: ArrayLike,
+    pensionInd_ar: ArrayLike,
+    skat_percentage: ArrayLike,
+    forbrugsmal_md: ArrayLike,
+    frie_midler: ArrayLike,
+    holding_midler: ArrayLike,
+    rate_and_liv: ArrayLike,
+    folkepensionsalder: ArrayLike,
+    fire_alder: ArrayLike,
+    growth: ArrayLike | None = None,
+    return_balances: bool = False,
+    return_trajectory: bool = False,
+) -> dict[str, np.ndarray]:
+    """
+    Project many scenarios at once.
+
+    Every input argument is a scalar or a 1-D array; they are broadcast against
+    each other, so each position describes one scenario. Arguments mirror the
+    BusinessLogic payload, i.e. `skat_percentage` is a fraction.
+
+    Args:
+        growth: Optional yearly real growth factors (1 + return) replacing the
+            fixed `RETURN_RATE`, with one column per year from the youngest
+            `alder`. A (paths, years) array with a single scenario simulates
+            that scenario along every path.
+        return_balances: Also return the yearly free funds balances
+        return_trajectory: Also return the yearly free funds, `holding` and
+            `pension` balances and the `contributions`, `withdrawals` and
+            `pension_payout` flows of each year, see `Trajectory`
+
+    Returns:
+        dict[str, np.ndarray]: `opsparing_ar` and `result` per scenario (or
+            path), plus `free_funds` balances (including holding) from `alder`
+            to `END_AGE` when `return_balances` or `return_trajectory` is set
+    """
+    (
+        manedslon,
+        alder,
+        pensionInd_ar,
+        skat_percentage,
+        forbrugsmal_md,
+        frie_midler,
+        holding_midler,
+        rate_and_liv,
+        folkepensionsalder,
+        fire_alder,
+    ) = (
+        np.atleast_1d(np.asarray(value, dtype=float))[:, np.newaxis]
+        for value in np.broadcast_arrays(
+            manedslon,
+            alder,
+            pensionInd_ar,
+            skat_percentage,
+            forbrugsmal_md,
+            frie_midler,
+            holding_midler,
+            rate_and_liv,
+            folkepensionsalder,
+            fire_alder,
+        )
+    )
+
+    years = max(int(END_AGE - alder.min()), 1)
+    ages = alder + np.arange(years)
+    active = ages < END_AGE
+    working = active & (ages < fire_alder)
+    retired = active & ~working
+    growth = np.where(
+        active, 1 + RETURN_RATE if growth is None else np.asarray(growth), 1.0
+    )
+
+    # Pension balance until payouts start, then a level annuity until END_AGE
+    payout_start = np.maximum(folkepensionsalder, alder)
+    in_payout = active & (ages >= payout_start)
+    pension = _accumulate(rate_and_liv, np.where(working, pensionInd_ar, 0.0), growth)
+    payout_index = np.clip(payout_start - alder, 0, years).astype(int)
+    pension_at_payout = np.take_along_axis(pension, payout_index, axis=-1)
+    payout = pension_at_payout / np.maximum(
+        _annuity_factor(END_AGE - payout_start, RETURN_RATE), 1.0
+    )
+
+    opsparing_ar = annual_savings(
+        manedslon, pensionInd_ar, skat_percentage, forbrugsmal_md
+    )
+    free_flows = (
+        np.where(working, opsparing_ar, 0.0)
+        - np.where(retired, forbrugsmal_md * 12, 0.0)
+        + np.where(in_payout, (payout + FOLKEPENSION_AR) * (1 - skat_percentage), 0.0)
+    )
+    free = _accumulate(frie_midler + holding_midler, free_flows, growth)
+
+    projection = {
+        "opsparing_ar": np.broadcast_to(opsparing_ar[:, 0], free.shape[:1]),
+        "result": free[:, -1],
+    }
+    if return_balances or return_trajectory:
+        projection["free_funds"] = free
+    if return_trajectory:
+        # Flows of the year starting at each age; none in the END_AGE row
+        def by_age(flows: np.ndarray) -> np.ndarray:
+            flows = np.broadcast_to(flows, free_flows.shape)
+            return np.concatenate([flows, np.zeros_like(flows[:, :1])], axis=-1)
+
+        projection["holding"] = _accumulate(
+            holding_midler, np.zeros_like(free_flows), growth
+        )
+        projection["pension"] = _accumulate(
+            rate_and_liv,
+            np.where(working, pensionInd_ar, 0.0) - np.where(in_payout, payout, 0.0),
+            growth,
+        )
+        projection["contributions"] = by_age(
+            np.where(working, opsparing_ar + pensionInd_ar, 0.0)
+        )
+        projection["withdrawals"] = by_age(np.where(retired, forbrugsmal_md * 12, 0.0))
+        projection["pension_payout"] = by_age(
+            np.where(in_payout, (payout + FOLKEPENSION_AR) * (1 - skat_percentage), 0.0)
+        )
+    return projection
+
+
+def project(payload: Mapping[str, float]) -> dict[str, float]:
+    """
+    Project a single scenario.
+
+    Args:
+        payload: BusinessLogic request payload with all `PROJECTION_FIELDS`
+
+    Returns:
+        dict[str, float]: Same shape as the BusinessLogic response,
+            `opsparing_ar` and `result`
+    """
+    projection = project_batch(**{field: payload[field] for field in PROJECTION_FIELDS})
+    return {key: float(values[0]) for key, values in projection.items()}
+
+
+@dataclass(frozen=True)
+class Trajectory:
+    """
+    Year-by-year projection of one scenario, one read-only NumPy array per column.
+
+    Row `i` is the start of the year at `age[i]`, from the current age to
+    `END_AGE`. Balances are at the start of the year, flows are paid during it.
+    `free_funds + holding` at `END_AGE` is the projection's `result`.
+
+    Attributes:
+        age: Age at the start of the year
+        free_funds: Free funds balance, excluding holding
+        holding: Holding company balance
+        pension: Rate and annuity pension balance, paid out from the state
+            pension age
+        contributions: Saved in free funds plus paid into the pension, while
+            working
+        withdrawals: Consumption withdrawn from free funds, after the FIRE age
+        pension_payout: Pension annuity and state pension after tax, from the
+            state pension age
+    """
+
+    age: np.ndarray
+    free_funds: np.ndarray
+    holding: np.ndarray
+    pension: np.ndarray
+    contributions: np.ndarray
+    withdrawals: np.ndarray
+    pension_payout: np.ndarray
+
+    def __post_init__(self) -> None:
+        for column in fields(self):
+            getattr(self, column.name).setflags(write=False)
+
+    def __len__(self) -> int:
+        return len(self.age)
+
+    @classmethod
+    def from_columns(cls, columns: Mapping[str, Any]) -> Trajectory:
+        """
+        Rebuild a trajectory from `to_columns` output.
+
+        Args:
+            columns: Column name to values
+
+        Returns:
+            Trajectory: The trajectory
+        """
+        return cls(
+            age=np.asarray(columns["age"], dtype=np.int16),
+            **{
+                column: np.asarray(columns[column], dtype=float)
+                for column in TRAJECTORY_COLUMNS[1:]
+            },
+        )
+
+    def to_columns(self) -> dict[str, list[int]]:
+        """
+        JSON-ready columns, with amounts rounded to whole DKK.
+
+        Returns:
+            dict[str, list[int]]: Column name to values, in `TRAJECTORY_COLUMNS`
+                order
+        """
+        return {
+            column: np.rint(getattr(self, column)).astype(np.int64).tolist()
+            for column in TRAJECTORY_COLUMNS
+        }
+
+    def to_arrow(self) -> Any:
+        """
+        Arrow record batch sharing the NumPy buffers. Requires `pyarrow`.
+
+        Returns:
+            pyarrow.RecordBatch: One column per field
+        """
+        import pyarrow as pa
+
+        return pa.RecordBatch.from_arrays(
+            [pa.array(getattr(self, column)) for column in TRAJECTORY_COLUMNS],
+            names=list(TRAJECTORY_COLUMNS),
+        )
+
+    def at(self, age: int) -> dict[str, float]:
+        """
+        Row of the year starting at `age`.
+
+        Args:
+            age: Age between the first age and `END_AGE`
+
+        Returns:
+            dict[str, float]: Value of every column
+
+        Raises:
+            KeyError: If `age` is outside the trajectory
+        """
+        index = int(age) - int(self.age[0])
+        if not 0 <= index < len(self):
+            raise KeyError(age)
+        return {
+            column: getattr(self, column)[index].item() for column in TRAJECTORY_COLUMNS
+        }
+
+
+TRAJECTORY_COLUMNS = tuple(column.name for column in fields(Trajectory))
+
+
+def project_trajectory(
+    payload: Mapping[str, float],
+) -> tuple[dict[str, float], Trajectory]:
+    """
+    Project a single scenario and its year-by-year trajectory in one computation.
+
+    Args:
+        payload: BusinessLogic request payload with all `PROJECTION_FIELDS`
+
+    Returns:
+        tuple[dict[str, float], Trajectory]: `project` output, and balances and
+            flows from `alder` to `END_AGE` ending at its `result`
+    """
+    projection = project_batch(
+        **{field: payload[field] for field in PROJECTION_FIELDS},
+        return_trajectory=True,
+    )
+    alder = int(payload["alder"])
+    years = projection["free_funds"].shape[1]
+    trajectory = Trajectory(
+        age=np.arange(alder, alder + years, dtype=np.int16),
+        free_funds=projection["free_funds"][0] - projection["holding"][0],
+        **{
+            column: projection[column][0]
+            for column in ("holding", "pension", "contributions", "withdrawals")
+        },
+        pension_payout=projection["pension_payout"][0],
+    )
+    totals = {key: float(projection[key][0]) for key in ("opsparing_ar", "result")}
+    return totals, trajectory
+
+
+def trajectory(payload: Mapping[str, float]) -> Trajectory:
+    """
+    Project a single scenario year by year.
+
+    Args:
+        payload: BusinessLogic request payload with all `PROJECTION_FIELDS`
+
+    Returns:
+        Trajectory: Balances and flows from `alder` to `END_AGE`
+    """
+    return project_trajectory(payload)[1]
+
+
+async def run_in_thread(func: Callable[..., T], *args: Any) -> T:
+    """
+    Run a NumPy-heavy computation in a worker thread.
+
+    NumPy releases the GIL, so this keeps the event loop free for other
+    sessions while large batches are projected.
+
+    Args:
+        func: Function to call
+        *args: Arguments of `func`
+
+    Returns:
+        T: Return value of `func`
+    """
+    return await asyncio.to_thread(func, *args)
@@ -0,0 +1,186 @@
+"""Deterministic fast path for fully structured calculator input, without the LLM."""
+
+from __future__ import annotations
+
+import json
+import re
+import time
+import uuid
+
+from loguru import logger
+from pydantic import ValidationError
+
+from pension_planning_agent.agent import (
+    AGENT_NAME,
+    APP_NAME,
+    calculate_plan,
+    get_session_service,
+)
+from pension_planning_agent.schemas import FireCalculatorInput, FireCalculatorOutput
+from pension_planning_agent.trajectory import TRAJECTORY_STATE_KEY, trajectory_state
+
+INPUT_FIELDS: tuple[str, ...] = tuple(FireCalculatorInput.model_fields)
+
+# `name=value` or `name: value` with a plain number (no thousands separators)
+PAIR_PATTERN = re.compile(r"(\w+)\s*[=:]\s*(-?\d+(?:\.\d+)?)(?![\d.,]*\d)")
+# "75.700" is 75,700 DKK in Danish notation but 75.7 in English
+THOUSANDS_PATTERN = re.compile(r"-?\d{1,3}(?:\.\d{3})+")
+SEPARATORS = " \t\r\n,;"
+
+
+def _pairs_from_text(text: str) -> list[tuple[str, object]] | None:
+    """Parse JSON or key=value text into pairs, or None if it is anything else."""
+    if text.startswith("{"):
+        try:
+            data = json.loads(text)
+        except json.JSONDecodeError:
+            return None
+        return list(data.items()) if isinstance(data, dict) else None
+
+    pairs = []
+    position = 0
+    for match in PAIR_PATTERN.finditer(text):
+        # Any other words mean the user is also asking or explaining something
+        if text[position : match.start()].strip(SEPARATORS):
+            return None
+        pairs.append((match[1], match[2]))
+        position = match.end()
+    if text[position:].strip(SEPARATORS):
+        return None
+    return pairs
+
+
+def parse_structured_input(text: str) -> dict[str, float] | None:
+    """
+    Extract calculator inputs from a message made up only of structured values.
+
+    Accepts a JSON object or `key=value` pairs separated by commas, semicolons
+    or newlines, e.g. `manedslon=75700, alder=52, ..., fire_alder=62`.
+
+    Args:
+        text: User message
+
+    Returns:
+        dict[str, float] | None: Value for every `FireCalculatorInput` field, or
+            None if a field is missing, unknown, given twice with different
+            values, not a plain number (e.g. "75.700"), or the message
+            contains other text
+    """
+    pairs = _pairs_from_text(text.strip())
+    if not pairs:
+        return None
+
+    values: dict[str, float] = {}
+    for key, value in pairs:
+        if key not in INPUT_FIELDS or isinstance(value, bool):
+            return None
+        if isinstance(value, str) and THOUSANDS_PATTERN.fullmatch(value):
+            return None
+        try:
+            number = float(value)
+        except (TypeError, ValueError):
+            return None
+        if values.get(key, number) != number:
+            return None
+        values[key] = number
+
+    if set(values) != set(INPUT_FIELDS):
+        return None
+    return values
+
+
+async def calculate_structured_input(
+    text: str,
+) -> tuple[str, FireCalculatorOutput | None] | None:
+    """
+    Calculate a fully structured message directly, like `fire_calculator`.
+
+    Args:
+        text: User message
+
+    Returns:
+        tuple[str, FireCalculatorOutput | None] | None: The calculator's final
+            message and output (None if the calculation failed), or None if
+            the message should go to the agent instead
+    """
+    values = parse_structured_input(text)
+    if values is None:
+        return None
+    try:
+        calculator_input = FireCalculatorInput(**values)
+    except ValidationError as e:
+        # Let the agent explain invalid values to the user
+        logger.debug(f"Fast path skipped, invalid input: {e.error_count()} errors")
+        return None
+    return await calculate_plan(calculator_input)
+
+
+async def answer_structured_input(text: str) -> str | None:
+    """
+    Answer a fully structured message directly with `fire_calculator`.
+
+    Args:
+        text: User message
+
+    Returns:
+        str | None: The calculator's final message, or None if the message
+            should go to the agent instead
+    """
+    answer = await calculate_structured_input(text)
+    return answer[0] if answer is not None else None
+
+
+async def run_fast_path(user_id: str, session_id: str, text: str) -> str | None:
+    """
+    Pre-router in front of the runner: answer structured input without a model
+    call and record the exchange in the session, so the agent can refer to it
+    in later turns.
+
+    Args:
+        user_id: ADK user ID
+        session_id: ADK session ID
+        text: User message
+
+    Returns:
+        str | None: The reply, or None if the message must go through the runner
+    """
+    started = time.perf_counter()
+    answer = await calculate_structured_input(text)
+    if answer is None:
+        return None
+    reply, output = answer
+
+    session_service = get_session_service()
+    session = await session_service.get_session(
+        app_name=APP_NAME, user_id=user_id, session_id=session_id
+    )
+    if session is not None:
+        from google.adk.events import Event, EventActions
+        from google.genai import types
+
+        invocation_id = f"fast-{uuid.uuid4()}"
+        for author, role, message, state_delta in (
+            ("user", "user", text, {}),
+            (
+                AGENT_NAME,
+                "model",
+                reply,
+                # Stored like `fire_calculator` does, for follow-up questions
+                {TRAJECTORY_STATE_KEY: trajectory_state(output)} if output else {},
+            ),
+        ):
+            await session_service.append_event(
+                session,
+                Event(
+                    invocation_id=invocation_id,
+                    author=author,
+                    content=types.Content(role=role, parts=[types.Part(text=message)]),
+                    actions=EventActions(state_delta=state_delta),
+                ),
+            )
+
+    logger.info(
+        f"Answered structured input without the LLM in "
+        f"{(time.perf_counter() - started) * 1000:.1f} ms"
+    )
+    return reply
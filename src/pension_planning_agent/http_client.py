@@ -0,0 +1,95 @@
+"""Pooled, long-lived HTTP client for the BusinessLogic API."""
+
+from __future__ import annotations
+
+import asyncio
+import weakref
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+
+import httpx
+from loguru import logger
+
+from settings import settings
+
+# httpx connection pools are bound to the event loop that opened them, and both
+# Streamlit (one `asyncio.run` per rerun) and the ADK runner (one loop per
+# worker thread) create several loops per process. Keep one client per loop so
+# connections are reused within a loop and never shared across loops.
+_clients: weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient] = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def _http2_available() -> bool:
+    """Check whether the optional `h2` package needed for HTTP/2 is installed."""
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def create_http_client() -> httpx.AsyncClient:
+    """
+    Create a new pooled HTTP client configured from `settings`.
+
+    Returns:
+        httpx.AsyncClient: Client with keep-alive connection pooling
+    """
+    http2 = settings.HTTP_HTTP2 and _http2_available()
+    if settings.HTTP_HTTP2 and not http2:
+        logger.warning(
+            "HTTP/2 requested but the 'h2' package is not installed, using HTTP/1.1"
+        )
+
+    return httpx.AsyncClient(
+        timeout=settings.HTTP_TIMEOUT,
+        limits=httpx.Limits(
+            max_connections=settings.HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.HTTP_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=settings.HTTP_KEEPALIVE_EXPIRY,
+        ),
+        http2=http2,
+    )
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """
+    Get the shared HTTP client for the running event loop, creating it on first use.
+
+    Returns:
+        httpx.AsyncClient: Long-lived client reused across calls on this loop
+    """
+    loop = asyncio.get_running_loop()
+    client = _clients.get(loop)
+    if client is None or client.is_closed:
+        client = create_http_client()
+        _clients[loop] = client
+        logger.debug(f"Created pooled HTTP client for event loop {id(loop)}")
+    return client
+
+
+async def close_http_client() -> None:
+    """Close the shared HTTP client of the running event loop, if any."""
+    client = _clients.pop(asyncio.get_running_loop(), None)
+    if client is not None and not client.is_closed:
+        await client.aclose()
+        logger.debug("Closed pooled HTTP client")
+
+
+@asynccontextmanager
+async def http_client_lifespan() -> AsyncIterator[httpx.AsyncClient]:
+    """
+    Open the shared HTTP client for the duration of the block and close it afterwards.
+
+    Intended as a startup/shutdown hook for long-running services.
+
+    Yields:
+        httpx.AsyncClient: The shared client for the running event loop
+    """
+    client = get_http_client()
+    try:
+        yield client
+    finally:
+        await close_http_client()
@@ -0,0 +1,144 @@
+"""ADK plugin recording model and tool latency and token usage in `metrics`."""
+
+from __future__ import annotations
+
+import time
+from typing import Any, Optional
+
+from google.adk.agents.callback_context import CallbackContext
+from google.adk.models import LlmRequest, LlmResponse
+from google.adk.plugins.base_plugin import BasePlugin
+from google.adk.tools.base_tool import BaseTool
+from google.adk.tools.tool_context import ToolContext
+
+from pension_planning_agent.metrics import LLM_SECONDS, LLM_TOKENS, TOOL_SECONDS
+from settings import settings
+
+# Calls in flight that are tracked at most; a cancelled turn skips every
+# callback that would remove its calls, so the oldest are dropped beyond this
+MAX_PENDING_CALLS = 1024
+
+
+class MetricsPlugin(BasePlugin):
+    """
+    Times every model request and tool call of the runner.
+
+    ADK already traces both as OpenTelemetry spans (`call_llm`,
+    `execute_tool`); this adds the Prometheus/OpenTelemetry metrics. A model
+    request is timed from the before-model callback to its final (non-partial)
+    response, so streamed replies are measured until the last chunk.
+
+    Calls are forgotten when they finish or fail, when their invocation ends
+    and, for cancelled turns, once more than `MAX_PENDING_CALLS` are pending.
+    """
+
+    def __init__(self, name: str = "metrics"):
+        super().__init__(name)
+        # Start time and model per invocation (one model request at a time) and
+        # invocation and start time per function call ID (tools may run in
+        # parallel), oldest first
+        self._model_calls: dict[str, tuple[float, str]] = {}
+        self._tool_calls: dict[str, tuple[str, float]] = {}
+
+    @staticmethod
+    def _track(calls: dict, key: str, value: Any) -> None:
+        """Start tracking a call, dropping the oldest beyond `MAX_PENDING_CALLS`."""
+        calls.pop(key, None)
+        calls[key] = value
+        while len(calls) > MAX_PENDING_CALLS:
+            del calls[next(iter(calls))]
+
+    async def before_model_callback(
+        self, *, callback_context: CallbackContext, llm_request: LlmRequest
+    ) -> Optional[LlmResponse]:
+        model = llm_request.model or settings.LLM_MODEL
+        self._track(
+            self._model_calls,
+            callback_context.invocation_id,
+            (time.perf_counter(), model),
+        )
+        return None
+
+    async def after_model_callback(
+        self, *, callback_context: CallbackContext, llm_response: LlmResponse
+    ) -> Optional[LlmResponse]:
+        if llm_response.partial:
+            return None
+        call = self._model_calls.pop(callback_context.invocation_id, None)
+        if call is None:
+            return None
+        started, model = call
+        # The model that actually answered, when the request was routed
+        model = (llm_response.custom_metadata or {}).get("model", model)
+        outcome = "error" if llm_response.error_code else "ok"
+        LLM_SECONDS.observe(time.perf_counter() - started, model=model, outcome=outcome)
+        usage = llm_response.usage_metadata
+        if usage is not None:
+            LLM_TOKENS.inc(usage.prompt_token_count or 0, model=model, kind="prompt")
+            LLM_TOKENS.inc(
+                usage.candidates_token_count or 0, model=model, kind="completion"
+            )
+        return None
+
+    async def on_model_error_callback(
+        self,
+        *,
+        callback_context: CallbackContext,
+        llm_request: LlmRequest,
+        error: Exception,
+    ) -> Optional[LlmResponse]:
+        call = self._model_calls.pop(callback_context.invocation_id, None)
+        if call is not None:
+            started, model = call
+            LLM_SECONDS.observe(
+                time.perf_counter() - started, model=model, outcome="error"
+            )
+        return None
+
+    async def before_tool_callback(
+        self, *, tool: BaseTool, tool_args: dict[str, Any], tool_context: ToolContext
+    ) -> Optional[dict]:
+        self._track(
+            self._tool_calls,
+            tool_context.function_call_id,
+            (tool_context.invocation_id, time.perf_counter()),
+        )
+        return None
+
+    async def after_tool_callback(
+        self,
+        *,
+        tool: BaseTool,
+        tool_args: dict[str, Any],
+        tool_context: ToolContext,
+        result: dict,
+    ) -> Optional[dict]:
+        self._finish_tool(tool, tool_context, "ok")
+        return None
+
+    async def on_tool_error_callback(
+        self,
+        *,
+        tool: BaseTool,
+        tool_args: dict[str, Any],
+        tool_context: ToolContext,
+        error: Exception,
+    ) -> Optional[dict]:
+        self._finish_tool(tool, tool_context, "error")
+        return None
+
+    async def after_run_callback(self, *, invocation_context: Any) -> None:
+        """Forget calls of the invocation that never reached an after-callback."""
+        invocation_id = invocation_context.invocation_id
+        self._model_calls.pop(invocation_id, None)
+        for call_id, (call_invocation_id, _) in list(self._tool_calls.items()):
+            if call_invocation_id == invocation_id:
+                del self._tool_calls[call_id]
+
+    def _finish_tool(self, tool: BaseTool, tool_context: ToolContext, outcome: str):
+        call = self._tool_calls.pop(tool_context.function_call_id, None)
+        if call is not None:
+            _, started = call
+            TOOL_SECONDS.observe(
+                time.perf_counter() - started, tool=tool.name, outcome=outcome
+            )
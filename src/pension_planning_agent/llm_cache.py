@@ -0,0 +1,283 @@
+"""
+Exact-match cache of model responses for the opening turns of a conversation.
+
+The system prompt walks every user through the same opening ("First question:
+Name and Alder…"), so the first model calls of most conversations are identical
+requests. `LlmCachePlugin` answers a repeated request from the cache instead of
+calling the model:
+
+- the key covers the model, its parameters, the request config (including the
+  system instruction), the tool names and the whitespace-normalized history
+- requests with numbers in a user message, tool calls or results, or more
+  than `max_user_turns` user messages are never cached, so no user-specific
+  calculation is replayed to someone else
+- only complete text responses are stored, in a TTL/LRU memory tier and an
+  optional SQLite tier that survives restarts and is shared by processes
+"""
+
+from __future__ import annotations
+
+import asyncio
+import re
+import sqlite3
+import threading
+import time
+from typing import Any, Callable, Optional
+
+from google.adk.agents.callback_context import CallbackContext
+from google.adk.models import LlmRequest, LlmResponse
+from google.adk.plugins.base_plugin import BasePlugin
+from google.genai import types
+from loguru import logger
+
+from pension_planning_agent.cache import TTLCache, content_key
+from pension_planning_agent.metrics import LLM_CACHE_REQUESTS
+from settings import settings
+
+DIGITS = re.compile(r"\d")
+
+
+def _text_of(instruction: Any) -> str:
+    """Text of a system instruction given as a string or `types.Content`."""
+    if isinstance(instruction, types.Content):
+        return "\n".join(part.text or "" for part in instruction.parts or [])
+    return str(instruction or "")
+
+
+def request_key(
+    llm_request: LlmRequest,
+    model: str,
+    params: dict[str, Any],
+    max_user_turns: int,
+) -> str | None:
+    """
+    Cache key of a model request, or None if it must not be cached.
+
+    Args:
+        llm_request: Request about to be sent to the model
+        model: Model name
+        params: Extra model parameters, e.g. the reasoning effort
+        max_user_turns: User messages up to which a history may be cached
+
+    Returns:
+        str | None: Content hash of everything that shapes the response
+    """
+    history = []
+    user_turns = 0
+    for content in llm_request.contents:
+        texts = []
+        for part in content.parts or []:
+            if part.function_call or part.function_response:
+                return None
+            if part.inline_data or part.file_data:
+                return None
+            if not part.text or part.thought:
+                continue
+            if content.role == "user" and DIGITS.search(part.text):
+                return None
+            texts.append(" ".join(part.text.split()))
+        if content.role == "user":
+            user_turns += 1
+        history.append((content.role, texts))
+    if not user_turns or user_turns > max_user_turns:
+        return None
+
+    config = llm_request.config or types.GenerateContentConfig()
+    return content_key(
+        {
+            "model": model,
+            "params": params,
+            "system": _text_of(config.system_instruction),
+            "config": config.model_dump(
+                mode="json",
+                exclude_none=True,
+                exclude={"system_instruction", "tools", "labels", "http_options"},
+            ),
+            "tools": sorted(llm_request.tools_dict),
+            "history": history,
+        }
+    )
+
+
+def is_cacheable(llm_response: LlmResponse) -> bool:
+    """Whether a final model response is plain text worth replaying."""
+    content = llm_response.content
+    if llm_response.partial or llm_response.error_code or not content:
+        return False
+    parts = content.parts or []
+    return bool(parts) and all(part.text is not None for part in parts)
+
+
+class DiskCache:
+    """
+    SQLite tier of the response cache.
+
+    Entries expire by wall-clock time, so they stay valid across restarts, and
+    the least recently used entries are deleted beyond `maxsize`.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        maxsize: int,
+        ttl: float,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS llm_responses ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, "
+            "expires_at REAL NOT NULL, used_at REAL NOT NULL)"
+        )
+
+    def get(self, key: str) -> str | None:
+        """Return the stored value for `key`, or None if missing or expired."""
+        now = self._clock()
+        with self._lock:
+            row = self._db.execute(
+                "SELECT value, expires_at FROM llm_responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            if row[1] <= now:
+                self._db.execute("DELETE FROM llm_responses WHERE key = ?", (key,))
+                return None
+            self._db.execute(
+                "UPDATE llm_responses SET used_at = ? WHERE key = ?", (now, key)
+            )
+            return row[0]
+
+    def set(self, key: str, value: str) -> None:
+        """Store `value` under `key`, deleting expired and least recently used rows."""
+        now = self._clock()
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO llm_responses VALUES (?, ?, ?, ?)",
+                (key, value, now + self.ttl, now),
+            )
+            self._db.execute("DELETE FROM llm_responses WHERE expires_at <= ?", (now,))
+            self._db.execute(
+                "DELETE FROM llm_responses WHERE key IN (SELECT key FROM "
+                "llm_responses ORDER BY used_at DESC LIMIT -1 OFFSET ?)",
+                (self.maxsize,),
+            )
+
+    def clear(self) -> None:
+        """Delete all entries."""
+        with self._lock:
+            self._db.execute("DELETE FROM llm_responses")
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+
+class LlmCachePlugin(BasePlugin):
+    """
+    Answers repeated opening-turn model requests from the cache.
+
+    Register it before other plugins: a hit skips the model call and every
+    later before-model callback, including the metrics plugin's timer.
+    """
+
+    def __init__(
+        self,
+        model: str,
+        params: dict[str, Any],
+        memory: TTLCache,
+        disk: DiskCache | None = None,
+        max_user_turns: int = 2,
+        name: str = "llm_cache",
+    ):
+        super().__init__(name)
+        self.model = model
+        self.params = params
+        self.memory = memory
+        self.disk = disk
+        self.max_user_turns = max_user_turns
+        # Key of the pending model request per invocation, stored on response
+        self._pending: dict[str, str] = {}
+
+    async def before_model_callback(
+        self, *, callback_context: CallbackContext, llm_request: LlmRequest
+    ) -> Optional[LlmResponse]:
+        key = request_key(llm_request, self.model, self.params, self.max_user_turns)
+        if key is None:
+            LLM_CACHE_REQUESTS.inc(status="uncacheable")
+            return None
+
+        value = self.memory.get(key)
+        status = "hit"
+        if value is None and self.disk is not None:
+            value = await asyncio.to_thread(self.disk.get, key)
+            status = "disk_hit"
+            if value is not None:
+                self.memory.set(key, value)
+        if value is None:
+            LLM_CACHE_REQUESTS.inc(status="miss")
+            self._pending[callback_context.invocation_id] = key
+            return None
+
+        LLM_CACHE_REQUESTS.inc(status=status)
+        logger.debug(f"Model response served from cache ({status})")
+        return LlmResponse.model_validate_json(value)
+
+    async def after_model_callback(
+        self, *, callback_context: CallbackContext, llm_response: LlmResponse
+    ) -> Optional[LlmResponse]:
+        if llm_response.partial:
+            return None
+        key = self._pending.pop(callback_context.invocation_id, None)
+        if key is None or not is_cacheable(llm_response):
+            return None
+        # Replayed responses cost no tokens and are marked for tracing
+        value = llm_response.model_copy(
+            update={"usage_metadata": None, "custom_metadata": {"llm_cache": True}}
+        ).model_dump_json(exclude_none=True)
+        self.memory.set(key, value)
+        if self.disk is not None:
+            await asyncio.to_thread(self.disk.set, key, value)
+        return None
+
+    async def on_model_error_callback(
+        self,
+        *,
+        callback_context: CallbackContext,
+        llm_request: LlmRequest,
+        error: Exception,
+    ) -> Optional[LlmResponse]:
+        self._pending.pop(callback_context.invocation_id, None)
+        return None
+
+
+def create_llm_cache_plugin(model: str, params: dict[str, Any]) -> LlmCachePlugin:
+    """
+    Create the response cache configured in `settings`.
+
+    Args:
+        model: Model name
+        params: Extra model parameters that change its responses
+
+    Returns:
+        LlmCachePlugin: Plugin with a memory tier and, if `LLM_CACHE_DB_PATH`
+            is set, a SQLite tier
+    """
+    disk = None
+    if settings.LLM_CACHE_DB_PATH:
+        disk = DiskCache(
+            settings.LLM_CACHE_DB_PATH,
+            maxsize=settings.LLM_CACHE_DB_MAXSIZE,
+            ttl=settings.LLM_CACHE_TTL,
+        )
+    return LlmCachePlugin(
+        model=model,
+        params=params,
+        memory=TTLCache(maxsize=settings.LLM_CACHE_MAXSIZE, ttl=settings.LLM_CACHE_TTL),
+        disk=disk,
+        max_user_turns=settings.LLM_CACHE_MAX_USER_TURNS,
+    )
@@ -0,0 +1,452 @@
+"""
+Per-turn latency metrics, exposed in Prometheus text format and as OpenTelemetry.
+
+Every measurement is recorded twice: in the in-process registry below, served
+by `start_metrics_server()` at `/metrics` for Prometheus, and as OpenTelemetry
+metrics and spans, exported by `logfire.configure()` (Logfire or any OTLP
+backend) once the runner is built.
+
+Stages measured:
+
+- `agent_turn_seconds`: user message to final reply, per path (fast or agent)
+- `agent_first_chunk_seconds` and `agent_render_seconds`: streaming in Streamlit
+- `llm_request_seconds` and `llm_tokens_total`: model calls (see
+  `instrumentation.MetricsPlugin`)
+- `tool_seconds`: every agent tool call
+- `fire_calculator_stage_seconds`: input validation and projection
+- `businesslogic_http_seconds`: connect, wait (time to first byte) and transfer
+  time of the BusinessLogic call
+- `projection_cache_requests_total`: projection cache hits and misses
+- `llm_routed_requests_total` and `llm_route_fallbacks_total`: per-turn model
+  routing (see `routing`)
+- `llm_cache_requests_total`: model response cache hits and misses (see
+  `llm_cache`)
+- `businesslogic_retries_total`, `businesslogic_hedged_requests_total`,
+  `businesslogic_circuit_breaker_state` and
+  `businesslogic_circuit_breaker_rejections_total`: see `resilience`
+- `admission_in_flight_turns`, `admission_queue_depth`,
+  `admission_wait_seconds` and `admission_rejections_total`: see `admission`
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from contextlib import contextmanager
+from functools import cache
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Iterator
+
+import logfire
+from loguru import logger
+from opentelemetry import trace
+
+from settings import settings
+
+# Seconds; covers sub-millisecond cache hits up to slow reasoning model calls
+DEFAULT_BUCKETS = (
+    0.001,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    30.0,
+    60.0,
+)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+tracer = trace.get_tracer("pension_planning_agent")
+
+# All metrics in definition order, rendered by `render_metrics()`
+REGISTRY: list[Counter | Gauge | Histogram] = []
+
+
+def _escape(value: str) -> str:
+    """Escape a label value for the Prometheus text format."""
+    return value.replace("\\", r"\\").replace("\n", r"\n").replace('"', r"\"")
+
+
+def _format_labels(labels: dict[str, str]) -> str:
+    if not labels:
+        return ""
+    pairs = ",".join(f'{name}="{_escape(value)}"' for name, value in labels.items())
+    return f"{{{pairs}}}"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class _Metric:
+    """Shared label handling; values are kept per label combination."""
+
+    type_name = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple[str, ...]):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self._lock = threading.Lock()
+        REGISTRY.append(self)
+
+    def _key(self, labels: dict[str, Any]) -> tuple[str, ...]:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(
+                f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}"
+            )
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def _header(self) -> list[str]:
+        return [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.type_name}",
+        ]
+
+
+class Counter(_Metric):
+    """Monotonically increasing count, e.g. tokens or cache lookups."""
+
+    type_name = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: dict[tuple[str, ...], float] = {}
+        self._otel = logfire.metric_counter(name, description=documentation)
+
+    def inc(self, amount: float = 1.0, **labels: Any) -> None:
+        """Add `amount` to the series selected by `labels`."""
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+        self._otel.add(amount, dict(zip(self.labelnames, key)))
+
+    def value(self, **labels: Any) -> float:
+        """Current value of the series selected by `labels`."""
+        with self._lock:
+            return self._values.get(self._key(labels), 0.0)
+
+    def collect(self) -> list[str]:
+        """Prometheus text lines for this counter."""
+        with self._lock:
+            values = dict(self._values)
+        lines = self._header()
+        for key, value in sorted(values.items()):
+            labels = _format_labels(dict(zip(self.labelnames, key)))
+            lines.append(f"{self.name}{labels} {_format_value(value)}")
+        return lines
+
+
+class Gauge(_Metric):
+    """Current value that can go up and down, e.g. a circuit breaker state."""
+
+    type_name = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: dict[tuple[str, ...], float] = {}
+        self._otel = logfire.metric_gauge(name, description=documentation)
+
+    def set(self, value: float, **labels: Any) -> None:
+        """Set the series selected by `labels` to `value`."""
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+        self._otel.set(value, dict(zip(self.labelnames, key)))
+
+    def value(self, **labels: Any) -> float:
+        """Current value of the series selected by `labels`."""
+        with self._lock:
+            return self._values.get(self._key(labels), 0.0)
+
+    collect = Counter.collect
+
+
+class Histogram(_Metric):
+    """Distribution of durations in seconds, with cumulative buckets."""
+
+    type_name = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = (*sorted(buckets), float("inf"))
+        # Per series: count per bucket (not cumulative), sum and count
+        self._series: dict[tuple[str, ...], tuple[list[int], list[float]]] = {}
+        # logfire's meter stays valid across `logfire.configure()`, unlike
+        # instruments created from the OpenTelemetry proxy meter
+        self._otel = logfire.metric_histogram(name, unit="s", description=documentation)
+
+    def observe(self, value: float, **labels: Any) -> None:
+        """Record one duration in seconds for the series selected by `labels`."""
+        key = self._key(labels)
+        index = next(i for i, bound in enumerate(self.buckets) if value <= bound)
+        with self._lock:
+            counts, total = self._series.setdefault(
+                key, ([0] * len(self.buckets), [0.0])
+            )
+            counts[index] += 1
+            total[0] += value
+        self._otel.record(value, dict(zip(self.labelnames, key)))
+
+    def count(self, **labels: Any) -> int:
+        """Number of observations in the series selected by `labels`."""
+        with self._lock:
+            series = self._series.get(self._key(labels))
+            return sum(series[0]) if series else 0
+
+    def collect(self) -> list[str]:
+        """Prometheus text lines for this histogram."""
+        with self._lock:
+            series = {
+                key: (list(counts), total[0])
+                for key, (counts, total) in self._series.items()
+            }
+        lines = self._header()
+        for key, (counts, total) in sorted(series.items()):
+            labels = dict(zip(self.labelnames, key))
+            cumulative = 0
+            for bound, count in zip(self.buckets, counts):
+                cumulative += count
+                bucket_labels = _format_labels({**labels, "le": _format_value(bound)})
+                lines.append(f"{self.name}_bucket{bucket_labels} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(labels)} {total!r}")
+            lines.append(f"{self.name}_count{_format_labels(labels)} {cumulative}")
+        return lines
+
+
+TURN_SECONDS = Histogram(
+    "agent_turn_seconds",
+    "User message to final reply.",
+    ("path", "outcome"),
+)
+FIRST_CHUNK_SECONDS = Histogram(
+    "agent_first_chunk_seconds",
+    "User message to the first streamed text of the reply.",
+)
+RENDER_SECONDS = Histogram(
+    "agent_render_seconds",
+    "Time spent rendering the streamed reply in Streamlit, per turn.",
+)
+LLM_SECONDS = Histogram(
+    "llm_request_seconds",
+    "Model request to final response.",
+    ("model", "outcome"),
+)
+LLM_TOKENS = Counter(
+    "llm_tokens_total",
+    "Tokens reported by the model, by kind (prompt or completion).",
+    ("model", "kind"),
+)
+TOOL_SECONDS = Histogram(
+    "tool_seconds",
+    "Agent tool call duration.",
+    ("tool", "outcome"),
+)
+CALCULATOR_STAGE_SECONDS = Histogram(
+    "fire_calculator_stage_seconds",
+    "fire_calculator time per stage (validation or projection).",
+    ("stage",),
+)
+HTTP_SECONDS = Histogram(
+    "businesslogic_http_seconds",
+    "BusinessLogic call time per phase (connect, wait, transfer or total).",
+    ("phase",),
+)
+CACHE_REQUESTS = Counter(
+    "projection_cache_requests_total",
+    "Projection lookups by cache status (hit, miss or disabled).",
+    ("status",),
+)
+LLM_ROUTED_REQUESTS = Counter(
+    "llm_routed_requests_total",
+    "Model requests by the route, model and reasoning effort that served them.",
+    ("route", "model", "reasoning_effort"),
+)
+LLM_ROUTE_FALLBACKS = Counter(
+    "llm_route_fallbacks_total",
+    "Model requests passed to the next model of their route, by reason (slo or error).",
+    ("route", "reason"),
+)
+LLM_CACHE_REQUESTS = Counter(
+    "llm_cache_requests_total",
+    "Model requests by response cache status (hit, disk_hit, miss or uncacheable).",
+    ("status",),
+)
+SLOT_FILLING_TURNS = Counter(
+    "slot_filling_turns_total",
+    "Messages seen by slot filling, by outcome (asked, calculated, failed, question, no_slots or error).",
+    ("outcome",),
+)
+RETRIES = Counter(
+    "businesslogic_retries_total",
+    "BusinessLogic attempts retried, by error.",
+    ("reason",),
+)
+HEDGES = Counter(
+    "businesslogic_hedged_requests_total",
+    "Hedged BusinessLogic requests sent, by which request answered first.",
+    ("winner",),
+)
+BREAKER_STATE = Gauge(
+    "businesslogic_circuit_breaker_state",
+    "BusinessLogic circuit breaker state: 0 closed, 1 half-open, 2 open.",
+)
+BREAKER_REJECTIONS = Counter(
+    "businesslogic_circuit_breaker_rejections_total",
+    "Calls not sent while the breaker was open, by how they were answered.",
+    ("fallback",),
+)
+ADMISSION_IN_FLIGHT = Gauge(
+    "admission_in_flight_turns",
+    "Agent turns currently holding an admission slot.",
+)
+ADMISSION_QUEUE_DEPTH = Gauge(
+    "admission_queue_depth",
+    "Agent turns waiting for an admission slot.",
+)
+ADMISSION_WAIT_SECONDS = Histogram(
+    "admission_wait_seconds",
+    "Time an agent turn waited for a slot, by outcome (admitted or timeout).",
+    ("outcome",),
+)
+ADMISSION_REJECTIONS = Counter(
+    "admission_rejections_total",
+    "Agent turns rejected, by reason (rate_limited, queue_full or timeout).",
+    ("reason",),
+)
+
+
+@contextmanager
+def timed(histogram: Histogram, span_name: str, **labels: Any) -> Iterator[Any]:
+    """
+    Time the block into `histogram` and trace it as an OpenTelemetry span.
+
+    Args:
+        histogram: Metric receiving the duration
+        span_name: Name of the span, e.g. "fire_calculator.validation"
+        **labels: Metric labels, also set as span attributes
+
+    Yields:
+        Span: The active span, for adding attributes
+    """
+    started = time.perf_counter()
+    with tracer.start_as_current_span(span_name, attributes=labels) as span:
+        try:
+            yield span
+        finally:
+            histogram.observe(time.perf_counter() - started, **labels)
+
+
+class HttpTimings:
+    """
+    httpx `trace` extension splitting a request into connect, wait and transfer.
+
+    - connect: TCP connect and TLS handshake, only when no pooled connection
+      could be reused
+    - wait: request sent until the response headers arrived
+    - transfer: reading the response body
+
+    Usage: `client.post(url, ..., extensions={"trace": HttpTimings()})`.
+    """
+
+    def __init__(self) -> None:
+        self._started: dict[str, float] = {}
+
+    async def __call__(self, name: str, info: dict[str, Any]) -> None:
+        now = time.perf_counter()
+        # Strip the httpcore module prefix, e.g. "http11." or "connection."
+        event = name.split(".", 1)[-1]
+        if event == "connect_tcp.started":
+            self._started["connect"] = now
+        elif event == "send_request_headers.started":
+            self._finish("connect", now)
+            self._started["wait"] = now
+        elif event == "receive_response_headers.complete":
+            self._finish("wait", now)
+        elif event == "receive_response_body.started":
+            self._started["transfer"] = now
+        elif event == "receive_response_body.complete":
+            self._finish("transfer", now)
+
+    def _finish(self, phase: str, now: float) -> None:
+        started = self._started.pop(phase, None)
+        if started is not None:
+            HTTP_SECONDS.observe(now - started, phase=phase)
+
+
+def render_metrics() -> str:
+    """
+    All metrics in the Prometheus text exposition format.
+
+    Returns:
+        str: Metrics document, as served at `/metrics`
+    """
+    return "\n".join(line for metric in REGISTRY for line in metric.collect()) + "\n"
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    """Serves `render_metrics()` at `/metrics`."""
+
+    def log_message(self, format, *args) -> None:
+        pass
+
+    def do_GET(self) -> None:
+        if self.path.split("?")[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = render_metrics().encode()
+        self.send_response(200)
+        self.send_header("Content-Type", CONTENT_TYPE)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+@cache
+def start_metrics_server(
+    host: str | None = None, port: int | None = None
+) -> ThreadingHTTPServer | None:
+    """
+    Serve `/metrics` from a background thread, once per process.
+
+    Safe to call on every Streamlit rerun.
+
+    Args:
+        host: Interface to bind, defaults to `settings.METRICS_HOST`
+        port: Port to bind (0 picks a free one), defaults to `settings.METRICS_PORT`
+
+    Returns:
+        ThreadingHTTPServer | None: The running server, or None if the port is
+            unavailable
+    """
+    address = (
+        host if host is not None else settings.METRICS_HOST,
+        port if port is not None else settings.METRICS_PORT,
+    )
+    try:
+        server = ThreadingHTTPServer(address, _MetricsHandler)
+    except OSError as e:
+        logger.warning(f"Metrics endpoint not started on {address}: {e}")
+        return None
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    logger.info(
+        f"Serving Prometheus metrics at "
+        f"http://{address[0]}:{server.server_port}/metrics"
+    )
+    return server
@@ -0,0 +1,105 @@
+"""
+Record BusinessLogic API responses for the engine parity tests.
+
+`engine.RETURN_RATE` and the tax and pension rules of the local engine are
+checked against real API responses stored in
+`tests/resources/businesslogic_responses.json`. `PARITY_PAYLOADS` spans the
+plan shapes the engine must reproduce: different current ages, FIRE ages
+before, at and after the state pension age, nonzero holding funds and
+different tax rates. Recording needs network access and `BUSINESSLOGIC_TOKEN`:
+
+    cd src && python -m pension_planning_agent.parity  # Record every payload
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+from pathlib import Path
+
+from pension_planning_agent.calculator import (
+    FOLKEPENSIONSALDER,
+    fetch_remote_projection,
+)
+from pension_planning_agent.http_client import http_client_lifespan
+
+RECORDINGS_PATH = (
+    Path(__file__).parents[1] / "tests" / "resources" / "businesslogic_responses.json"
+)
+
+BASE_PAYLOAD = {
+    "manedslon": 75700.0,
+    "alder": 52,
+    "pensionInd_ar": 85000.0,
+    "skat_percentage": 0.33,
+    "forbrugsmal_md": 34100.0,
+    "frie_midler": 935000.0,
+    "holding_midler": 0.0,
+    "rate_and_liv": 4190000.0,
+    "folkepensionsalder": FOLKEPENSIONSALDER,
+    "fire_alder": 62,
+}
+
+# Changes to `BASE_PAYLOAD`, one recorded plan each
+PARITY_CASES = (
+    {},
+    {
+        "manedslon": 50000.0,
+        "alder": 30,
+        "pensionInd_ar": 60000.0,
+        "skat_percentage": 0.35,
+        "forbrugsmal_md": 25000.0,
+        "frie_midler": 100000.0,
+        "rate_and_liv": 500000.0,
+        "fire_alder": 55,
+    },
+    {"alder": 25, "manedslon": 35000.0, "forbrugsmal_md": 18000.0, "fire_alder": 45},
+    {"alder": 60, "fire_alder": FOLKEPENSIONSALDER},
+    {"alder": 60, "fire_alder": FOLKEPENSIONSALDER + 2},
+    {"holding_midler": 500000.0},
+    {"holding_midler": 2000000.0, "fire_alder": 58},
+    {"skat_percentage": 0.25},
+    {"skat_percentage": 0.42},
+    {"skat_percentage": 0.52, "pensionInd_ar": 150000.0},
+)
+
+PARITY_PAYLOADS = [{**BASE_PAYLOAD, **case} for case in PARITY_CASES]
+
+
+async def record(payloads: list[dict]) -> list[dict]:
+    """
+    Call the BusinessLogic API once per payload.
+
+    Args:
+        payloads: BusinessLogic request payloads
+
+    Returns:
+        list[dict]: `payload` and `response` (`opsparing_ar` and `result`) pairs
+    """
+    async with http_client_lifespan():
+        responses = await asyncio.gather(
+            *(fetch_remote_projection(payload) for payload in payloads)
+        )
+    return [
+        {
+            "payload": payload,
+            "response": {
+                "opsparing_ar": response["opsparing_ar"],
+                "result": response["result"],
+            },
+        }
+        for payload, response in zip(payloads, responses)
+    ]
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Record BusinessLogic responses")
+    parser.add_argument("--output", type=Path, default=RECORDINGS_PATH)
+    args = parser.parse_args(argv)
+    recordings = asyncio.run(record(PARITY_PAYLOADS))
+    args.output.write_text(json.dumps(recordings, indent=2) + "\n")
+
+
+if __name__ == "__main__":
+    main()
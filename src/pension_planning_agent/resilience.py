@@ -0,0 +1,299 @@
+"""Retries with jittered backoff, hedged requests and a circuit breaker."""
+
+from __future__ import annotations
+
+import asyncio
+import random
+import threading
+import time
+from collections import deque
+from typing import Awaitable, Callable, TypeVar
+
+import httpx
+from loguru import logger
+
+T = TypeVar("T")
+
+# Upstream statuses worth another attempt: overloaded or briefly unavailable
+RETRYABLE_STATUS_CODES = frozenset({429, 502, 503, 504})
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling an upstream whose circuit breaker is open."""
+
+
+def is_retryable(error: BaseException) -> bool:
+    """
+    Whether a failed idempotent request may be sent again.
+
+    Args:
+        error: Exception raised by the request
+
+    Returns:
+        bool: True for timeouts, connection errors and retryable status codes
+    """
+    if isinstance(error, httpx.HTTPStatusError):
+        return error.response.status_code in RETRYABLE_STATUS_CODES
+    return isinstance(error, httpx.TransportError)
+
+
+def is_client_error(error: BaseException) -> bool:
+    """
+    Whether a request was rejected because of the request itself.
+
+    Args:
+        error: Exception raised by the request
+
+    Returns:
+        bool: True for 4xx responses other than 429
+    """
+    return (
+        isinstance(error, httpx.HTTPStatusError)
+        and 400 <= error.response.status_code < 500
+        and not is_retryable(error)
+    )
+
+
+def backoff_delay(attempt: int, base: float, maximum: float) -> float:
+    """
+    Exponential backoff with full jitter.
+
+    Args:
+        attempt: Retry number, starting at 0
+        base: Delay bound of the first retry in seconds
+        maximum: Upper bound in seconds
+
+    Returns:
+        float: Seconds to wait, uniform in [0, min(maximum, base * 2**attempt)]
+    """
+    return random.uniform(0, min(maximum, base * 2**attempt))
+
+
+async def retry(
+    call: Callable[[], Awaitable[T]],
+    attempts: int,
+    base_delay: float,
+    max_delay: float,
+    on_retry: Callable[[BaseException], None] | None = None,
+) -> T:
+    """
+    Await `call()`, retrying retryable failures (see `is_retryable`).
+
+    Args:
+        call: Coroutine factory for one attempt; must be idempotent
+        attempts: Retries after the first attempt
+        base_delay: Backoff of the first retry in seconds
+        max_delay: Backoff upper bound in seconds
+        on_retry: Called with the error before each retry
+
+    Returns:
+        T: Result of the first successful attempt
+
+    Raises:
+        Exception: The last error, or the first non-retryable one
+    """
+    for attempt in range(attempts + 1):
+        try:
+            return await call()
+        except Exception as e:
+            if attempt == attempts or not is_retryable(e):
+                raise
+            if on_retry is not None:
+                on_retry(e)
+            delay = backoff_delay(attempt, base_delay, max_delay)
+            logger.warning(f"Retrying after {type(e).__name__} in {delay:.2f} s")
+            await asyncio.sleep(delay)
+    raise AssertionError("unreachable")
+
+
+class LatencyTracker:
+    """Rolling window of recent latencies, for quantile-based hedge delays."""
+
+    def __init__(self, size: int = 200):
+        self._samples: deque[float] = deque(maxlen=size)
+        self._lock = threading.Lock()
+
+    def record(self, seconds: float) -> None:
+        with self._lock:
+            self._samples.append(seconds)
+
+    def quantile(self, q: float, min_samples: int) -> float | None:
+        """
+        Latency quantile of the window.
+
+        Args:
+            q: Quantile in [0, 1], e.g. 0.95
+            min_samples: Samples required before a value is returned
+
+        Returns:
+            float | None: Seconds, or None if there are too few samples
+        """
+        with self._lock:
+            samples = sorted(self._samples)
+        if len(samples) < max(min_samples, 1):
+            return None
+        return samples[min(int(q * len(samples)), len(samples) - 1)]
+
+
+async def hedge(
+    call: Callable[[], Awaitable[T]], delay: float | None
+) -> tuple[T, str | None]:
+    """
+    Await `call()`, starting a second identical call if the first is slow.
+
+    The first successful result wins and the other call is cancelled. A
+    failure is only raised once no call is left that could still succeed.
+
+    Args:
+        call: Coroutine factory; must be idempotent
+        delay: Seconds before the hedge is sent, or None to never hedge
+
+    Returns:
+        tuple[T, str | None]: The result and which call produced it
+            ("primary" or "hedge"), or None if no hedge was sent
+    """
+    if delay is None:
+        return await call(), None
+
+    primary = asyncio.ensure_future(call())
+    tasks = {primary}
+    try:
+        done, _ = await asyncio.wait(tasks, timeout=delay)
+        if done and primary.exception() is None:
+            return primary.result(), None
+        if not done:
+            tasks.add(asyncio.ensure_future(call()))
+        error: BaseException | None = None
+        while tasks:
+            done, tasks = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None:
+                    return task.result(), "primary" if task is primary else "hedge"
+                error = error or task.exception()
+        raise error
+    finally:
+        for task in tasks:
+            task.cancel()
+
+
+class CircuitBreaker:
+    """
+    Fails fast while an upstream is unhealthy.
+
+    - closed: calls go through; once at least `min_requests` calls finished in
+      the last `window` seconds and `error_rate` of them failed, it opens
+    - open: calls are rejected for `cooldown` seconds
+    - half-open: one trial call goes through; success closes the breaker,
+      failure opens it again
+
+    Thread-safe, so one breaker covers all event loops of the process.
+    """
+
+    CLOSED, HALF_OPEN, OPEN = "closed", "half_open", "open"
+
+    def __init__(
+        self,
+        error_rate: float,
+        min_requests: int,
+        window: float,
+        cooldown: float,
+        clock: Callable[[], float] = time.monotonic,
+        on_state_change: Callable[[str], None] | None = None,
+    ):
+        self.error_rate = error_rate
+        self.min_requests = min_requests
+        self.window = window
+        self.cooldown = cooldown
+        self._clock = clock
+        self._on_state_change = on_state_change
+        self._outcomes: deque[tuple[float, bool]] = deque()
+        self._state = self.CLOSED
+        self._opened_at = 0.0
+        self._trial_started: float | None = None
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            self._advance(self._clock())
+            return self._state
+
+    def allow(self) -> bool:
+        """
+        Whether a call may go through now; half-open admits one trial call.
+
+        Returns:
+            bool: False if the call should fail fast
+        """
+        with self._lock:
+            now = self._clock()
+            self._advance(now)
+            if self._state == self.CLOSED:
+                return True
+            # A trial that never reported back (e.g. cancelled) is replaced
+            # after another cooldown
+            if self._state == self.HALF_OPEN and (
+                self._trial_started is None
+                or now - self._trial_started >= self.cooldown
+            ):
+                self._trial_started = now
+                return True
+            return False
+
+    def record_success(self) -> None:
+        """Record a successful call."""
+        self._record(True)
+
+    def record_failure(self) -> None:
+        """Record a failed call."""
+        self._record(False)
+
+    def reset(self) -> None:
+        """Close the breaker and forget all outcomes."""
+        with self._lock:
+            self._outcomes.clear()
+            self._trial_started = None
+            self._set_state(self.CLOSED)
+
+    def _record(self, success: bool) -> None:
+        with self._lock:
+            now = self._clock()
+            self._advance(now)
+            if self._state == self.HALF_OPEN:
+                self._trial_started = None
+                self._outcomes.clear()
+                if success:
+                    self._set_state(self.CLOSED)
+                else:
+                    self._open(now)
+                return
+
+            self._outcomes.append((now, success))
+            self._trim(now)
+            failures = sum(1 for _, ok in self._outcomes if not ok)
+            if (
+                self._state == self.CLOSED
+                and len(self._outcomes) >= self.min_requests
+                and failures / len(self._outcomes) >= self.error_rate
+            ):
+                self._open(now)
+
+    def _advance(self, now: float) -> None:
+        if self._state == self.OPEN and now - self._opened_at >= self.cooldown:
+            self._set_state(self.HALF_OPEN)
+
+    def _trim(self, now: float) -> None:
+        while self._outcomes and self._outcomes[0][0] < now - self.window:
+            self._outcomes.popleft()
+
+    def _open(self, now: float) -> None:
+        self._opened_at = now
+        self._outcomes.clear()
+        self._set_state(self.OPEN)
+
+    def _set_state(self, state: str) -> None:
+        if state != self._state:
+            logger.warning(f"Circuit breaker {self._state} -> {state}")
+            self._state = state
+            if self._on_state_change is not None:
+                self._on_state_change(state)
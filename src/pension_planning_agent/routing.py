@@ -0,0 +1,162 @@
+"""
+Per-turn model and reasoning-effort routing.
+
+Most model requests in a conversation are simple: asking for the next input.
+Running them at `reasoning_effort="high"` adds seconds of latency for no
+benefit. `RoutedLlm` classifies every model request (see `classify_request`)
+and sends it to the chain of (model, reasoning effort) configured for that
+route in `settings.LLM_ROUTES`:
+
+- `collect`: the user answered or said something, the model asks for inputs
+- `explain`: the user asked a question, e.g. what a term means
+- `interpret`: the model reads a tool result and explains the plan
+
+If an entry of the chain has not started responding within
+`settings.LLM_ROUTE_FIRST_RESPONSE_SLO` seconds, or fails before responding,
+the next entry is tried. The last entry is awaited without a deadline. The
+route, model and reasoning effort that served a request are recorded in
+`llm_routed_requests_total`, on the `call_llm` span and in the response's
+`custom_metadata`, which is stored with the session event.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import re
+from typing import Any, AsyncGenerator
+
+from google.adk.models import BaseLlm, LiteLlm, LlmRequest, LlmResponse
+from google.genai import types
+from loguru import logger
+from opentelemetry import trace
+from pydantic import PrivateAttr
+
+from pension_planning_agent.metrics import LLM_ROUTE_FALLBACKS, LLM_ROUTED_REQUESTS
+
+# Questions and requests for explanations, in Danish and English
+QUESTION_PATTERN = re.compile(
+    r"\?|^\s*(hvad|hvordan|hvorfor|hvornår|hvilk\w*|hvor|kan du|forklar|"
+    r"what|how|why|when|which|can you|explain)\b",
+    re.IGNORECASE,
+)
+
+
+def classify_request(contents: list[types.Content]) -> str:
+    """
+    Route of a model request, from the latest content of its history.
+
+    Args:
+        contents: Conversation history sent to the model
+
+    Returns:
+        str: "interpret" after a tool result, "explain" after a user question,
+            otherwise "collect"
+    """
+    if not contents:
+        return "collect"
+    latest = contents[-1]
+    parts = latest.parts or []
+    if any(part.function_response for part in parts):
+        return "interpret"
+    text = " ".join(part.text for part in parts if part.text)
+    if latest.role == "user" and QUESTION_PATTERN.search(text):
+        return "explain"
+    return "collect"
+
+
+def _tagged(llm_response: LlmResponse, served_by: dict[str, str]) -> LlmResponse:
+    """Record the route that served a response in its `custom_metadata`."""
+    llm_response.custom_metadata = {**(llm_response.custom_metadata or {}), **served_by}
+    return llm_response
+
+
+class RoutedLlm(BaseLlm):
+    """
+    Model that routes every request to a chain of LiteLLM models.
+
+    Attributes:
+        model: Default model, used for chain entries without a model name
+        routes: Route name to fallback chain of (model, reasoning effort)
+        first_response_slo: Seconds an entry may take to start responding
+            before the next entry of the chain is tried
+        model_kwargs: Further `LiteLlm` arguments, e.g. API key and base URL
+    """
+
+    routes: dict[str, list[tuple[str, str]]]
+    first_response_slo: float
+    model_kwargs: dict[str, Any] = {}
+    _models: dict[tuple[str, str], BaseLlm] = PrivateAttr(default_factory=dict)
+
+    def get_llm(self, model: str, reasoning_effort: str) -> BaseLlm:
+        """
+        LiteLLM model for one chain entry, created on first use.
+
+        Args:
+            model: Model name
+            reasoning_effort: "low", "medium" or "high"
+
+        Returns:
+            BaseLlm: Shared model instance
+        """
+        key = (model, reasoning_effort)
+        llm = self._models.get(key)
+        if llm is None:
+            llm = self._models[key] = LiteLlm(
+                model=model,
+                extra_params={"reasoning_effort": reasoning_effort},
+                **self.model_kwargs,
+            )
+        return llm
+
+    async def generate_content_async(
+        self, llm_request: LlmRequest, stream: bool = False
+    ) -> AsyncGenerator[LlmResponse, None]:
+        route = classify_request(llm_request.contents)
+        # Unconfigured routes keep the previous default, maximum reasoning
+        chain = self.routes.get(route) or [("", "high")]
+        for position, (model, reasoning_effort) in enumerate(chain):
+            model = model or self.model
+            last = position == len(chain) - 1
+            # LiteLlm may append to the request's contents, so an attempt that
+            # can still fall back works on a copy
+            request = llm_request.model_copy(deep=not last, update={"model": model})
+            responses = self.get_llm(model, reasoning_effort).generate_content_async(
+                request, stream=stream
+            )
+            try:
+                first = await asyncio.wait_for(
+                    anext(responses), None if last else self.first_response_slo
+                )
+            except StopAsyncIteration:
+                return
+            except Exception as e:
+                await responses.aclose()
+                if last:
+                    raise
+                # Not the builtin TimeoutError before Python 3.11
+                reason = "slo" if isinstance(e, asyncio.TimeoutError) else "error"
+                LLM_ROUTE_FALLBACKS.inc(route=route, reason=reason)
+                logger.warning(
+                    f"Model {model} ({reasoning_effort}) missed the {route} route "
+                    f"({reason}), falling back to {chain[position + 1]}"
+                )
+                continue
+
+            LLM_ROUTED_REQUESTS.inc(
+                route=route, model=model, reasoning_effort=reasoning_effort
+            )
+            served_by = {
+                "route": route,
+                "model": model,
+                "reasoning_effort": reasoning_effort,
+            }
+            trace.get_current_span().set_attributes(
+                {f"llm.{key}": value for key, value in served_by.items()}
+            )
+            try:
+                yield _tagged(first, served_by)
+                async for response in responses:
+                    yield _tagged(response, served_by)
+            finally:
+                await responses.aclose()
+            return
@@ -0,0 +1,221 @@
+"""Batched evaluation of many FIRE scenarios in a single tool call."""
+
+from __future__ import annotations
+
+import asyncio
+import itertools
+from typing import Iterable, Sequence
+
+from loguru import logger
+from pydantic import ValidationError
+
+from pension_planning_agent import engine
+from pension_planning_agent.calculator import build_payload, calculate_projection
+from pension_planning_agent.schemas import (
+    FireCalculatorInput,
+    format_validation_error_line,
+)
+from settings import settings
+
+INPUT_FIELDS: tuple[str, ...] = tuple(FireCalculatorInput.model_fields)
+
+
+def expand_grid(
+    axes: dict[str, Iterable[float]],
+) -> list[dict[str, float]]:
+    """
+    Expand per-field values into the Cartesian product of all combinations.
+
+    Args:
+        axes: Values for every `FireCalculatorInput` field, as lists or ranges
+
+    Returns:
+        list[dict[str, float]]: One raw (unvalidated) input dict per combination
+    """
+    fields = list(axes)
+    values = [list(dict.fromkeys(axes[field])) for field in fields]
+    return [dict(zip(fields, combo)) for combo in itertools.product(*values)]
+
+
+async def evaluate_scenarios(
+    calculator_inputs: Sequence[FireCalculatorInput],
+    concurrency: int | None = None,
+) -> list[dict | Exception]:
+    """
+    Evaluate many validated scenarios concurrently.
+
+    With the `local` backend all scenarios are projected in one vectorized
+    engine call. Otherwise each scenario goes through `calculate_projection`
+    (and therefore the cache and pooled client) with at most `concurrency`
+    calls in flight.
+
+    Args:
+        calculator_inputs: Validated scenarios
+        concurrency: Maximum parallel backend calls, defaults to settings
+
+    Returns:
+        list[dict | Exception]: Projection or the error raised, per scenario
+    """
+    if not calculator_inputs:
+        return []
+
+    if settings.FIRE_BACKEND == "local":
+        payloads = [await build_payload(item) for item in calculator_inputs]
+        batch = engine.project_batch(
+            **{
+                field: [payload[field] for payload in payloads]
+                for field in engine.PROJECTION_FIELDS
+            }
+        )
+        return [
+            {
+                **{key: float(values[i]) for key, values in batch.items()},
+                "engine": "local",
+            }
+            for i in range(len(payloads))
+        ]
+
+    semaphore = asyncio.Semaphore(concurrency or settings.FIRE_GRID_CONCURRENCY)
+
+    async def evaluate(calculator_input: FireCalculatorInput) -> dict:
+        async with semaphore:
+            return await calculate_projection(calculator_input)
+
+    return await asyncio.gather(
+        *(evaluate(item) for item in calculator_inputs), return_exceptions=True
+    )
+
+
+def format_value(value: float) -> str:
+    """Format a number compactly for the tables shown to the model."""
+    return f"{value:,.0f}" if abs(value) >= 100 else f"{value:g}"
+
+
+def format_scenario_table(
+    scenarios: list[dict[str, float]],
+    outcomes: list[dict | str],
+) -> str:
+    """
+    Render scenarios and outcomes as a compact markdown table.
+
+    Fields that are equal in every scenario are listed once above the table;
+    only the varied fields get their own column.
+
+    Args:
+        scenarios: Raw input dict per scenario
+        outcomes: Projection dict or an error message per scenario
+
+    Returns:
+        str: Markdown table
+    """
+    fields = list(scenarios[0])
+    varied = [f for f in fields if len({s[f] for s in scenarios}) > 1]
+    fixed = [f for f in fields if f not in varied]
+
+    lines = []
+    if fixed:
+        lines.append(
+            "Fixed: " + ", ".join(f"{f}={format_value(scenarios[0][f])}" for f in fixed)
+        )
+    header = varied + ["opsparing_ar", "result"]
+    lines.append("| " + " | ".join(header) + " |")
+    lines.append("|" + "---|" * len(header))
+    for scenario, outcome in zip(scenarios, outcomes):
+        cells = [format_value(scenario[f]) for f in varied]
+        if isinstance(outcome, dict):
+            cells += [
+                format_value(outcome["opsparing_ar"]),
+                format_value(outcome["result"]),
+            ]
+        else:
+            cells += [outcome, ""]
+        lines.append("| " + " | ".join(cells) + " |")
+    return "\n".join(lines)
+
+
+async def run_scenario_grid(axes: dict[str, Iterable[float]]) -> str:
+    """
+    Validate, evaluate and tabulate the Cartesian product of `axes`.
+
+    Args:
+        axes: Values for every `FireCalculatorInput` field
+
+    Returns:
+        str: Markdown table with one row per scenario, or an error message
+    """
+    missing = [field for field in INPUT_FIELDS if not list(axes.get(field) or [])]
+    if missing:
+        return f"Missing values for: {', '.join(missing)}"
+
+    scenarios = expand_grid({field: axes[field] for field in INPUT_FIELDS})
+    if len(scenarios) > settings.FIRE_GRID_MAX_SCENARIOS:
+        return (
+            f"Too many scenarios ({len(scenarios)}). "
+            f"Please use at most {settings.FIRE_GRID_MAX_SCENARIOS} combinations."
+        )
+
+    outcomes: list[dict | str] = [""] * len(scenarios)
+    valid: list[tuple[int, FireCalculatorInput]] = []
+    for i, scenario in enumerate(scenarios):
+        try:
+            valid.append((i, FireCalculatorInput(**scenario)))
+        except ValidationError as e:
+            outcomes[i] = "invalid: " + format_validation_error_line(e)
+
+    results = await evaluate_scenarios([item for _, item in valid])
+    for (i, _), result in zip(valid, results):
+        if isinstance(result, Exception):
+            logger.error(f"Scenario {scenarios[i]} failed: {result}")
+            outcomes[i] = "calculation failed"
+        else:
+            outcomes[i] = result
+
+    logger.info(f"Evaluated scenario grid with {len(scenarios)} scenarios")
+    return format_scenario_table(scenarios, outcomes)
+
+
+async def fire_scenario_grid(
+    manedslon: list[float],
+    alder: list[int],
+    pensionInd_ar: list[float],
+    skat_percentage: list[float],
+    forbrugsmal_md: list[float],
+    frie_midler: list[float],
+    holding_midler: list[float],
+    rate_and_liv: list[float],
+    fire_alder: list[int],
+) -> str:
+    """
+    Calculate many what-if pension plans at once, one for every combination of
+    the given values. Use this instead of calling `fire_calculator` several times
+    when the user wants to compare scenarios. Give a single value in the list for
+    fields that should stay fixed.
+
+    Args:
+        manedslon: Monthly salary values
+        alder: Current age values
+        pensionInd_ar: Annual pension contribution values
+        skat_percentage: Tax percentage after AMB values
+        forbrugsmal_md: Monthly consumption target values
+        frie_midler: Initial free funds balance values
+        holding_midler: Initial holding balance values
+        rate_and_liv: Rate and annuity pension values
+        fire_alder: Target FIRE age values
+
+    Returns:
+        str: Table with annual savings (opsparing_ar) and the free funds at age
+            95 (result) for every scenario
+    """
+    return await run_scenario_grid(
+        {
+            "manedslon": manedslon,
+            "alder": alder,
+            "pensionInd_ar": pensionInd_ar,
+            "skat_percentage": skat_percentage,
+            "forbrugsmal_md": forbrugsmal_md,
+            "frie_midler": frie_midler,
+            "holding_midler": holding_midler,
+            "rate_and_liv": rate_and_liv,
+            "fire_alder": fire_alder,
+        }
+    )
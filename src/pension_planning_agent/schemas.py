@@ -1,6 +1,38 @@
 """Pydantic models for input validation and type safety."""
 
-from pydantic import BaseModel, Field, field_validator
+from typing import Annotated, Any, Mapping
+
+from loguru import logger
+from pydantic import (
+    BaseModel,
+    Field,
+    PlainSerializer,
+    PlainValidator,
+    ValidationError,
+    WithJsonSchema,
+    field_validator,
+)
+
+from pension_planning_agent.engine import Trajectory
+
+
+def _to_trajectory(value: Any) -> Trajectory:
+    """Accept a `Trajectory` or its `to_columns` output."""
+    return value if isinstance(value, Trajectory) else Trajectory.from_columns(value)
+
+
+# Serialized as columns, e.g. {"age": [52, 53, ...], "free_funds": [...], ...}
+TrajectoryColumns = Annotated[
+    Trajectory,
+    PlainValidator(_to_trajectory),
+    PlainSerializer(lambda trajectory: trajectory.to_columns()),
+    WithJsonSchema(
+        {
+            "type": "object",
+            "additionalProperties": {"type": "array", "items": {"type": "integer"}},
+        }
+    ),
+]
 
 
 class FireCalculatorInput(BaseModel):
@@ -32,3 +64,68 @@ class FireCalculatorOutput(BaseModel):
 
     opsparing_ar: float = Field(description="Annual savings amount in DKK")
     result: float = Field(description="Net profit in free funds at age 95 in DKK")
+    engine: str | None = Field(
+        default=None,
+        description="Engine that answered: remote (BusinessLogic) or local",
+    )
+    trajectory: TrajectoryColumns | None = Field(
+        default=None,
+        description="Year-by-year balances and flows until age 95, see "
+        "engine.Trajectory; only for plans answered by the local engine",
+    )
+
+
+def format_validation_error(error: ValidationError) -> str:
+    """Format a validation error as a message the agent can act on.
+
+    Args:
+        error: Pydantic validation error
+
+    Returns:
+        str: One line per invalid field
+    """
+    error_msg = "Invalid input parameters:\n"
+    for line in _error_lines(error):
+        error_msg += f"- {line}\n"
+    return error_msg
+
+
+def format_validation_error_line(error: ValidationError) -> str:
+    """Format a validation error on one line, for table cells and CSV columns.
+
+    Args:
+        error: Pydantic validation error
+
+    Returns:
+        str: The invalid fields and their messages, separated by "; "
+    """
+    return "; ".join(_error_lines(error))
+
+
+def _error_lines(error: ValidationError) -> list[str]:
+    """`field: message` per invalid field."""
+    return [
+        f"{' -> '.join(str(loc) for loc in item['loc'])}: {item['msg']}"
+        for item in error.errors()
+    ]
+
+
+def validate_calculator_input(values: Mapping[str, Any]) -> FireCalculatorInput | str:
+    """Validate the calculator inputs of a tool call.
+
+    Args:
+        values: Tool arguments, typically the tool's `locals()`; names that are
+            not calculator inputs are ignored
+
+    Returns:
+        FireCalculatorInput | str: The validated input, or an error message the
+            agent can act on
+    """
+    try:
+        return FireCalculatorInput(
+            **{field: values[field] for field in FireCalculatorInput.model_fields}
+        )
+    except ValidationError as e:
+        error_msg = format_validation_error(e)
+        logger.error(f"Validation error: {error_msg}")
+        return error_msg
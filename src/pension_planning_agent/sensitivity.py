@@ -0,0 +1,214 @@
+"""Sensitivity analysis: how much each input moves the projected result."""
+
+from __future__ import annotations
+
+import time
+
+from loguru import logger
+from pydantic import BaseModel, ValidationError
+
+from pension_planning_agent.scenarios import evaluate_scenarios, format_value
+from pension_planning_agent.schemas import (
+    FireCalculatorInput,
+    validate_calculator_input,
+)
+from settings import settings
+
+# Fields perturbed by whole years; every other field by a percentage of its value
+AGE_FIELDS = ("alder", "fire_alder")
+
+
+class SensitivityRow(BaseModel):
+    """Impact of one input on the projected result."""
+
+    field: str
+    value: float
+    step: float  # Perturbation, in the unit of the field
+    result_down: float | None  # Result with `value - step`, if valid
+    result_up: float | None  # Result with `value + step`, if valid
+    impact: float | None  # Change in result per `step` increase
+    elasticity: float | None  # % change in result per % change in the field
+
+
+class SensitivityResult(BaseModel):
+    """Outcome of a sensitivity analysis, rows ranked by absolute impact."""
+
+    result: float
+    rows: list[SensitivityRow]
+    evaluations: int
+    elapsed_ms: float
+
+
+def perturbation_step(field: str, value: float, step_percent: float) -> float:
+    """
+    Perturbation of `field`: `settings.FIRE_SENSITIVITY_AGE_STEP` years for ages,
+    otherwise `step_percent` of the value (0 for a value of 0).
+    """
+    if field in AGE_FIELDS:
+        return settings.FIRE_SENSITIVITY_AGE_STEP
+    return abs(value) * step_percent / 100
+
+
+async def analyze_sensitivity(
+    base: dict, step_percent: float | None = None
+) -> SensitivityResult:
+    """
+    Perturb every input up and down by one step and evaluate all perturbed
+    scenarios, together with the plan itself, as one batch.
+
+    The impact of a field is the central difference of `result` scaled to one
+    step; when one side of the perturbation is not a valid input (e.g. a FIRE
+    age below the current age) the other side is used alone.
+
+    Args:
+        base: Validated input values of the current plan
+        step_percent: Perturbation in percent of the value for non-age fields,
+            defaults to settings
+
+    Returns:
+        SensitivityResult: The plan's result and one row per field
+    """
+    started = time.perf_counter()
+    step_percent = step_percent or settings.FIRE_SENSITIVITY_STEP_PERCENT
+
+    scenarios = [FireCalculatorInput(**base)]
+    # Field -> (step, index of the down and up scenario or None)
+    perturbed: dict[str, tuple[float, int | None, int | None]] = {}
+    for field, value in base.items():
+        step = perturbation_step(field, value, step_percent)
+        indexes = []
+        for sign in (-1, 1):
+            index = None
+            if step:
+                try:
+                    scenarios.append(
+                        FireCalculatorInput(**{**base, field: value + sign * step})
+                    )
+                    index = len(scenarios) - 1
+                except ValidationError:
+                    pass
+            indexes.append(index)
+        perturbed[field] = (step, *indexes)
+
+    outcomes = await evaluate_scenarios(scenarios)
+    if isinstance(outcomes[0], Exception):
+        raise outcomes[0]
+    result = outcomes[0]["result"]
+
+    def result_at(index: int | None) -> float | None:
+        if index is None or isinstance(outcomes[index], Exception):
+            return None
+        return outcomes[index]["result"]
+
+    rows = []
+    for field, (step, down_index, up_index) in perturbed.items():
+        down, up = result_at(down_index), result_at(up_index)
+        sides = [
+            (x, r) for x, r in ((-step, down), (0, result), (step, up)) if r is not None
+        ]
+        impact = elasticity = None
+        if down is not None or up is not None:
+            (x0, r0), (x1, r1) = sides[0], sides[-1]
+            impact = (r1 - r0) / (x1 - x0) * step
+            if result and base[field]:
+                elasticity = (impact / abs(result)) / (step / abs(base[field]))
+        rows.append(
+            SensitivityRow(
+                field=field,
+                value=base[field],
+                step=step,
+                result_down=down,
+                result_up=up,
+                impact=impact,
+                elasticity=elasticity,
+            )
+        )
+    rows.sort(key=lambda row: -abs(row.impact) if row.impact is not None else 0)
+
+    logger.info(f"Sensitivity analysis took {len(scenarios)} evaluations")
+    return SensitivityResult(
+        result=result,
+        rows=rows,
+        evaluations=len(scenarios),
+        elapsed_ms=(time.perf_counter() - started) * 1000,
+    )
+
+
+def format_sensitivity_table(sensitivity: SensitivityResult) -> str:
+    """
+    Render a sensitivity analysis as a ranked markdown table for the model.
+
+    Args:
+        sensitivity: Analysis outcome
+
+    Returns:
+        str: The plan's result, and one row per field, largest impact first
+    """
+    lines = [
+        f"Result at age 95 with the current plan: {format_value(sensitivity.result)} "
+        f"({sensitivity.evaluations} evaluations, {sensitivity.elapsed_ms:.1f} ms)",
+        "| rank | field | value | step | result -step | result +step "
+        "| impact per +step | elasticity |",
+        "|---|---|---|---|---|---|---|---|",
+    ]
+    for rank, row in enumerate(sensitivity.rows, start=1):
+        cells = [
+            str(rank),
+            row.field,
+            format_value(row.value),
+            format_value(row.step) if row.step else "n/a (value is 0)",
+            format_value(row.result_down) if row.result_down is not None else "-",
+            format_value(row.result_up) if row.result_up is not None else "-",
+            f"{row.impact:+,.0f}" if row.impact is not None else "-",
+            f"{row.elasticity:+.2f}" if row.elasticity is not None else "-",
+        ]
+        lines.append("| " + " | ".join(cells) + " |")
+    return "\n".join(lines)
+
+
+async def fire_sensitivity(
+    manedslon: float,
+    alder: int,
+    pensionInd_ar: float,
+    skat_percentage: float,
+    forbrugsmal_md: float,
+    frie_midler: float,
+    holding_midler: float,
+    rate_and_liv: float,
+    fire_alder: int,
+    step_percent: float = 0,
+) -> str:
+    """
+    Rank which inputs matter most for the pension plan: every input is changed a
+    little up and down (ages by one year, other inputs by `step_percent`) and
+    the change in the free funds at age 95 is reported for each. Use this when
+    the user asks which lever matters most, e.g. saving more, spending less or
+    working longer.
+
+    Args:
+        manedslon: Monthly salary
+        alder: Current age
+        pensionInd_ar: Annual pension contributions
+        skat_percentage: Tax percentage after AMB
+        forbrugsmal_md: Monthly consumption target
+        frie_midler: Initial free funds balance
+        holding_midler: Initial holding balance
+        rate_and_liv: Rate and annuity pension
+        fire_alder: Target FIRE age
+        step_percent: Change of the non-age inputs in percent, 0 for the default
+
+    Returns:
+        str: Table of the inputs ranked by their impact on the result at age 95
+    """
+    calculator_input = validate_calculator_input(locals())
+    if isinstance(calculator_input, str):
+        return calculator_input
+
+    try:
+        sensitivity = await analyze_sensitivity(
+            calculator_input.model_dump(), step_percent or None
+        )
+    except Exception as e:
+        logger.error(f"Sensitivity analysis failed: {e}")
+        return "An unexpected error occurred. Please try again later."
+    return format_sensitivity_table(sensitivity)
@@ -0,0 +1,178 @@
+"""Session storage for the ADK runner: in-memory or a pooled SQLite database."""
+
+from __future__ import annotations
+
+import threading
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Optional
+
+import aiosqlite
+from google.adk.sessions import BaseSessionService, InMemorySessionService, Session
+from google.adk.sessions.sqlite_session_service import (
+    CREATE_SCHEMA_SQL,
+    SqliteSessionService,
+)
+from loguru import logger
+
+from settings import settings
+
+# Lookups by session and eviction by age would otherwise scan whole tables
+CREATE_INDEXES_SQL = """
+CREATE INDEX IF NOT EXISTS idx_events_session_time
+    ON events (app_name, user_id, session_id, timestamp);
+CREATE INDEX IF NOT EXISTS idx_sessions_update_time ON sessions (update_time);
+"""
+
+
+class PooledSqliteSessionService(SqliteSessionService):
+    """
+    SQLite session service with WAL journaling, pooled connections and eviction.
+
+    ADK's `SqliteSessionService` opens a new connection, and re-runs the schema
+    script, for every operation. Here connections are configured once and kept
+    in a pool of at most `pool_size` idle connections; extra connections are
+    opened under load and closed when returned to a full pool. aiosqlite
+    connections are not bound to an event loop, so the pool is shared by all
+    loops in the process.
+
+    Sessions idle for longer than `max_idle` seconds, and the oldest sessions
+    beyond `max_sessions`, are deleted together with their events at most once
+    every `evict_interval` seconds, keeping the database size bounded.
+    """
+
+    def __init__(
+        self,
+        db_path: str,
+        pool_size: int | None = None,
+        max_idle: float | None = None,
+        max_sessions: int | None = None,
+        evict_interval: float | None = None,
+        busy_timeout: float | None = None,
+    ):
+        super().__init__(db_path)
+        self._pool_size = pool_size or settings.SESSION_DB_POOL_SIZE
+        self._max_idle = max_idle or settings.SESSION_MAX_IDLE
+        self._max_sessions = max_sessions or settings.SESSION_MAX_SESSIONS
+        self._evict_interval = (
+            settings.SESSION_EVICT_INTERVAL
+            if evict_interval is None
+            else evict_interval
+        )
+        self._busy_timeout = busy_timeout or settings.SESSION_DB_BUSY_TIMEOUT
+        self._idle: deque[aiosqlite.Connection] = deque()
+        self._lock = threading.Lock()
+        self._last_eviction = 0.0
+
+    async def _open_connection(self) -> aiosqlite.Connection:
+        """Open and configure a new connection, creating the schema if needed."""
+        db = await aiosqlite.connect(self._db_path)
+        db.row_factory = aiosqlite.Row
+        await db.execute("PRAGMA journal_mode = WAL")
+        await db.execute("PRAGMA synchronous = NORMAL")
+        await db.execute("PRAGMA foreign_keys = ON")
+        await db.execute(f"PRAGMA busy_timeout = {int(self._busy_timeout * 1000)}")
+        await db.executescript(CREATE_SCHEMA_SQL + CREATE_INDEXES_SQL)
+        return db
+
+    @asynccontextmanager
+    async def _get_db_connection(self) -> AsyncIterator[aiosqlite.Connection]:
+        """Check out a pooled connection for the duration of the block."""
+        with self._lock:
+            db = self._idle.popleft() if self._idle else None
+        if db is None:
+            db = await self._open_connection()
+
+        try:
+            yield db
+        except BaseException:
+            # Never hand out a connection with a half-finished transaction
+            try:
+                await db.rollback()
+            except Exception:
+                await db.close()
+                raise
+            await self._release(db)
+            raise
+        else:
+            await self._release(db)
+
+    async def _release(self, db: aiosqlite.Connection) -> None:
+        """Return a connection to the pool, or close it when the pool is full."""
+        with self._lock:
+            if len(self._idle) < self._pool_size:
+                self._idle.append(db)
+                return
+        # Overflow connection opened under load
+        await db.close()
+
+    async def close(self) -> None:
+        """Close all idle pooled connections."""
+        with self._lock:
+            idle, self._idle = list(self._idle), deque()
+        for db in idle:
+            await db.close()
+
+    async def create_session(
+        self,
+        *,
+        app_name: str,
+        user_id: str,
+        state: Optional[dict[str, Any]] = None,
+        session_id: Optional[str] = None,
+    ) -> Session:
+        """Create a session, evicting idle sessions first when due."""
+        if time.time() - self._last_eviction >= self._evict_interval:
+            await self.evict_sessions()
+        return await super().create_session(
+            app_name=app_name, user_id=user_id, state=state, session_id=session_id
+        )
+
+    async def evict_sessions(self, now: float | None = None) -> int:
+        """
+        Delete sessions idle for longer than `max_idle` and the oldest sessions
+        beyond `max_sessions`; their events are removed by the foreign key cascade.
+
+        Args:
+            now: Current time as a Unix timestamp, defaults to `time.time()`
+
+        Returns:
+            int: Number of deleted sessions
+        """
+        now = time.time() if now is None else now
+        self._last_eviction = now
+        async with self._get_db_connection() as db:
+            cursor = await db.execute(
+                "DELETE FROM sessions WHERE update_time < ?", (now - self._max_idle,)
+            )
+            evicted = cursor.rowcount
+            cursor = await db.execute(
+                """
+                DELETE FROM sessions WHERE rowid IN (
+                    SELECT rowid FROM sessions ORDER BY update_time DESC
+                    LIMIT -1 OFFSET ?
+                )
+                """,
+                (self._max_sessions,),
+            )
+            evicted += cursor.rowcount
+            await db.commit()
+
+        if evicted:
+            logger.info(f"Evicted {evicted} idle sessions")
+        return evicted
+
+
+def create_session_service() -> BaseSessionService:
+    """
+    Create the session service selected by `settings.SESSION_BACKEND`.
+
+    Returns:
+        BaseSessionService: In-memory service, or the pooled SQLite service
+            persisting sessions to `settings.SESSION_DB_PATH`
+    """
+    if settings.SESSION_BACKEND == "sqlite":
+        logger.info(f"Storing sessions in SQLite database {settings.SESSION_DB_PATH}")
+        return PooledSqliteSessionService(settings.SESSION_DB_PATH)
+    return InMemorySessionService()
@@ -0,0 +1,164 @@
+"""Monte Carlo simulation of FIRE plans under uncertain returns and inflation."""
+
+from __future__ import annotations
+
+import time
+
+import numpy as np
+from loguru import logger
+from pydantic import BaseModel
+
+from pension_planning_agent import engine
+from pension_planning_agent.calculator import build_payload
+from pension_planning_agent.schemas import validate_calculator_input
+from settings import settings
+
+
+class MonteCarloResult(BaseModel):
+    """Outcome of a Monte Carlo simulation of one plan."""
+
+    paths: int
+    success_probability: float
+    ages: list[int]
+    p10: list[float]
+    p50: list[float]
+    p90: list[float]
+    elapsed_ms: float
+
+
+def simulate(
+    payload: dict,
+    paths: int | None = None,
+    seed: int | None = None,
+    chunk_size: int | None = None,
+) -> MonteCarloResult:
+    """
+    Simulate a plan along many random paths of real returns.
+
+    Nominal returns and inflation are drawn independently from normal
+    distributions each year and combined into real growth factors. Paths are
+    generated and projected in chunks of `chunk_size`, so intermediate arrays
+    stay bounded regardless of the number of paths; only the free funds
+    balances needed for the percentile bands are kept.
+
+    Args:
+        payload: BusinessLogic request payload, see `calculator.build_payload`
+        paths: Number of simulated paths, defaults to settings
+        seed: Random seed for reproducible results, defaults to settings
+        chunk_size: Paths generated per chunk, defaults to settings
+
+    Returns:
+        MonteCarloResult: Probability that free funds at age 95 are non-negative,
+            and the P10/P50/P90 free funds balance for every age
+    """
+    started = time.perf_counter()
+    paths = paths or settings.FIRE_MC_PATHS
+    chunk_size = chunk_size or settings.FIRE_MC_CHUNK_SIZE
+    seed = settings.FIRE_MC_SEED if seed is None else seed
+    # Separate streams for returns and inflation make results independent of
+    # the chunk size
+    returns_rng, inflation_rng = (
+        np.random.default_rng(child) for child in np.random.SeedSequence(seed).spawn(2)
+    )
+
+    years = max(int(engine.END_AGE - payload["alder"]), 1)
+    free_funds = np.empty((paths, years + 1))
+    inputs = {field: payload[field] for field in engine.PROJECTION_FIELDS}
+
+    for start in range(0, paths, chunk_size):
+        size = min(chunk_size, paths - start)
+        returns = returns_rng.normal(
+            settings.FIRE_MC_RETURN_MEAN, settings.FIRE_MC_RETURN_STD, (size, years)
+        )
+        inflation = inflation_rng.normal(
+            settings.FIRE_MC_INFLATION_MEAN,
+            settings.FIRE_MC_INFLATION_STD,
+            (size, years),
+        )
+        projection = engine.project_batch(
+            **inputs,
+            growth=np.maximum(1 + returns, 0.0) / (1 + inflation),
+            return_balances=True,
+        )
+        free_funds[start : start + size] = projection["free_funds"]
+
+    p10, p50, p90 = np.percentile(free_funds, [10, 50, 90], axis=0)
+    return MonteCarloResult(
+        paths=paths,
+        success_probability=float(np.mean(free_funds[:, -1] >= 0)),
+        ages=list(range(int(payload["alder"]), int(payload["alder"]) + years + 1)),
+        p10=p10.tolist(),
+        p50=p50.tolist(),
+        p90=p90.tolist(),
+        elapsed_ms=(time.perf_counter() - started) * 1000,
+    )
+
+
+def format_monte_carlo_result(simulation: MonteCarloResult, step: int = 5) -> str:
+    """
+    Summarize a simulation for the model as a compact percentile table.
+
+    Args:
+        simulation: Simulation outcome
+        step: Show every `step`-th age (the last age is always shown)
+
+    Returns:
+        str: Success probability and P10/P50/P90 free funds by age
+    """
+    lines = [
+        f"Probability that free funds last until age 95: "
+        f"{simulation.success_probability:.0%} "
+        f"({simulation.paths:,} simulated paths, {simulation.elapsed_ms:.0f} ms)",
+        "| age | P10 | P50 | P90 |",
+        "|---|---|---|---|",
+    ]
+    last = len(simulation.ages) - 1
+    for i, age in enumerate(simulation.ages):
+        if i % step == 0 or i == last:
+            lines.append(
+                f"| {age} | {simulation.p10[i]:,.0f} | {simulation.p50[i]:,.0f} "
+                f"| {simulation.p90[i]:,.0f} |"
+            )
+    return "\n".join(lines)
+
+
+async def fire_monte_carlo(
+    manedslon: float,
+    alder: int,
+    pensionInd_ar: float,
+    skat_percentage: float,
+    forbrugsmal_md: float,
+    frie_midler: float,
+    holding_midler: float,
+    rate_and_liv: float,
+    fire_alder: int,
+) -> str:
+    """
+    Estimate the probability that the pension plan works out when investment
+    returns and inflation are uncertain. Use this when the user asks how safe or
+    robust the plan is, or what happens in good and bad markets.
+
+    Args:
+        manedslon: Monthly salary
+        alder: Current age
+        pensionInd_ar: Annual pension contributions
+        skat_percentage: Tax percentage after AMB
+        forbrugsmal_md: Monthly consumption target
+        frie_midler: Initial free funds balance
+        holding_midler: Initial holding balance
+        rate_and_liv: Rate and annuity pension
+        fire_alder: Target FIRE age
+
+    Returns:
+        str: Success probability and pessimistic (P10), median (P50) and
+            optimistic (P90) free funds by age
+    """
+    calculator_input = validate_calculator_input(locals())
+    if isinstance(calculator_input, str):
+        return calculator_input
+
+    simulation = await engine.run_in_thread(
+        simulate, await build_payload(calculator_input)
+    )
+    logger.info(f"Simulated {simulation.paths} paths in {simulation.elapsed_ms:.1f} ms")
+    return format_monte_carlo_result(simulation)
@@ -0,0 +1,359 @@
+"""
+Slot filling for the `fire_calculator` inputs, ahead of the agent.
+
+The system prompt has the model ask for the inputs one question at a time,
+so a profile costs at least seven full agent turns even when the user gives
+most of it in the first message. Instead, every `FireCalculatorInput` field is
+a slot, tracked in the session state under `SLOTS_STATE_KEY`. Each user
+message gets one structured-extraction model call that fills every slot it
+can; the reply asks only for the slots still missing, and as soon as all
+slots validate `fire_calculator` runs and its answer is the reply.
+
+The exchange is recorded in the session like an agent turn, including the
+`fire_calculator` call, so the agent can take over with the full profile once
+the plan is calculated. Questions from the user, and messages without any
+calculator input (greetings, small talk, a request to switch language),
+always go to the agent.
+"""
+
+from __future__ import annotations
+
+import json
+import time
+import uuid
+from typing import Annotated, Any
+
+from loguru import logger
+from pydantic import TypeAdapter, ValidationError
+
+from pension_planning_agent.agent import (
+    AGENT_NAME,
+    APP_NAME,
+    calculate_plan,
+    get_api_key,
+    get_session_service,
+)
+from pension_planning_agent.metrics import SLOT_FILLING_TURNS
+from pension_planning_agent.schemas import FireCalculatorInput, FireCalculatorOutput
+from pension_planning_agent.trajectory import TRAJECTORY_STATE_KEY, trajectory_state
+from settings import settings
+
+SLOTS_STATE_KEY = "fire_slots"
+
+# Slots in the order the system prompt asks for them, with how to ask
+SLOT_QUESTIONS: dict[str, str] = {
+    "alder": "Din alder",
+    "manedslon": "Din månedsløn før skat, inkl. arbejdsgiverens pensionsbidrag",
+    "fire_alder": "Den alder, hvor du gerne vil stoppe eller gå ned i tid (FIRE-alder)",
+    "frie_midler": "Din opsparing i frie midler i dag",
+    "holding_midler": "Din opsparing i et holdingselskab i dag (0 hvis ingen)",
+    "pensionInd_ar": "Dine indbetalinger til pension om året (ratepension + livrente)",
+    "skat_percentage": "Din skatteprocent efter AM-bidrag",
+    "forbrugsmal_md": "Dit forbrugsmål om måneden",
+    "rate_and_liv": "Din nuværende opsparing i ratepension og livrente",
+}
+
+# Validates a single slot with the constraints of its field
+SLOT_ADAPTERS: dict[str, TypeAdapter] = {
+    name: TypeAdapter(
+        Annotated[(field.annotation, *field.metadata)]
+        if field.metadata
+        else field.annotation
+    )
+    for name, field in FireCalculatorInput.model_fields.items()
+}
+
+EXTRACTION_PROMPT = """
+Extract the inputs of a FIRE pension calculation from the user's latest message.
+Return a value for every field the user states, or that follows directly from
+what they state (e.g. annual pension contributions from a monthly salary and a
+pension percentage), and null for every other field. Never guess.
+
+Amounts are in DKK. In Danish notation "." separates thousands, so "45.000 kr."
+is 45000. A bare answer refers to the assistant's last question.
+
+Fields:
+{fields}
+
+Already known, only change these if the user corrects them:
+{known}
+
+The assistant's last question:
+{last_question}
+"""
+
+
+def _response_format() -> dict[str, Any]:
+    """JSON schema of the extraction result, one nullable number per slot."""
+    properties = {
+        name: {"type": ["number", "null"], "description": field.description}
+        for name, field in FireCalculatorInput.model_fields.items()
+    }
+    return {
+        "type": "json_schema",
+        "json_schema": {
+            "name": "fire_calculator_input",
+            "strict": True,
+            "schema": {
+                "type": "object",
+                "properties": properties,
+                "required": list(properties),
+                "additionalProperties": False,
+            },
+        },
+    }
+
+
+async def extract_slots(
+    text: str, known: dict[str, Any], last_question: str | None = None
+) -> dict[str, Any]:
+    """
+    Extract calculator inputs from a user message with one model call.
+
+    Args:
+        text: User message
+        known: Slots filled by earlier messages
+        last_question: The previous reply, for bare answers like "52"
+
+    Returns:
+        dict[str, Any]: Value of every slot the message fills
+    """
+    import litellm
+
+    fields = "\n".join(
+        f"- {name}: {field.description}"
+        for name, field in FireCalculatorInput.model_fields.items()
+    )
+    system = EXTRACTION_PROMPT.format(
+        fields=fields,
+        known=json.dumps(known) if known else "nothing",
+        last_question=last_question or "none",
+    )
+    # Passed like the agent's `MODEL_EXTRA_PARAMS`
+    extra_params = (
+        {
+            "extra_params": {
+                "reasoning_effort": settings.SLOT_EXTRACTION_REASONING_EFFORT
+            }
+        }
+        if settings.SLOT_EXTRACTION_REASONING_EFFORT
+        else {}
+    )
+    response = await litellm.acompletion(
+        model=settings.SLOT_EXTRACTION_MODEL or settings.LLM_MODEL,
+        messages=[
+            {"role": "system", "content": system},
+            {"role": "user", "content": text},
+        ],
+        response_format=_response_format(),
+        api_key=get_api_key(),
+        api_base=settings.OPEN_ROUTER_API_BASE,
+        timeout=settings.SLOT_EXTRACTION_TIMEOUT,
+        **extra_params,
+    )
+    data = json.loads(response.choices[0].message.content or "{}")
+    return {
+        name: value
+        for name, value in data.items()
+        if name in SLOT_ADAPTERS
+        and isinstance(value, (int, float))
+        and not isinstance(value, bool)
+    }
+
+
+def merge_slots(
+    known: dict[str, Any], extracted: dict[str, Any]
+) -> tuple[dict[str, Any], list[str]]:
+    """
+    Add extracted values to the known slots, keeping only valid values.
+
+    Args:
+        known: Slots filled by earlier messages
+        extracted: Values extracted from the latest message
+
+    Returns:
+        tuple[dict[str, Any], list[str]]: The updated slots, and the slots whose
+            extracted value was rejected
+    """
+    slots = dict(known)
+    rejected = []
+    for name, value in extracted.items():
+        try:
+            slots[name] = SLOT_ADAPTERS[name].validate_python(value)
+        except ValidationError:
+            rejected.append(name)
+    return slots, rejected
+
+
+def missing_slots(slots: dict[str, Any]) -> list[str]:
+    """Slots still to be filled, in the order they are asked for."""
+    return [name for name in SLOT_QUESTIONS if name not in slots]
+
+
+def ask_for_slots(missing: list[str], rejected: list[str], error: str = "") -> str:
+    """
+    Ask for every missing slot in one message.
+
+    Args:
+        missing: Slots still to be filled
+        rejected: Slots whose value from the latest message was invalid
+        error: Why the values were rejected, if known
+
+    Returns:
+        str: Reply to the user
+    """
+    if error:
+        intro = error
+    elif rejected:
+        intro = "Nogle af værdierne kunne ikke bruges. Prøv igen med:"
+    elif len(missing) == len(SLOT_QUESTIONS):
+        intro = "Lad os beregne din FIRE-plan. Fortæl mig gerne:"
+    else:
+        intro = "Tak! For at beregne din plan mangler jeg:"
+    lines = "\n".join(f"- {SLOT_QUESTIONS[name]}" for name in missing)
+    return f"{intro}\n{lines}\n\nDu kan svare på det hele i én besked."
+
+
+def _plan_calculated(session) -> bool:
+    """
+    Check whether a plan was calculated in the session, by any path.
+
+    Every path stores the trajectory state only when the calculation succeeded
+    (None for plans answered by the API), so failed calculations do not count.
+    """
+    return TRAJECTORY_STATE_KEY in session.state
+
+
+def _last_reply(session) -> str | None:
+    """Text of the latest reply in the session."""
+    for event in reversed(session.events):
+        if event.author != "user" and event.content and event.content.parts:
+            text = "".join(part.text or "" for part in event.content.parts)
+            if text:
+                return text
+    return None
+
+
+async def _record_turn(
+    session,
+    text: str,
+    reply: str,
+    slots: dict[str, Any],
+    calculator_input: FireCalculatorInput | None,
+    output: FireCalculatorOutput | None = None,
+) -> None:
+    """Append the exchange, and the calculator call if it succeeded, to the session."""
+    from google.adk.events import Event, EventActions
+    from google.genai import types
+
+    invocation_id = f"slots-{uuid.uuid4()}"
+    contents = [("user", types.Content(role="user", parts=[types.Part(text=text)]))]
+    if output is not None:
+        call_id = f"slots-{uuid.uuid4().hex[:12]}"
+        call = types.Part.from_function_call(
+            name="fire_calculator", args=calculator_input.model_dump()
+        )
+        call.function_call.id = call_id
+        response = types.Part.from_function_response(
+            name="fire_calculator", response={"result": reply}
+        )
+        response.function_response.id = call_id
+        contents += [
+            (AGENT_NAME, types.Content(role="model", parts=[call])),
+            (AGENT_NAME, types.Content(role="user", parts=[response])),
+        ]
+    contents.append(
+        (AGENT_NAME, types.Content(role="model", parts=[types.Part(text=reply)]))
+    )
+
+    session_service = get_session_service()
+    for index, (author, content) in enumerate(contents):
+        actions = EventActions()
+        if index == len(contents) - 1:
+            actions.state_delta[SLOTS_STATE_KEY] = slots
+            if output is not None:
+                actions.state_delta[TRAJECTORY_STATE_KEY] = trajectory_state(output)
+        await session_service.append_event(
+            session,
+            Event(
+                invocation_id=invocation_id,
+                author=author,
+                content=content,
+                actions=actions,
+            ),
+        )
+
+
+async def run_slot_filling(user_id: str, session_id: str, text: str) -> str | None:
+    """
+    Pre-router in front of the runner: collect the calculator inputs with one
+    extraction call per message, and calculate the plan once they are complete.
+
+    Args:
+        user_id: ADK user ID
+        session_id: ADK session ID
+        text: User message
+
+    Returns:
+        str | None: The reply, or None if the message must go through the runner:
+            slot filling is disabled, a plan was already calculated, the user
+            asks a question, or the extraction failed or found no input
+    """
+    if not settings.SLOT_FILLING_ENABLED:
+        return None
+    from pension_planning_agent.routing import QUESTION_PATTERN
+
+    session = await get_session_service().get_session(
+        app_name=APP_NAME, user_id=user_id, session_id=session_id
+    )
+    if session is None or _plan_calculated(session):
+        return None
+    if QUESTION_PATTERN.search(text):
+        SLOT_FILLING_TURNS.inc(outcome="question")
+        return None
+
+    started = time.perf_counter()
+    known = dict(session.state.get(SLOTS_STATE_KEY) or {})
+    try:
+        extracted = await extract_slots(text, known, _last_reply(session))
+    except Exception as e:
+        SLOT_FILLING_TURNS.inc(outcome="error")
+        logger.warning(f"Slot extraction failed, handing over to the agent: {e}")
+        return None
+
+    if not extracted:
+        # Nothing to collect: let the agent answer in its own words
+        SLOT_FILLING_TURNS.inc(outcome="no_slots")
+        return None
+
+    slots, rejected = merge_slots(known, extracted)
+    missing = missing_slots(slots)
+    calculator_input = None
+    error = ""
+    if not missing:
+        try:
+            calculator_input = FireCalculatorInput(**slots)
+        except ValidationError as e:
+            # Ask again for the fields that broke a cross-field rule
+            invalid = {str(item["loc"][0]) for item in e.errors() if item["loc"]}
+            slots = {k: v for k, v in slots.items() if k not in invalid}
+            rejected += sorted(invalid)
+            missing = missing_slots(slots)
+            error = "; ".join(item["msg"] for item in e.errors()) + ". Angiv venligst:"
+
+    output = None
+    if calculator_input is not None:
+        reply, output = await calculate_plan(calculator_input)
+        # On failure the reply says why, and the next message retries
+        outcome = "calculated" if output is not None else "failed"
+    else:
+        reply = ask_for_slots(missing, rejected, error)
+        outcome = "asked"
+    await _record_turn(session, text, reply, slots, calculator_input, output)
+
+    SLOT_FILLING_TURNS.inc(outcome=outcome)
+    logger.info(
+        f"Slot filling {outcome}: {len(extracted)} slots extracted, "
+        f"{len(missing)} missing, {(time.perf_counter() - started) * 1000:.0f} ms"
+    )
+    return reply
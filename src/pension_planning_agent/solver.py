@@ -0,0 +1,266 @@
+"""Goal-seek solver: find the input value at which the projected result reaches zero."""
+
+from __future__ import annotations
+
+import time
+
+import numpy as np
+from loguru import logger
+from pydantic import BaseModel
+
+from pension_planning_agent.scenarios import evaluate_scenarios
+from pension_planning_agent.schemas import (
+    FireCalculatorInput,
+    validate_calculator_input,
+)
+from settings import settings
+
+# Inputs the user can act on; tax rate and current age are not levers
+SOLVABLE_FIELDS = (
+    "fire_alder",
+    "forbrugsmal_md",
+    "pensionInd_ar",
+    "manedslon",
+    "frie_midler",
+    "holding_midler",
+    "rate_and_liv",
+)
+
+
+class GoalSeekResult(BaseModel):
+    """Outcome of a goal-seek search."""
+
+    field: str
+    value: float | None
+    result: float | None
+    increasing: bool
+    converged: bool
+    evaluations: int
+    rounds: int
+    elapsed_ms: float
+
+
+def default_bounds(base: dict, field: str) -> tuple[float, float]:
+    """
+    Search range for `field` that keeps every probe a valid calculator input.
+
+    Args:
+        base: Validated input values of the current plan
+        field: Input field to solve for
+
+    Returns:
+        tuple[float, float]: Lower and upper bound
+    """
+    if field == "fire_alder":
+        return base["alder"] + 1, 94
+    lower = 1.0 if field in ("manedslon", "forbrugsmal_md") else 0.0
+    return lower, max(10 * base[field], 1_000_000.0)
+
+
+def _probe_points(lower: float, upper: float, count: int, integer: bool) -> list:
+    """Evenly spaced points strictly inside (lower, upper)."""
+    points = np.linspace(lower, upper, count + 2)[1:-1]
+    if integer:
+        return sorted({int(round(p)) for p in points} - {int(lower), int(upper)})
+    return points.tolist()
+
+
+async def _evaluate(base: dict, field: str, values: list) -> list[float]:
+    """Projected `result` for the plan with `field` set to each of `values`."""
+    inputs = [FireCalculatorInput(**{**base, field: value}) for value in values]
+    outcomes = await evaluate_scenarios(inputs)
+    for outcome in outcomes:
+        if isinstance(outcome, Exception):
+            raise outcome
+    return [outcome["result"] for outcome in outcomes]
+
+
+async def goal_seek(
+    base: dict,
+    field: str,
+    lower: float | None = None,
+    upper: float | None = None,
+    tolerance: float | None = None,
+    probes: int | None = None,
+) -> GoalSeekResult:
+    """
+    Search `field` for the boundary value where the projected result crosses zero.
+
+    Each round evaluates `probes` points inside the current bracket as one batch
+    and keeps the sub-interval where the sign of `result` changes, so the
+    bracket shrinks by a factor `probes + 1` per round. The search stops as soon
+    as the bracket is within `tolerance` (one year for ages).
+
+    Args:
+        base: Validated input values of the current plan
+        field: Input field to solve for
+        lower: Lower bound of the search range, defaults to `default_bounds`
+        upper: Upper bound of the search range, defaults to `default_bounds`
+        tolerance: Width of the final bracket, defaults to settings
+        probes: Evaluations per round, defaults to settings
+
+    Returns:
+        GoalSeekResult: The value closest to the boundary with `result >= 0`,
+            or None if no value in the range reaches it or the range is empty
+            (no evaluations)
+    """
+    started = time.perf_counter()
+    integer = field == "fire_alder"
+    default_lower, default_upper = default_bounds(base, field)
+    lower = default_lower if lower is None else lower
+    upper = default_upper if upper is None else upper
+    tolerance = 1 if integer else (tolerance or settings.FIRE_SOLVER_TOLERANCE)
+    probes = probes or settings.FIRE_SOLVER_PROBES
+
+    if lower > upper:
+        # E.g. no FIRE age between the current age and 95
+        return GoalSeekResult(
+            field=field,
+            value=None,
+            result=None,
+            increasing=True,
+            converged=False,
+            evaluations=0,
+            rounds=0,
+            elapsed_ms=(time.perf_counter() - started) * 1000,
+        )
+
+    xs = [lower, upper]
+    rs = await _evaluate(base, field, xs)
+    evaluations, rounds = 2, 0
+    increasing = rs[1] >= rs[0]
+
+    if (rs[0] >= 0) == (rs[1] >= 0):
+        # No sign change: either every value or no value in range reaches zero
+        value, result = None, None
+        if rs[0] >= 0:
+            value, result = (xs[0], rs[0]) if increasing else (xs[1], rs[1])
+        return GoalSeekResult(
+            field=field,
+            value=value,
+            result=result,
+            increasing=increasing,
+            converged=False,
+            evaluations=evaluations,
+            rounds=rounds,
+            elapsed_ms=(time.perf_counter() - started) * 1000,
+        )
+
+    while xs[1] - xs[0] > tolerance and rounds < settings.FIRE_SOLVER_MAX_ROUNDS:
+        points = _probe_points(xs[0], xs[1], probes, integer)
+        if not points:
+            break
+        rounds += 1
+        evaluations += len(points)
+        point_results = await _evaluate(base, field, points)
+
+        grid = [xs[0], *points, xs[1]]
+        values = [rs[0], *point_results, rs[1]]
+        for i in range(len(grid) - 1):
+            if (values[i] >= 0) != (values[i + 1] >= 0):
+                xs, rs = [grid[i], grid[i + 1]], [values[i], values[i + 1]]
+                break
+
+    index = 1 if increasing else 0
+    logger.info(
+        f"Goal seek for {field} took {evaluations} evaluations in {rounds} rounds"
+    )
+    return GoalSeekResult(
+        field=field,
+        value=xs[index],
+        result=rs[index],
+        increasing=increasing,
+        converged=xs[1] - xs[0] <= tolerance,
+        evaluations=evaluations,
+        rounds=rounds,
+        elapsed_ms=(time.perf_counter() - started) * 1000,
+    )
+
+
+def format_goal_seek_result(goal: GoalSeekResult, base_value: float) -> str:
+    """
+    Describe a goal-seek outcome for the model.
+
+    Args:
+        goal: Solver outcome
+        base_value: Value of the solved field in the current plan
+
+    Returns:
+        str: Summary including the evaluation count and time
+    """
+    stats = (
+        f"({goal.evaluations} evaluations in {goal.rounds} rounds, "
+        f"{goal.elapsed_ms:.1f} ms)"
+    )
+    if goal.evaluations == 0:
+        if goal.field == "fire_alder":
+            return (
+                "There is no feasible FIRE age: the FIRE age must be after the "
+                "current age and before 95."
+            )
+        return f"There is no feasible value of {goal.field}: the search range is empty."
+    if goal.value is None:
+        return (
+            f"No value of {goal.field} within the search range gives a "
+            f"non-negative result at age 95 {stats}."
+        )
+
+    bound = "at least" if goal.increasing else "at most"
+    return (
+        f"To have non-negative free funds at age 95, {goal.field} must be {bound} "
+        f"{goal.value:,.0f} (currently {base_value:,.0f}). With that value the "
+        f"result at age 95 is {goal.result:,.0f} kr. {stats}"
+    )
+
+
+async def fire_goal_seek(
+    manedslon: float,
+    alder: int,
+    pensionInd_ar: float,
+    skat_percentage: float,
+    forbrugsmal_md: float,
+    frie_midler: float,
+    holding_midler: float,
+    rate_and_liv: float,
+    fire_alder: int,
+    solve_for: str,
+) -> str:
+    """
+    Find the value of one input that makes the pension plan just work out, i.e.
+    the free funds at age 95 become zero or positive. Use this when the user asks
+    e.g. "how early can I stop?" (solve_for="fire_alder"), "how much can I spend?"
+    (solve_for="forbrugsmal_md") or "how much must I pay into pension?"
+    (solve_for="pensionInd_ar").
+
+    Args:
+        manedslon: Monthly salary
+        alder: Current age
+        pensionInd_ar: Annual pension contributions
+        skat_percentage: Tax percentage after AMB
+        forbrugsmal_md: Monthly consumption target
+        frie_midler: Initial free funds balance
+        holding_midler: Initial holding balance
+        rate_and_liv: Rate and annuity pension
+        fire_alder: Target FIRE age
+        solve_for: Name of the input to solve for, e.g. "fire_alder"
+
+    Returns:
+        str: The boundary value for `solve_for` and the resulting plan outcome
+    """
+    if solve_for not in SOLVABLE_FIELDS:
+        return (
+            f"Cannot solve for '{solve_for}'. Choose one of: "
+            f"{', '.join(SOLVABLE_FIELDS)}"
+        )
+
+    calculator_input = validate_calculator_input(locals())
+    if isinstance(calculator_input, str):
+        return calculator_input
+
+    base = calculator_input.model_dump()
+    try:
+        goal = await goal_seek(base, solve_for)
+    except Exception as e:
+        logger.error(f"Goal seek for {solve_for} failed: {e}")
+        return "An unexpected error occurred. Please try again later."
+    return format_goal_seek_result(goal, base[solve_for])
@@ -2,18 +2,36 @@
 
 from __future__ import annotations
 
+import asyncio
+import time
 import uuid
-from typing import Literal, TypedDict
+from typing import AsyncIterator, Literal, TypedDict
 
-import logfire
 import streamlit as st
-from google.genai import types
 from loguru import logger
+from pydantic import ValidationError
 
-from pension_planning_agent.agent import runner, session_service
+from pension_planning_agent.admission import AdmissionRejected, admit_turn
+from pension_planning_agent.agent import APP_NAME, get_runner, get_session_service
+from pension_planning_agent.fast_path import run_fast_path
+from pension_planning_agent.http_client import http_client_lifespan
+from pension_planning_agent.metrics import (
+    FIRST_CHUNK_SECONDS,
+    RENDER_SECONDS,
+    TURN_SECONDS,
+    tracer,
+)
+from pension_planning_agent.schemas import FireCalculatorInput, format_validation_error
+from pension_planning_agent.slots import run_slot_filling
+from pension_planning_agent.what_if import (
+    WHAT_IF_SLIDERS,
+    format_scenario_prompt,
+    last_calculator_input,
+    project_what_if,
+    slider_range,
+)
 
-# Configure logfire to suppress warnings (optional)
-logfire.configure(send_to_logfire="never")
+STREAMING_CURSOR = " ▌"
 
 
 class ChatMessage(TypedDict):
@@ -49,72 +67,274 @@ def display_message_part(message: dict) -> None:
             st.markdown(content)
 
 
-async def run_agent(user_input: str) -> None:
+def _event_text(event) -> str:
+    """Concatenate the visible (non-thought) text parts of an agent event."""
+    content = getattr(event, "content", None)
+    if not content or not content.parts:
+        return ""
+    return "".join(
+        part.text for part in content.parts if part.text and not part.thought
+    )
+
+
+async def stream_agent_response(
+    user_id: str, session_id: str, user_input: str
+) -> AsyncIterator[str]:
     """
-    Run the agent for the user_input prompt,
-    while maintaining the entire conversation in `st.session_state.messages`.
+    Run the agent with SSE streaming and yield the response text as it grows.
+
+    Partial events carry text deltas, and the final event of each model turn
+    repeats the aggregated text, which replaces the deltas streamed so far.
 
     Args:
+        user_id: ADK user ID
+        session_id: ADK session ID
         user_input: User's input text
+
+    Yields:
+        str: The full response text received so far
     """
+    from google.adk.agents.run_config import RunConfig, StreamingMode
+    from google.genai import types
+
+    events = get_runner().run_async(
+        user_id=user_id,
+        session_id=session_id,
+        new_message=types.Content(role="user", parts=[types.Part(text=user_input)]),
+        run_config=RunConfig(streaming_mode=StreamingMode.SSE),
+    )
+    committed = ""
+    streaming = ""
     try:
-        # Get or create user ID and session ID
-        if "user_id" not in st.session_state:
-            st.session_state.user_id = "streamlit_user"
-
-        if "session_id" not in st.session_state:
-            st.session_state.session_id = str(uuid.uuid4())
-            # Create the session (await the async method)
-            await session_service.create_session(
-                app_name="fire_pension_agent",
-                user_id=st.session_state.user_id,
-                session_id=st.session_state.session_id,
+        async for event in events:
+            text = _event_text(event)
+            if not text:
+                continue
+            if event.partial:
+                streaming += text
+            else:
+                committed += text
+                streaming = ""
+            yield committed + streaming
+    finally:
+        # Cancels the agent turn when the consumer stops early
+        await events.aclose()
+
+
+async def run_agent(user_input: str) -> None:
+    """
+    Run the agent for the user_input prompt, rendering the response as it streams
+    in, while maintaining the entire conversation in `st.session_state.messages`.
+
+    When the user submits a new message mid-turn, Streamlit interrupts the script
+    at the next render; the running agent turn is then cancelled and the text
+    streamed so far is kept in the conversation.
+
+    Args:
+        user_input: User's input text
+    """
+    response_text = ""
+    path, outcome = "agent", "ok"
+    render_seconds = 0.0
+    started = time.perf_counter()
+    with tracer.start_as_current_span("agent_turn") as span:
+        try:
+            # Get or create user ID and session ID
+            if "user_id" not in st.session_state:
+                st.session_state.user_id = "streamlit_user"
+
+            if "session_id" not in st.session_state:
+                st.session_state.session_id = str(uuid.uuid4())
+                # Create the session (await the async method)
+                await get_session_service().create_session(
+                    app_name=APP_NAME,
+                    user_id=st.session_state.user_id,
+                    session_id=st.session_state.session_id,
+                )
+                logger.info(f"Created new session: {st.session_state.session_id}")
+
+            # Structured input is answered without a model call
+            reply = await run_fast_path(
+                st.session_state.user_id, st.session_state.session_id, user_input
             )
-            logger.info(f"Created new session: {st.session_state.session_id}")
-
-        # Create user message content
-        new_message = types.Content(parts=[types.Part(text=user_input)])
-
-        # Run the agent and collect response
-        response_text = ""
-        last_event = None
-
-        for event in runner.run(
-            user_id=st.session_state.user_id,
-            session_id=st.session_state.session_id,
-            new_message=new_message,
-        ):
-            last_event = event
-            # Extract text from events
-            if hasattr(event, "text") and event.text:
-                response_text += event.text
-            elif hasattr(event, "content") and event.content:
-                # Handle Content object with parts
-                content = event.content
-                if hasattr(content, "parts"):
-                    for part in content.parts:
-                        if hasattr(part, "text") and part.text:
-                            response_text += part.text
-
-        # If no text was extracted, use the last event
-        if not response_text:
-            response_text = (
-                str(last_event) if last_event else "No response from the agent."
+            if reply is not None:
+                path = "fast"
+                st.session_state.messages.append(
+                    {"role": "assistant", "content": reply}
+                )
+                st.markdown(reply)
+                return
+
+            # Render the response chunk by chunk as it arrives. All browser
+            # sessions share one user ID, so the rate limit is per session.
+            placeholder = st.empty()
+            async with admit_turn(st.session_state.session_id):
+                # Collects the calculator inputs without an agent turn
+                slot_reply = await run_slot_filling(
+                    st.session_state.user_id, st.session_state.session_id, user_input
+                )
+                if slot_reply is not None:
+                    path, response_text = "slots", slot_reply
+                else:
+                    async for chunk in stream_agent_response(
+                        st.session_state.user_id,
+                        st.session_state.session_id,
+                        user_input,
+                    ):
+                        if not response_text:
+                            first_chunk = time.perf_counter() - started
+                            FIRST_CHUNK_SECONDS.observe(first_chunk)
+                            logger.info(
+                                f"First chunk after {first_chunk * 1000:.0f} ms"
+                            )
+                        response_text = chunk
+                        render_started = time.perf_counter()
+                        placeholder.markdown(response_text + STREAMING_CURSOR)
+                        render_seconds += time.perf_counter() - render_started
+
+            if not response_text:
+                response_text = "No response from the agent."
+                logger.warning("No text response extracted from the agent events")
+
+            # Store and display response
+            st.session_state.messages.append(
+                {"role": "assistant", "content": response_text}
             )
-            logger.warning(f"No text response extracted. Last event: {last_event}")
+            placeholder.markdown(response_text)
 
-        # Store and display response
-        st.session_state.messages.append(
-            {"role": "assistant", "content": response_text}
+        except AdmissionRejected as e:
+            outcome = "rejected"
+            st.warning(e.message)
+            st.session_state.messages.append(
+                {"role": "assistant", "content": e.message}
+            )
+
+        except Exception as e:
+            outcome = "error"
+            error_message = f"An error occurred: {str(e)}"
+            logger.exception(f"⛔️ {error_message}")
+            st.error(error_message)
+
+            # Store error in messages for context
+            st.session_state.messages.append(
+                {"role": "assistant", "content": f"Error: {error_message}"}
+            )
+        except BaseException:
+            # Streamlit stops or reruns the script, e.g. on a new message mid-turn
+            outcome = "cancelled"
+            logger.info("Agent turn cancelled before completion")
+            if response_text:
+                st.session_state.messages.append(
+                    {"role": "assistant", "content": response_text + " …"}
+                )
+            raise
+        finally:
+            TURN_SECONDS.observe(
+                time.perf_counter() - started, path=path, outcome=outcome
+            )
+            if path == "agent":
+                RENDER_SECONDS.observe(render_seconds)
+            span.set_attributes({"path": path, "outcome": outcome})
+
+
+async def load_last_calculator_input(
+    user_id: str, session_id: str
+) -> FireCalculatorInput | None:
+    """Latest valid calculator input of the session, see `last_calculator_input`."""
+    session = await get_session_service().get_session(
+        app_name=APP_NAME, user_id=user_id, session_id=session_id
+    )
+    return last_calculator_input(session.events) if session else None
+
+
+async def _project_what_if(
+    scenario: FireCalculatorInput, base: FireCalculatorInput
+) -> dict:
+    # Every run of the panel has its own event loop, and so its own HTTP client
+    async with http_client_lifespan():
+        return await project_what_if(scenario, base)
+
+
+@st.fragment
+def render_what_if_panel() -> None:
+    """
+    What-if sliders prefilled from the last calculation in the chat.
+
+    A fragment: moving a slider reruns only this panel, so the chart updates in
+    place without a chat turn or a rerun of the page. Projections go through
+    the projection cache; sliders report a value when they are released, not
+    while they are dragged. The scenario goes to the agent only when the user
+    asks.
+
+    Must run outside the page's event loop, since it runs its own with
+    `asyncio.run`, both on page runs and on its own reruns.
+    """
+    if "session_id" not in st.session_state:
+        return
+    base = asyncio.run(
+        load_last_calculator_input(
+            st.session_state.user_id, st.session_state.session_id
         )
-        st.markdown(response_text)
+    )
+    st.header("Hvad nu hvis?")
+    if base is None:
+        st.caption("Her kan du justere din plan, når den første beregning er lavet.")
+        return
+
+    base_values = base.model_dump()
+    if st.session_state.get("what_if_base") != base_values:
+        # A new calculation in the chat resets the sliders
+        st.session_state.what_if_base = base_values
+        for field, value in base_values.items():
+            st.session_state[f"what_if_{field}"] = value
+    values = {
+        field: st.slider(
+            key=f"what_if_{field}", **slider_range(field, base_values[field])
+        )
+        for field in WHAT_IF_SLIDERS
+    }
+    try:
+        scenario = FireCalculatorInput(**values)
+    except ValidationError as e:
+        st.warning(format_validation_error(e))
+        return
 
-    except Exception as e:
-        error_message = f"An error occurred: {str(e)}"
-        logger.exception(f"⛔️ {error_message}")
-        st.error(error_message)
+    with st.spinner("Beregner…"):
+        try:
+            projection = asyncio.run(_project_what_if(scenario, base))
+        except Exception as e:
+            logger.exception(f"What-if projection failed: {e}")
+            st.error("Beregningen fejlede. Prøv igen om lidt.")
+            return
 
-        # Store error in messages for context
-        st.session_state.messages.append(
-            {"role": "assistant", "content": f"Error: {error_message}"}
+    result = projection["scenario"]["result"]
+    st.metric(
+        "Frie midler ved 95 år",
+        f"{result:,.0f} kr.",
+        delta=f"{result - projection['base']['result']:,.0f} kr.",
+    )
+    st.caption(f"Opsparing: {projection['scenario']['opsparing_ar']:,.0f} kr. om året")
+    st.line_chart(
+        {
+            "FIRE-alder": [row["fire_alder"] for row in projection["sweep"]],
+            "Frie midler ved 95 år": [row["result"] for row in projection["sweep"]],
+        },
+        x="FIRE-alder",
+        y="Frie midler ved 95 år",
+    )
+    trajectory = projection["trajectory"]
+    if trajectory is not None:
+        # Only charted when the engine that answered the totals produced it
+        st.area_chart(
+            {
+                "Alder": trajectory.age,
+                "Frie midler": trajectory.free_funds,
+                "Holding": trajectory.holding,
+                "Pension": trajectory.pension,
+            },
+            x="Alder",
+            y=["Frie midler", "Holding", "Pension"],
         )
+    if st.button("Spørg agenten om dette scenarie"):
+        st.session_state.pending_prompt = format_scenario_prompt(scenario, base)
+        st.rerun()
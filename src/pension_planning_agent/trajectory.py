@@ -0,0 +1,157 @@
+"""
+Year-by-year trajectories of calculated plans.
+
+The trajectory of a plan (`engine.Trajectory`) comes from the local engine,
+in the same computation as the totals. The BusinessLogic API only returns the
+annual savings and the free funds at age 95, so plans it answers have no
+trajectory, rather than one that does not end at the result the user was
+given. `fire_calculator` stores the trajectory of every plan it calculates in
+the session state under `TRAJECTORY_STATE_KEY`, as compact columns, and
+`fire_trajectory` answers follow-up questions ("how much do I have at 70?")
+from it without calculating again.
+"""
+
+from __future__ import annotations
+
+from typing import Any
+
+from pension_planning_agent import engine
+from pension_planning_agent.calculator import build_payload, calculate_projection
+from pension_planning_agent.engine import Trajectory
+from pension_planning_agent.schemas import FireCalculatorInput, FireCalculatorOutput
+
+TRAJECTORY_STATE_KEY = "fire_trajectory"
+
+# Column name -> table header
+TABLE_HEADERS = {
+    "age": "age",
+    "free_funds": "free funds",
+    "holding": "holding",
+    "pension": "pension",
+    "contributions": "contributions",
+    "withdrawals": "withdrawals",
+    "pension_payout": "pension payout (net)",
+}
+
+
+async def calculate_trajectory(calculator_input: FireCalculatorInput) -> Trajectory:
+    """
+    Project a plan year by year with the local engine.
+
+    Args:
+        calculator_input: Validated calculator input
+
+    Returns:
+        Trajectory: Balances and flows from the current age to 95
+    """
+    return engine.trajectory(await build_payload(calculator_input))
+
+
+async def calculate_output(
+    calculator_input: FireCalculatorInput,
+) -> FireCalculatorOutput:
+    """
+    Calculate a plan with the configured backend, with its trajectory when the
+    engine that answered produced one.
+
+    Args:
+        calculator_input: Validated calculator input
+
+    Returns:
+        FireCalculatorOutput: `opsparing_ar`, `result` and `engine` from the
+            backend, and the trajectory of the same computation for local
+            answers; None for remote ones, since the API only returns totals
+    """
+    response = await calculate_projection(calculator_input)
+    return FireCalculatorOutput(
+        opsparing_ar=response["opsparing_ar"],
+        result=response["result"],
+        engine=response["engine"],
+        trajectory=response.get("trajectory"),
+    )
+
+
+def trajectory_state(output: FireCalculatorOutput) -> dict[str, list[int]] | None:
+    """
+    Session state value under `TRAJECTORY_STATE_KEY` for a calculated plan.
+
+    Args:
+        output: Calculated plan
+
+    Returns:
+        dict[str, list[int]] | None: The trajectory's columns, or None when the
+            plan has no trajectory, so the previous plan's is not served
+    """
+    return output.trajectory.to_columns() if output.trajectory is not None else None
+
+
+def format_trajectory(
+    trajectory: Trajectory,
+    from_age: int | None = None,
+    to_age: int | None = None,
+    step: int = 5,
+) -> str:
+    """
+    Summarize a trajectory for the model as a compact table.
+
+    Args:
+        trajectory: Trajectory of the plan
+        from_age: First age shown, defaults to the current age
+        to_age: Last age shown, defaults to 95
+        step: Show every `step`-th age (the first and last age are always shown)
+
+    Returns:
+        str: Balances and flows by age, in DKK
+    """
+    first, last = int(trajectory.age[0]), int(trajectory.age[-1])
+    from_age = min(max(from_age or first, first), last)
+    to_age = max(min(to_age or last, last), from_age)
+    ages = list(range(from_age, to_age + 1, max(step, 1)))
+    if ages[-1] != to_age:
+        ages.append(to_age)
+
+    lines = [
+        "| " + " | ".join(TABLE_HEADERS.values()) + " |",
+        "|" + "---|" * len(TABLE_HEADERS),
+    ]
+    for age in ages:
+        row = trajectory.at(age)
+        lines.append(
+            f"| {age} | "
+            + " | ".join(f"{row[column]:,.0f}" for column in list(TABLE_HEADERS)[1:])
+            + " |"
+        )
+    return "\n".join(lines)
+
+
+async def fire_trajectory(
+    from_age: int = 0,
+    to_age: int = 95,
+    step: int = 5,
+    tool_context: Any = None,  # ADK's ToolContext, see agent.fire_calculator
+) -> str:
+    """
+    Show how the balances of the latest calculated pension plan develop year by
+    year: free funds, holding, pension, contributions, withdrawals and pension
+    payouts. Use this when the user asks how much they will have at a certain
+    age or how their savings develop over time, instead of calculating again.
+
+    Args:
+        from_age: First age to show, 0 for the current age
+        to_age: Last age to show, at most 95
+        step: Years between the rows shown, 1 for every year
+
+    Returns:
+        str: Table of balances and flows by age, in DKK
+    """
+    state = tool_context.state if tool_context else {}
+    if TRAJECTORY_STATE_KEY not in state:
+        return "No plan has been calculated yet. Call fire_calculator first."
+    columns = state[TRAJECTORY_STATE_KEY]
+    if not columns:
+        # Answered by the BusinessLogic API, which only returns totals
+        return (
+            "No year-by-year trajectory is available for the latest plan. "
+            "Answer from its result at age 95 instead."
+        )
+    return format_trajectory(Trajectory.from_columns(columns), from_age, to_age, step)
@@ -0,0 +1,168 @@
+"""
+What-if scenarios for the Streamlit sidebar, computed without the agent.
+
+After the first result users tweak one input at a time. The sidebar panel in
+`streamlit.py` starts from the last validated `FireCalculatorInput` of the
+session (`last_calculator_input`), recomputes the projection of the slider
+values directly (`project_what_if`) and hands the chosen scenario to the
+agent only when the user asks (`format_scenario_prompt`).
+"""
+
+from __future__ import annotations
+
+from typing import Any
+
+from pydantic import ValidationError
+
+from pension_planning_agent.engine import Trajectory
+from pension_planning_agent.fast_path import parse_structured_input
+from pension_planning_agent.scenarios import evaluate_scenarios, format_value
+from pension_planning_agent.schemas import FireCalculatorInput
+from pension_planning_agent.trajectory import calculate_trajectory
+from settings import settings
+
+# Field -> (label, minimum, maximum, step) of its slider
+WHAT_IF_SLIDERS: dict[str, tuple[str, float, float, float]] = {
+    "fire_alder": ("FIRE-alder", 19, 100, 1),
+    "forbrugsmal_md": ("Forbrugsmål/md (kr.)", 0, 150_000, 500),
+    "pensionInd_ar": ("Pensionsindbetaling/år (kr.)", 0, 500_000, 1_000),
+    "manedslon": ("Månedsløn (kr.)", 1_000, 300_000, 500),
+    "alder": ("Alder", 18, 99, 1),
+    "skat_percentage": ("Skat % efter AMB", 0, 60, 0.5),
+    "frie_midler": ("Frie midler (kr.)", 0, 20_000_000, 10_000),
+    "holding_midler": ("Holding midler (kr.)", 0, 20_000_000, 10_000),
+    "rate_and_liv": ("Rate + Liv (kr.)", 0, 20_000_000, 10_000),
+}
+
+
+def slider_range(field: str, value: float) -> dict[str, Any]:
+    """
+    Slider arguments for a field, widened to include `value`.
+
+    Args:
+        field: `FireCalculatorInput` field
+        value: Value of the field in the last calculation
+
+    Returns:
+        dict[str, Any]: `label`, `min_value`, `max_value` and `step`
+    """
+    label, minimum, maximum, step = WHAT_IF_SLIDERS[field]
+    kind = int if FireCalculatorInput.model_fields[field].annotation is int else float
+    return {
+        "label": label,
+        "min_value": kind(min(minimum, value)),
+        "max_value": kind(max(maximum, value)),
+        "step": kind(step),
+    }
+
+
+def last_calculator_input(events: list) -> FireCalculatorInput | None:
+    """
+    The latest valid input calculated in a session, by the agent or a shortcut.
+
+    Args:
+        events: ADK session events, oldest first
+
+    Returns:
+        FireCalculatorInput | None: Input of the latest `fire_calculator` call or
+            fast-path message that validates, or None if there is none
+    """
+    for event in reversed(events):
+        candidates = [
+            call.args
+            for call in event.get_function_calls()
+            if call.name == "fire_calculator"
+        ]
+        if event.invocation_id.startswith("fast-") and event.author == "user":
+            text = "".join(part.text or "" for part in event.content.parts)
+            candidates.append(parse_structured_input(text))
+        for args in candidates:
+            try:
+                return FireCalculatorInput(**(args or {}))
+            except ValidationError:
+                continue
+    return None
+
+
+async def _scenario_trajectory(
+    scenario: FireCalculatorInput, outcome: dict
+) -> Trajectory | None:
+    """Trajectory of the engine that answered the scenario, None for the API."""
+    if outcome["engine"] != "local":
+        return None
+    # The batched local path returns totals only; the engine is deterministic
+    return outcome.get("trajectory") or await calculate_trajectory(scenario)
+
+
+async def project_what_if(
+    scenario: FireCalculatorInput, base: FireCalculatorInput
+) -> dict[str, Any]:
+    """
+    Project a scenario, the calculation it started from and neighbouring FIRE ages.
+
+    All projections go through `evaluate_scenarios`, so remote calls share the
+    projection cache and run concurrently.
+
+    Args:
+        scenario: Slider values
+        base: Last calculated input
+
+    Returns:
+        dict[str, Any]: `scenario` and `base` projections, `sweep`, the
+            scenario's projection per FIRE age within
+            `settings.WHATIF_SWEEP_YEARS` of its own, and the scenario's
+            `trajectory`, None when the BusinessLogic API answered it
+    """
+    span = settings.WHATIF_SWEEP_YEARS
+    ages = range(
+        max(scenario.alder + 1, scenario.fire_alder - span),
+        min(100, scenario.fire_alder + span) + 1,
+    )
+    sweep = [scenario.model_copy(update={"fire_alder": age}) for age in ages]
+    outcomes = await evaluate_scenarios([scenario, base, *sweep])
+    for outcome in outcomes[:2]:
+        if isinstance(outcome, Exception):
+            raise outcome
+    return {
+        "scenario": outcomes[0],
+        "base": outcomes[1],
+        "sweep": [
+            {"fire_alder": item.fire_alder, **outcome}
+            for item, outcome in zip(sweep, outcomes[2:])
+            if not isinstance(outcome, Exception)
+        ],
+        "trajectory": await _scenario_trajectory(scenario, outcomes[0]),
+    }
+
+
+def format_scenario_prompt(
+    scenario: FireCalculatorInput, base: FireCalculatorInput
+) -> str:
+    """
+    Chat message handing a what-if scenario to the agent.
+
+    The message asks a question, so it goes to the agent rather than the fast
+    path or slot filling.
+
+    Args:
+        scenario: Chosen slider values
+        base: Last calculated input
+
+    Returns:
+        str: Message listing the changed and all values of the scenario
+    """
+    changes = [
+        f"- {WHAT_IF_SLIDERS[field][0]}: "
+        f"{format_value(getattr(base, field))} → {format_value(value)}"
+        for field, value in scenario.model_dump().items()
+        if value != getattr(base, field)
+    ]
+    values = ", ".join(
+        f"{key}={value:.10g}" for key, value in scenario.model_dump().items()
+    )
+    return (
+        "Jeg har prøvet et andet scenarie:\n"
+        + ("\n".join(changes) or "- Ingen ændringer")
+        + f"\n\nAlle værdier: {values}\n\n"
+        "Kan du beregne og forklare, hvad det betyder for min plan?"
+    )
@@ -1,3 +1,5 @@
+from typing import Literal
+
 from dotenv import load_dotenv
 from pydantic_settings import BaseSettings
 
@@ -8,9 +10,138 @@ class Settings(BaseSettings):
     NAME: str = "Pension Planning Agent"
     OPEN_ROUTER_API_KEY: str = "open-key"
     LLM_MODEL: str = "openrouter/google/gemini-2.5-flash"
+    OPEN_ROUTER_API_BASE: str = "https://openrouter.ai/api/v1"
     BUSINESSLOGIC_TOKEN: str = (
         "businesslogic-token"  # Please contact petrr.vanekk@gmail.com for the token
     )
+    BUSINESSLOGIC_URL: str = "https://api.businesslogic.online/execute"
+
+    # Projection backend used by fire_calculator
+    FIRE_BACKEND: Literal["remote", "local", "local-with-remote-verify"] = "remote"
+    FIRE_VERIFY_TOLERANCE: float = 0.01  # Relative tolerance for remote verification
+    # Monte Carlo, backtest and trajectory tools, answered by the local engine only;
+    # opt-in until its parity with BusinessLogic is recorded (see parity.py)
+    FIRE_ENGINE_TOOLS_ENABLED: bool = False
+
+    # BusinessLogic retries, hedged requests and circuit breaker
+    FIRE_ATTEMPT_TIMEOUT: float = 10.0  # Seconds per attempt
+    FIRE_TOTAL_TIMEOUT: float = 15.0  # Seconds for all attempts and backoff together
+    FIRE_RETRY_ATTEMPTS: int = 2  # Retries after the first attempt
+    FIRE_RETRY_BACKOFF: float = 0.2  # Seconds, doubled per retry, full jitter
+    FIRE_RETRY_MAX_BACKOFF: float = 2.0
+    FIRE_HEDGE_ENABLED: bool = False
+    FIRE_HEDGE_QUANTILE: float = 0.95  # Recent latency quantile before hedging
+    FIRE_HEDGE_MIN_SAMPLES: int = 20  # Successful calls needed before hedging
+    FIRE_HEDGE_MIN_DELAY: float = 0.05  # Seconds
+    FIRE_BREAKER_ENABLED: bool = True
+    FIRE_BREAKER_ERROR_RATE: float = 0.5  # Failed share of calls that opens it
+    FIRE_BREAKER_MIN_REQUESTS: int = 10  # Calls in the window before it can open
+    FIRE_BREAKER_WINDOW: float = 30.0  # Seconds
+    FIRE_BREAKER_COOLDOWN: float = 30.0  # Seconds open before a trial call
+    # Fail fast until the local engine's parity with BusinessLogic is recorded
+    FIRE_BREAKER_FALLBACK: Literal["local", "error"] = "error"
+
+    # Projection result cache
+    FIRE_CACHE_ENABLED: bool = True
+    FIRE_CACHE_MAXSIZE: int = 1024
+    FIRE_CACHE_TTL: float = 3600.0  # Seconds
+
+    # Scenario grid tool
+    FIRE_GRID_MAX_SCENARIOS: int = 200
+    FIRE_GRID_CONCURRENCY: int = 8
+
+    # Goal-seek solver tool
+    FIRE_SOLVER_PROBES: int = 8  # Evaluations per search round
+    FIRE_SOLVER_MAX_ROUNDS: int = 20
+    FIRE_SOLVER_TOLERANCE: float = 100.0  # DKK
+
+    # Sensitivity analysis tool
+    FIRE_SENSITIVITY_STEP_PERCENT: float = 10.0  # Change of non-age inputs
+    FIRE_SENSITIVITY_AGE_STEP: int = 1  # Years
+
+    # What-if sliders in the Streamlit sidebar
+    WHATIF_SWEEP_YEARS: int = 5  # FIRE ages charted either side of the chosen one
+
+    # Bulk projections (python -m pension_planning_agent.batch)
+    BATCH_CHUNK_SIZE: int = 1_000  # Rows per chunk and checkpoint
+    BATCH_CONCURRENCY: int = 32  # Parallel BusinessLogic calls
+
+    # Monte Carlo simulation tool (annual nominal returns and inflation)
+    FIRE_MC_PATHS: int = 10_000
+    FIRE_MC_CHUNK_SIZE: int = 2_000
+    FIRE_MC_SEED: int = 42
+    FIRE_MC_RETURN_MEAN: float = 0.045
+    FIRE_MC_RETURN_STD: float = 0.10
+    FIRE_MC_INFLATION_MEAN: float = 0.023
+    FIRE_MC_INFLATION_STD: float = 0.01
+
+    # Historical backtest tool (see pension_planning_agent.backtest)
+    FIRE_BACKTEST_DATASET: str = ""  # .npy market history, empty for the bundled one
+    FIRE_BACKTEST_EQUITY_SHARE: float = 0.5  # Rest in bonds, rebalanced yearly
+
+    # ADK session storage ("memory" is lost on restart)
+    SESSION_BACKEND: Literal["memory", "sqlite"] = "memory"
+    SESSION_DB_PATH: str = "sessions.db"
+    SESSION_DB_POOL_SIZE: int = 4  # Idle connections kept open
+    SESSION_DB_BUSY_TIMEOUT: float = 5.0  # Seconds to wait for a write lock
+    SESSION_MAX_IDLE: float = 7 * 24 * 3600.0  # Seconds before a session is evicted
+    SESSION_MAX_SESSIONS: int = 10_000
+    SESSION_EVICT_INTERVAL: float = 300.0  # Seconds between eviction runs
+
+    # Per-turn routing: route -> fallback chain of (model, reasoning effort),
+    # where an empty model is LLM_MODEL (see pension_planning_agent.routing)
+    LLM_ROUTING_ENABLED: bool = False  # Opt-in
+    LLM_ROUTES: dict[str, list[tuple[str, str]]] = {
+        "collect": [("", "low")],
+        "explain": [("", "medium"), ("", "low")],
+        "interpret": [("", "high"), ("", "low")],
+    }
+    LLM_ROUTE_FIRST_RESPONSE_SLO: float = 15.0  # Seconds before the next entry
+
+    # Slot filling: one extraction call per message collects the calculator
+    # inputs ahead of the agent (see pension_planning_agent.slots)
+    SLOT_FILLING_ENABLED: bool = False  # Opt-in
+    SLOT_EXTRACTION_MODEL: str = ""  # Empty is LLM_MODEL
+    SLOT_EXTRACTION_REASONING_EFFORT: str = "low"  # Empty sends none
+    SLOT_EXTRACTION_TIMEOUT: float = 15.0  # Seconds before handing over to the agent
+
+    # Exact-match cache of model responses to the opening turns (opt-in)
+    LLM_CACHE_ENABLED: bool = False
+    LLM_CACHE_MAXSIZE: int = 256  # Responses kept in memory
+    LLM_CACHE_TTL: float = 24 * 3600.0  # Seconds
+    LLM_CACHE_MAX_USER_TURNS: int = 2  # Longer conversations are never cached
+    LLM_CACHE_DB_PATH: str = "llm_cache.db"  # Empty keeps the cache in memory only
+    LLM_CACHE_DB_MAXSIZE: int = 10_000
+
+    # Conversation history compaction before each model call
+    COMPACTION_ENABLED: bool = True
+    COMPACTION_KEEP_TURNS: int = 4  # Latest user turns kept verbatim
+    COMPACTION_MIN_TOKENS: int = 3_000  # Estimated history size that triggers it
+    COMPACTION_EXCERPT_CHARS: int = 300  # Per summarized message or tool result
+
+    # Outbound HTTP client (connection pool shared by all BusinessLogic calls)
+    HTTP_TIMEOUT: float = 30.0
+    HTTP_MAX_CONNECTIONS: int = 100
+    HTTP_MAX_KEEPALIVE_CONNECTIONS: int = 20
+    HTTP_KEEPALIVE_EXPIRY: float = 30.0
+    HTTP_HTTP2: bool = False  # Requires the optional `h2` package
+
+    # Admission control for agent turns (model calls), per process
+    ADMISSION_ENABLED: bool = True
+    ADMISSION_MAX_CONCURRENT: int = 16  # Agent turns running at once
+    ADMISSION_MAX_QUEUE: int = 64  # Turns waiting for a slot before rejecting
+    ADMISSION_QUEUE_TIMEOUT: float = 20.0  # Seconds a turn may wait for a slot
+    ADMISSION_USER_RATE: float = 0.2  # Turns per second per user, 0 disables
+    ADMISSION_USER_BURST: int = 5  # Turns a user may send back to back
+
+    # Prometheus metrics endpoint (/metrics), started by the Streamlit app
+    METRICS_ENABLED: bool = True
+    METRICS_HOST: str = "127.0.0.1"
+    METRICS_PORT: int = 9464
+
+    # Headless HTTP API (`python -m pension_planning_agent.api`)
+    API_HOST: str = "127.0.0.1"
+    API_PORT: int = 8000
 
 
 settings = Settings()
@@ -16,11 +16,80 @@
 from __future__ import annotations
 
 from pathlib import Path
+from unittest.mock import patch
 
 import pytest
 
+from benchmarks.fakes import (
+    SCRIPTED_INPUTS,
+    FakeConfig,
+    FakeServices,
+    prepare_offline_litellm,
+)
+from pension_planning_agent import agent, calculator
+from pension_planning_agent.admission import turn_admission
+from pension_planning_agent.calculator import projection_cache, remote_breaker
+from pension_planning_agent.engine import project
+
 
 @pytest.fixture(scope="session", name="resource_dir")
 def resource_fixture():
     """resource fixture"""
     return Path(__file__).parent / "resources"
+
+
+@pytest.fixture(name="local_backend")
+def local_backend_fixture():
+    """Project with the local engine instead of the BusinessLogic API"""
+    with patch.object(calculator.settings, "FIRE_BACKEND", "local"):
+        yield
+
+
+@pytest.fixture(scope="session", name="local_result")
+def local_result_fixture():
+    """Local engine result of SCRIPTED_INPUTS with the given changes"""
+
+    def local_result(**changes) -> float:
+        payload = {**SCRIPTED_INPUTS, **changes}
+        payload["skat_percentage"] /= 100
+        payload["folkepensionsalder"] = calculator.FOLKEPENSIONSALDER
+        return project(payload)["result"]
+
+    return local_result
+
+
+@pytest.fixture(autouse=True)
+def clear_projection_cache():
+    """Start every test with an empty projection cache"""
+    projection_cache.clear()
+
+
+@pytest.fixture(autouse=True)
+def reset_remote_breaker():
+    """Start every test with a closed BusinessLogic circuit breaker"""
+    remote_breaker.reset()
+
+
+@pytest.fixture(autouse=True)
+def reset_turn_admission():
+    """Start every test without per-user rate limits used up"""
+    turn_admission.reset()
+
+
+@pytest.fixture
+def fake_agent():
+    """Agent wired to local fake OpenRouter and BusinessLogic services"""
+    prepare_offline_litellm()
+    factories = (agent.get_model, agent.get_agent, agent.get_runner)
+    config = FakeConfig(llm_delay=0, execute_delay=0)
+    with (
+        FakeServices(config) as services,
+        patch.object(agent.settings, "OPEN_ROUTER_API_BASE", services.llm_base_url),
+        patch.object(agent.settings, "BUSINESSLOGIC_URL", services.execute_url),
+        patch.object(agent.settings, "FIRE_BACKEND", "remote"),
+    ):
+        for factory in factories:
+            factory.cache_clear()
+        yield services
+    for factory in factories:
+        factory.cache_clear()
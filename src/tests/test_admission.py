@@ -0,0 +1,177 @@
+"""Tests for admission control of agent turns."""
+
+import asyncio
+import threading
+
+import httpx
+import pytest
+from unittest.mock import patch
+
+from pension_planning_agent import admission, metrics
+from pension_planning_agent.admission import AdmissionController, AdmissionRejected
+from pension_planning_agent.api import app
+from tests.test_api import parse_events
+
+
+def make_controller(**kwargs) -> AdmissionController:
+    options = dict(
+        max_concurrent=1, max_queue=2, queue_timeout=1.0, user_rate=0, user_burst=1
+    )
+    return AdmissionController(**{**options, **kwargs})
+
+
+class TestRateLimit:
+    """Tests for the per-user token buckets."""
+
+    @pytest.mark.asyncio
+    async def test_burst_then_refill(self):
+        """Test that a user gets `burst` turns, then one per 1/rate seconds."""
+        now = [0.0]
+        controller = make_controller(
+            max_concurrent=10, user_rate=0.5, user_burst=2, clock=lambda: now[0]
+        )
+        for _ in range(2):
+            async with controller.admit("anna"):
+                pass
+
+        with pytest.raises(AdmissionRejected) as rejected:
+            await controller.acquire("anna")
+        assert rejected.value.reason == "rate_limited"
+        assert rejected.value.retry_after == pytest.approx(2.0)
+        assert "2 seconds" in rejected.value.message
+
+        # Other users are not affected, and the bucket refills
+        async with controller.admit("bo"):
+            pass
+        now[0] = 2.0
+        async with controller.admit("anna"):
+            pass
+
+    @pytest.mark.asyncio
+    async def test_idle_buckets_are_bounded(self):
+        """Test that only the most recently active users' buckets are kept."""
+        controller = make_controller(user_rate=1, user_burst=1, max_users=2)
+        for user in ("anna", "bo", "carl"):
+            async with controller.admit(user):
+                pass
+        assert list(controller._buckets) == ["bo", "carl"]
+
+
+class TestConcurrency:
+    """Tests for the global cap and the wait queue."""
+
+    @pytest.mark.asyncio
+    async def test_queued_turns_are_admitted_in_order(self):
+        """Test that a released slot goes to the longest-waiting turn."""
+        controller = make_controller()
+        order = []
+
+        async def turn(name):
+            async with controller.admit(name):
+                order.append(name)
+                await asyncio.sleep(0.01)
+
+        first = asyncio.create_task(turn("first"))
+        await asyncio.sleep(0)
+        waiting = [asyncio.create_task(turn(name)) for name in ("second", "third")]
+        await asyncio.sleep(0)
+        assert (controller.in_flight, controller.queue_depth) == (1, 2)
+        assert metrics.ADMISSION_QUEUE_DEPTH.value() == 2
+
+        await asyncio.gather(first, *waiting)
+        assert order == ["first", "second", "third"]
+        assert (controller.in_flight, controller.queue_depth) == (0, 0)
+
+    @pytest.mark.asyncio
+    async def test_full_queue_rejects_immediately(self):
+        """Test that turns beyond the queue bound are rejected without waiting."""
+        controller = make_controller(max_queue=0)
+        rejections = metrics.ADMISSION_REJECTIONS.value(reason="queue_full")
+        async with controller.admit("anna"):
+            with pytest.raises(AdmissionRejected) as rejected:
+                await controller.acquire("bo")
+
+        assert rejected.value.reason == "queue_full"
+        assert metrics.ADMISSION_REJECTIONS.value(reason="queue_full") == rejections + 1
+
+    @pytest.mark.asyncio
+    async def test_wait_times_out(self):
+        """Test that a turn waiting longer than the timeout is rejected."""
+        controller = make_controller(queue_timeout=0.01)
+        timeouts = metrics.ADMISSION_WAIT_SECONDS.count(outcome="timeout")
+        async with controller.admit("anna"):
+            with pytest.raises(AdmissionRejected) as rejected:
+                await controller.acquire("bo")
+
+        assert rejected.value.reason == "timeout"
+        assert controller.queue_depth == 0
+        assert controller.in_flight == 0
+        assert metrics.ADMISSION_WAIT_SECONDS.count(outcome="timeout") == timeouts + 1
+
+    @pytest.mark.asyncio
+    async def test_cancelled_wait_leaves_the_queue(self):
+        """Test that a cancelled turn does not keep its place in the queue."""
+        controller = make_controller()
+        async with controller.admit("anna"):
+            waiting = asyncio.create_task(controller.acquire("bo"))
+            await asyncio.sleep(0)
+            waiting.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await waiting
+            assert controller.queue_depth == 0
+        assert controller.in_flight == 0
+
+    @pytest.mark.asyncio
+    async def test_slot_is_handed_to_another_event_loop(self):
+        """Test that a turn waiting on another thread's loop is woken."""
+        controller = make_controller()
+        admitted = threading.Event()
+
+        async def other_session():
+            async with controller.admit("bo"):
+                admitted.set()
+
+        async with controller.admit("anna"):
+            thread = threading.Thread(target=asyncio.run, args=(other_session(),))
+            thread.start()
+            while controller.queue_depth == 0:
+                await asyncio.sleep(0.001)
+            assert not admitted.is_set()
+
+        await asyncio.to_thread(thread.join, 5)
+        assert admitted.is_set()
+        assert controller.in_flight == 0
+
+
+class TestApiAdmission:
+    """Tests for rejected turns in the HTTP API."""
+
+    @pytest.mark.asyncio
+    async def test_rejected_turn_streams_error(self, fake_agent):
+        """Test that a rejected turn ends with a friendly error event."""
+        transport = httpx.ASGITransport(app=app)
+        rejected = AdmissionRejected("queue_full", 20.0)
+        with patch.object(admission.turn_admission, "acquire", side_effect=rejected):
+            async with httpx.AsyncClient(
+                transport=transport, base_url="http://api"
+            ) as client:
+                await client.post(
+                    "/sessions", json={"user_id": "u", "session_id": "api-admission"}
+                )
+                response = await client.post(
+                    "/sessions/api-admission/messages",
+                    json={"user_id": "u", "text": "Hej"},
+                )
+
+        events = parse_events(response.text)
+        assert events == [
+            (
+                "error",
+                {
+                    "message": rejected.message,
+                    "reason": "queue_full",
+                    "retry_after": 20,
+                },
+            )
+        ]
+        assert fake_agent.stats.chat_requests == 0
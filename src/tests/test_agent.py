@@ -3,6 +3,8 @@
 import pytest
 from unittest.mock import AsyncMock, Mock, patch
 
+from benchmarks.import_time import measure
+from pension_planning_agent import agent
 from pension_planning_agent.agent import (
     convert_percentage_to_float,
     generate_final_message,
@@ -86,10 +88,8 @@ class TestFireCalculator:
         }
         mock_response.raise_for_status = Mock()
 
-        with patch("httpx.AsyncClient") as mock_client:
-            mock_client.return_value.__aenter__.return_value.post = AsyncMock(
-                return_value=mock_response
-            )
+        with patch("pension_planning_agent.calculator.get_http_client") as mock_client:
+            mock_client.return_value.post = AsyncMock(return_value=mock_response)
 
             result = await fire_calculator(
                 manedslon=50000.0,
@@ -163,8 +163,8 @@ class TestFireCalculator:
     @pytest.mark.asyncio
     async def test_api_timeout(self):
         """Test calculator behavior on API timeout."""
-        with patch("httpx.AsyncClient") as mock_client:
-            mock_client.return_value.__aenter__.return_value.post = AsyncMock(
+        with patch("pension_planning_agent.calculator.get_http_client") as mock_client:
+            mock_client.return_value.post = AsyncMock(
                 side_effect=__import__("httpx").TimeoutException("Timeout")
             )
 
@@ -189,8 +189,8 @@ class TestFireCalculator:
         mock_response.status_code = 500
         mock_response.text = "Internal Server Error"
 
-        with patch("httpx.AsyncClient") as mock_client:
-            mock_client.return_value.__aenter__.return_value.post = AsyncMock(
+        with patch("pension_planning_agent.calculator.get_http_client") as mock_client:
+            mock_client.return_value.post = AsyncMock(
                 side_effect=__import__("httpx").HTTPStatusError(
                     "Error", request=Mock(), response=mock_response
                 )
@@ -209,3 +209,36 @@ class TestFireCalculator:
             )
 
             assert "Failed to calculate pension plan" in result
+
+
+class TestLazyConstruction:
+    """Tests for the lazily created model, agent and runner."""
+
+    def test_import_does_not_load_agent_framework(self):
+        """Test that importing the module leaves google-adk and LiteLLM unloaded."""
+        assert measure("pension_planning_agent.agent")["heavy_imports"] == []
+
+    def test_runner_is_created_once(self):
+        """Test that the former globals resolve to the cached instances."""
+        runner = agent.get_runner()
+
+        assert agent.runner is runner
+        assert runner.agent is agent.fire_agent is agent.get_agent()
+        assert runner.session_service is agent.session_service
+        assert agent.fire_agent.model is agent.model
+
+    def test_engine_tools_are_opt_in(self):
+        """Test that the tools answered by the local engine alone are opt-in."""
+        for enabled in (False, True):
+            with patch.object(agent.settings, "FIRE_ENGINE_TOOLS_ENABLED", enabled):
+                fire_agent = agent.get_agent.__wrapped__()
+            names = {tool.__name__ for tool in fire_agent.tools}
+
+            assert "fire_calculator" in names
+            assert ("fire_monte_carlo" in names) is enabled
+            assert ("Monte Carlo" in fire_agent.instruction) is enabled
+
+    def test_unknown_attribute(self):
+        """Test that other missing attributes still raise AttributeError."""
+        with pytest.raises(AttributeError):
+            agent.does_not_exist
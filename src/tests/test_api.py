@@ -0,0 +1,192 @@
+"""Tests for the headless HTTP API."""
+
+import json
+
+import httpx
+import pytest
+from unittest.mock import AsyncMock, patch
+
+from benchmarks.fakes import SCRIPTED_INPUTS
+from pension_planning_agent import slots, trajectory
+from pension_planning_agent.api import app
+
+STRUCTURED_MESSAGE = ", ".join(
+    f"{key}={value}" for key, value in SCRIPTED_INPUTS.items()
+)
+
+
+def parse_events(body: str) -> list[tuple[str, dict]]:
+    """Split an SSE body into (event type, data) pairs."""
+    events = []
+    for block in body.strip().split("\n\n"):
+        fields = dict(line.split(": ", 1) for line in block.splitlines())
+        events.append((fields["event"], json.loads(fields["data"])))
+    return events
+
+
+@pytest.fixture
+async def client():
+    """HTTP client calling the ASGI app in-process"""
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://api") as client:
+        yield client
+
+
+async def create_session(client: httpx.AsyncClient, session_id: str) -> None:
+    response = await client.post(
+        "/sessions", json={"user_id": "u", "session_id": session_id}
+    )
+    assert response.status_code == 201
+
+
+class TestSessions:
+    """Tests for session creation."""
+
+    @pytest.mark.asyncio
+    async def test_create_session(self, client):
+        """Test that a session ID is generated when none is given."""
+        response = await client.post("/sessions", json={"user_id": "u"})
+
+        assert response.status_code == 201
+        assert response.json()["user_id"] == "u"
+        assert response.json()["session_id"]
+
+    @pytest.mark.asyncio
+    async def test_duplicate_session_is_rejected(self, client):
+        """Test that an existing session ID cannot be created again."""
+        await create_session(client, "api-duplicate")
+        response = await client.post(
+            "/sessions", json={"user_id": "u", "session_id": "api-duplicate"}
+        )
+        assert response.status_code == 409
+
+    @pytest.mark.asyncio
+    async def test_unknown_session(self, client):
+        """Test that messages to an unknown session are rejected."""
+        response = await client.post(
+            "/sessions/missing/messages", json={"user_id": "u", "text": "Hej"}
+        )
+        assert response.status_code == 404
+
+
+class TestMessages:
+    """Tests for streamed agent turns."""
+
+    @pytest.mark.asyncio
+    async def test_streams_agent_events(self, client, fake_agent):
+        """Test that tool use and the reply are streamed as SSE."""
+        await create_session(client, "api-agent")
+        response = await client.post(
+            "/sessions/api-agent/messages", json={"user_id": "u", "text": "Hej"}
+        )
+
+        assert response.headers["content-type"].startswith("text/event-stream")
+        events = parse_events(response.text)
+        types = [event for event, _ in events]
+        assert types.index("tool_call") < types.index("tool_result")
+        assert types.index("tool_result") < types.index("text")
+        assert events[-1][0] == "done"
+        assert events[-1][1]["reply"] == fake_agent.config.reply
+        assert events[-1][1]["path"] == "agent"
+
+    @pytest.mark.asyncio
+    async def test_partial_profile_uses_slot_filling(self, client, fake_agent):
+        """Test that an incomplete profile is collected without an agent turn."""
+        await create_session(client, "api-slots")
+        with patch.object(slots.settings, "SLOT_FILLING_ENABLED", True):
+            response = await client.post(
+                "/sessions/api-slots/messages",
+                json={"user_id": "u", "text": "alder=52, manedslon=75700"},
+            )
+
+        events = parse_events(response.text)
+        assert events[-1][1]["path"] == "slots"
+        assert "FIRE-alder" in events[-1][1]["reply"]
+        assert fake_agent.stats.chat_requests == fake_agent.stats.extraction_requests
+
+    @pytest.mark.asyncio
+    async def test_structured_input_uses_fast_path(self, client, fake_agent):
+        """Test that complete structured input is answered without the model."""
+        await create_session(client, "api-fast")
+        response = await client.post(
+            "/sessions/api-fast/messages",
+            json={"user_id": "u", "text": STRUCTURED_MESSAGE},
+        )
+
+        events = parse_events(response.text)
+        assert events[-1][0] == "done"
+        assert events[-1][1]["path"] == "fast"
+        assert "Hvis du sparer" in events[-1][1]["reply"]
+        assert fake_agent.stats.chat_requests == 0
+
+
+class TestCalculate:
+    """Tests for the direct calculation endpoint."""
+
+    @pytest.mark.asyncio
+    async def test_calculate(self, client, fake_agent):
+        """Test that valid input is calculated with fire_calculator."""
+        response = await client.post("/calculate", json=SCRIPTED_INPUTS)
+
+        assert response.status_code == 200
+        assert "Hvis du sparer" in response.json()["message"]
+        assert fake_agent.stats.execute_requests == 1
+        # Answered by the API, which returns no trajectory
+        assert response.json()["projection"]["trajectory"] is None
+
+    @pytest.mark.asyncio
+    async def test_calculate_locally(self, client, local_backend):
+        """Test that a local calculation returns its trajectory."""
+        response = await client.post("/calculate", json=SCRIPTED_INPUTS)
+
+        assert response.status_code == 200
+        trajectory = response.json()["projection"]["trajectory"]
+        assert trajectory["age"] == list(range(SCRIPTED_INPUTS["alder"], 96))
+
+    @pytest.mark.asyncio
+    async def test_message_and_projection_from_one_calculation(self, client):
+        """Test that the reply is written from the returned projection."""
+        response = {"opsparing_ar": 1000.0, "result": 2000.0, "engine": "remote"}
+        projection = AsyncMock(return_value=response)
+        with patch.object(trajectory, "calculate_projection", projection):
+            reply = await client.post("/calculate", json=SCRIPTED_INPUTS)
+
+        projection.assert_awaited_once()
+        assert "2,000 kr." in reply.json()["message"]
+        assert reply.json()["projection"]["result"] == 2000.0
+
+    @pytest.mark.asyncio
+    async def test_failed_calculation_has_no_projection(self, client):
+        """Test that a failed calculation returns its message without a projection."""
+        failed = AsyncMock(side_effect=httpx.ConnectError("refused"))
+        with patch.object(trajectory, "calculate_projection", failed):
+            reply = await client.post("/calculate", json=SCRIPTED_INPUTS)
+
+        assert reply.status_code == 200
+        assert "unexpected error" in reply.json()["message"]
+        assert reply.json()["projection"] is None
+
+    @pytest.mark.asyncio
+    async def test_invalid_input(self, client):
+        """Test that invalid input is rejected before calculating."""
+        response = await client.post(
+            "/calculate", json={**SCRIPTED_INPUTS, "fire_alder": 40}
+        )
+        assert response.status_code == 422
+
+
+class TestOperations:
+    """Tests for the metrics and health endpoints."""
+
+    @pytest.mark.asyncio
+    async def test_metrics(self, client):
+        """Test that Prometheus metrics are served."""
+        response = await client.get("/metrics")
+        assert response.status_code == 200
+        assert "# TYPE agent_turn_seconds histogram" in response.text
+
+    @pytest.mark.asyncio
+    async def test_healthz(self, client):
+        """Test the liveness probe."""
+        response = await client.get("/healthz")
+        assert response.json() == {"status": "ok"}
@@ -0,0 +1,121 @@
+"""Tests for the historical backtest."""
+
+import numpy as np
+import pytest
+
+from pension_planning_agent import engine
+from pension_planning_agent.backtest import (
+    DATASET_DTYPE,
+    DATASET_SOURCE,
+    backtest,
+    build_dataset,
+    fire_backtest,
+    load_history,
+    rolling_growth,
+)
+
+PAYLOAD = {
+    "manedslon": 75700.0,
+    "alder": 52,
+    "pensionInd_ar": 85000.0,
+    "skat_percentage": 0.33,
+    "forbrugsmal_md": 34100.0,
+    "frie_midler": 935000.0,
+    "holding_midler": 0.0,
+    "rate_and_liv": 4190000.0,
+    "folkepensionsalder": 70,
+    "fire_alder": 62,
+}
+
+
+def flat_history(years: int, real_return: float) -> np.ndarray:
+    """Market history with the same real return every year."""
+    history = np.zeros(years, dtype=DATASET_DTYPE)
+    history["year"] = np.arange(2000, 2000 + years)
+    history["stocks"] = history["bonds"] = real_return
+    return history
+
+
+class TestDataset:
+    """Tests for the bundled market history."""
+
+    def test_bundled_dataset_matches_source(self, tmp_path):
+        """Test that the bundled .npy is up to date with its CSV source."""
+        build_dataset(DATASET_SOURCE, tmp_path / "history.npy")
+
+        history = load_history()
+        assert isinstance(history, np.memmap)
+        np.testing.assert_array_equal(
+            history, np.load(tmp_path / "history.npy", mmap_mode="r")
+        )
+        assert np.all(np.diff(history["year"]) == 1)
+
+    def test_rolling_windows(self):
+        """Test that every window is a view of consecutive years."""
+        history = load_history()
+        growth = rolling_growth(history, 40, equity_share=1.0)
+
+        assert growth.shape == (len(history) - 39, 40)
+        assert growth[1, 0] == pytest.approx(
+            (1 + history["stocks"][1]) / (1 + history["inflation"][1])
+        )
+
+
+class TestBacktest:
+    """Tests for replaying a plan over every window."""
+
+    def test_flat_history_matches_engine(self):
+        """Test that a history with the engine's return reproduces the engine."""
+        history = flat_history(60, engine.RETURN_RATE)
+
+        result = backtest(PAYLOAD, history=history)
+
+        assert result.windows == 60 - (engine.END_AGE - PAYLOAD["alder"]) + 1
+        assert result.worst.result == pytest.approx(engine.project(PAYLOAD)["result"])
+        assert result.best.result == pytest.approx(result.worst.result)
+
+    def test_outcomes_are_ordered(self):
+        """Test that the worst, median and best windows are ordered."""
+        result = backtest(PAYLOAD)
+
+        assert result.worst.result <= result.median.result <= result.best.result
+        assert result.first_year == 1928
+        assert 0.0 <= result.failure_rate <= 1.0
+        if result.worst.result < 0:
+            assert result.worst.depleted_at is not None
+
+    def test_youngest_client_within_budget(self):
+        """Test that the longest plan has a window and fits in a chat turn."""
+        result = backtest({**PAYLOAD, "alder": 18, "fire_alder": 50})
+
+        assert result.windows >= 1
+        assert result.elapsed_ms < 1000
+
+    def test_history_too_short(self):
+        """Test that a history shorter than the plan is rejected."""
+        with pytest.raises(ValueError, match="covers 10 years"):
+            backtest(PAYLOAD, history=flat_history(10, 0.02))
+
+
+class TestFireBacktestTool:
+    """Tests for the agent tool wrapper."""
+
+    @pytest.mark.asyncio
+    async def test_tool_output(self):
+        """Test that the tool reports the failure rate and three windows."""
+        payload = {k: v for k, v in PAYLOAD.items() if k != "folkepensionsalder"}
+        message = await fire_backtest(**{**payload, "skat_percentage": 33.0})
+
+        assert "historical start years 1928-" in message
+        assert [line.split(" | ")[0] for line in message.splitlines()[3:]] == [
+            "| worst",
+            "| median",
+            "| best",
+        ]
+
+    @pytest.mark.asyncio
+    async def test_invalid_input(self):
+        """Test that invalid plans are reported like fire_calculator does."""
+        payload = {k: v for k, v in PAYLOAD.items() if k != "folkepensionsalder"}
+        message = await fire_backtest(**{**payload, "alder": 15})
+        assert "Invalid input parameters" in message
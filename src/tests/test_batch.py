@@ -0,0 +1,128 @@
+"""Tests for bulk projections from CSV and Parquet files."""
+
+import csv
+import json
+
+import pytest
+from unittest.mock import patch
+
+from benchmarks.fakes import SCRIPTED_INPUTS
+from pension_planning_agent import batch, calculator
+from pension_planning_agent.schemas import FireCalculatorInput
+
+
+def write_clients(path, count: int, invalid: tuple[int, ...] = ()) -> list[dict]:
+    """Write `count` client profiles, with `fire_alder` too low in `invalid` rows."""
+    rows = []
+    for i in range(count):
+        row = {"client_id": f"c{i}", **SCRIPTED_INPUTS, "manedslon": 50_000 + i * 100}
+        if i in invalid:
+            row["fire_alder"] = row["alder"]
+        rows.append(row)
+    if path.suffix == ".parquet":
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        pq.write_table(pa.Table.from_pylist(rows), path, row_group_size=3)
+    else:
+        with path.open("w", newline="") as file:
+            writer = csv.DictWriter(file, list(rows[0]))
+            writer.writeheader()
+            writer.writerows(rows)
+    return rows
+
+
+def read_csv(path) -> list[dict]:
+    with path.open(newline="") as file:
+        return list(csv.DictReader(file))
+
+
+class TestReadInput:
+    """Tests for streaming input rows."""
+
+    @pytest.mark.parametrize("suffix", [".csv", ".parquet"])
+    def test_chunks_and_skip(self, tmp_path, suffix):
+        """Test that rows are chunked and leading rows skipped, in both formats."""
+        path = tmp_path / f"clients{suffix}"
+        rows = write_clients(path, 10)
+
+        chunks = list(batch.iter_chunks(path, chunk_size=4, skip=5))
+
+        assert [len(chunk) for chunk in chunks] == [4, 1]
+        assert [row["client_id"] for row in chunks[0]] == ["c5", "c6", "c7", "c8"]
+        assert batch.read_columns(path) == list(rows[0])
+
+
+class TestRunBatch:
+    """Tests for projecting a file of client profiles."""
+
+    @pytest.mark.asyncio
+    async def test_csv_to_csv(self, tmp_path, local_backend):
+        """Test that valid rows are projected and invalid rows get an error."""
+        input_path, output_path = tmp_path / "clients.csv", tmp_path / "out.csv"
+        rows = write_clients(input_path, 5, invalid=(2,))
+
+        stats = await batch.run_batch(input_path, output_path, chunk_size=2)
+
+        results = read_csv(output_path)
+        expected = await calculator.calculate_projection(
+            FireCalculatorInput(**{k: rows[0][k] for k in batch.INPUT_FIELDS})
+        )
+        assert (stats.rows, stats.errors) == (5, 1)
+        assert [row["client_id"] for row in results] == [
+            row["client_id"] for row in rows
+        ]
+        assert float(results[0]["result"]) == pytest.approx(expected["result"])
+        assert "fire_alder" in results[2]["error"]
+        assert not (tmp_path / "out.csv.checkpoint").exists()
+
+    @pytest.mark.asyncio
+    async def test_resume_after_interruption(self, tmp_path, local_backend):
+        """Test that a resumed run writes every row exactly once."""
+        input_path, output_path = tmp_path / "clients.parquet", tmp_path / "out.jsonl"
+        write_clients(input_path, 7)
+        evaluate_rows = batch.evaluate_rows
+        calls = 0
+
+        async def interrupted(rows, concurrency):
+            nonlocal calls
+            calls += 1
+            if calls == 3:
+                # Half a chunk reached the file before the crash
+                with output_path.open("a") as file:
+                    file.write('{"client_id": "partial"}\n')
+                raise KeyboardInterrupt
+            return await evaluate_rows(rows, concurrency)
+
+        with patch.object(batch, "evaluate_rows", interrupted):
+            with pytest.raises(KeyboardInterrupt):
+                await batch.run_batch(input_path, output_path, chunk_size=2)
+
+        stats = await batch.run_batch(input_path, output_path, chunk_size=2)
+
+        lines = [json.loads(line) for line in output_path.read_text().splitlines()]
+        assert [line["client_id"] for line in lines] == [f"c{i}" for i in range(7)]
+        assert (stats.rows, stats.skipped) == (3, 4)
+
+    @pytest.mark.asyncio
+    async def test_checkpoint_of_other_input(self, tmp_path):
+        """Test that a checkpoint is not applied to a different input."""
+        input_path, output_path = tmp_path / "clients.csv", tmp_path / "out.csv"
+        write_clients(input_path, 1)
+        batch.Checkpoint(input="other.csv", rows=1).save(
+            tmp_path / "out.csv.checkpoint"
+        )
+        with pytest.raises(ValueError, match="--restart"):
+            await batch.run_batch(input_path, output_path)
+
+    @pytest.mark.asyncio
+    async def test_remote_backend(self, tmp_path, fake_agent):
+        """Test that rows are projected concurrently through the BusinessLogic API."""
+        input_path, output_path = tmp_path / "clients.csv", tmp_path / "out.csv"
+        write_clients(input_path, 6)
+
+        stats = await batch.run_batch(input_path, output_path, concurrency=3)
+
+        assert (stats.rows, stats.errors) == (6, 0)
+        assert fake_agent.stats.execute_requests == 6
+        assert all(row["result"] for row in read_csv(output_path))
@@ -0,0 +1,86 @@
+"""Smoke tests for the offline end-to-end and load benchmarks."""
+
+import pytest
+
+from benchmarks import e2e, load
+from benchmarks.report import compare_results, latency_summary
+from pension_planning_agent import agent
+
+
+class TestEndToEnd:
+    """Tests for agent turns against the fake services."""
+
+    @pytest.mark.asyncio
+    async def test_turn_calls_tool_and_replies(self, fake_agent):
+        """Test that a scripted turn runs fire_calculator and returns the reply."""
+        await agent.get_session_service().create_session(
+            app_name=agent.APP_NAME, user_id="u", session_id="e2e"
+        )
+        turn = await e2e.run_turn("u", "e2e", e2e.USER_MESSAGE)
+
+        assert turn["reply"] == fake_agent.config.reply
+        assert len(turn["tool_latencies"]) == 1
+        assert fake_agent.stats.chat_requests == 2
+        assert fake_agent.stats.execute_requests == 1
+
+    @pytest.mark.asyncio
+    async def test_bench_runner(self, fake_agent):
+        """Test that concurrent sessions are measured without errors."""
+        results = await e2e.bench_runner(sessions=3, concurrency=2, turns=1)
+
+        assert results["errors"] == 0
+        assert results["turn_latency"]["count"] == 3
+        assert results["tool_latency"]["count"] == 3
+
+
+class TestLoad:
+    """Tests for the load generator."""
+
+    @pytest.mark.asyncio
+    async def test_scripted_flow(self, fake_agent):
+        """Test that the fake asks the questions and calls the tool on the last answer."""
+        fake_agent.config.questions = load.QUESTIONS
+        await agent.get_session_service().create_session(
+            app_name=agent.APP_NAME, user_id="u", session_id="load"
+        )
+        replies = []
+        for message in load.conversation_script(0):
+            replies.append((await e2e.run_turn("u", "load", message))["reply"])
+
+        assert replies == [*load.QUESTIONS, fake_agent.config.reply]
+        assert fake_agent.stats.execute_requests == 1
+
+    def test_start_offsets(self):
+        """Test the ramp-up profiles."""
+        assert load.start_offsets(3, 10, "instant", 2) == [0, 0, 0]
+        assert load.start_offsets(3, 10, "linear", 2) == [0, 5, 10]
+        assert load.start_offsets(4, 10, "step", 2) == [0, 0, 10, 10]
+
+    def test_histogram(self):
+        """Test that latencies fall into the first bucket they fit."""
+        counts = load.histogram([0.01, 0.05, 0.2, 60])
+        assert counts["<=50ms"] == 2
+        assert counts["<=250ms"] == 1
+        assert counts["inf"] == 1
+        assert sum(counts.values()) == 4
+
+
+class TestReport:
+    """Tests for the result helpers."""
+
+    def test_latency_summary(self):
+        """Test that latencies in seconds are summarized in milliseconds."""
+        summary = latency_summary([0.001 * i for i in range(1, 101)])
+        assert summary["count"] == 100
+        assert summary["p50_ms"] == pytest.approx(50.5)
+        assert summary["max_ms"] == pytest.approx(100)
+
+    def test_compare_results(self):
+        """Test that nested numeric metrics are compared."""
+        lines = compare_results(
+            {"runner": {"p95_ms": 100.0}, "commit": "a"},
+            {"runner": {"p95_ms": 80.0}, "commit": "b"},
+        )
+        assert len(lines) == 1
+        assert lines[0].startswith("runner.p95_ms")
+        assert lines[0].endswith("-20.0%")
@@ -0,0 +1,193 @@
+"""Tests for the TTL/LRU cache with single-flight deduplication."""
+
+import asyncio
+
+import pytest
+from unittest.mock import AsyncMock, patch
+
+from pension_planning_agent import calculator
+from pension_planning_agent.cache import TTLCache, content_key
+from pension_planning_agent.calculator import calculate_projection, projection_cache
+from pension_planning_agent.schemas import FireCalculatorInput
+
+
+class FakeClock:
+    """Manually advanced clock for TTL tests."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestContentKey:
+    """Tests for content-addressed keys."""
+
+    def test_key_ignores_dict_order(self):
+        """Test that equal payloads give equal keys regardless of order."""
+        assert content_key({"a": 1, "b": 2.0}) == content_key({"b": 2.0, "a": 1})
+
+    def test_key_differs_for_different_values(self):
+        """Test that different payloads give different keys."""
+        assert content_key({"a": 1}) != content_key({"a": 2})
+
+
+class TestTTLCache:
+    """Tests for expiry, eviction and counters."""
+
+    def test_lru_eviction(self):
+        """Test that the least recently used entry is evicted first."""
+        cache = TTLCache(maxsize=2, ttl=60)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+
+        assert cache.get("a") == 1
+        assert cache.get("b") is None
+        assert cache.stats()["evictions"] == 1
+
+    def test_ttl_expiry(self):
+        """Test that entries expire after the TTL."""
+        clock = FakeClock()
+        cache = TTLCache(maxsize=10, ttl=5, clock=clock)
+        cache.set("a", 1)
+
+        clock.now = 4.9
+        assert cache.get("a") == 1
+        clock.now = 5.0
+        assert cache.get("a") is None
+        assert cache.stats()["expirations"] == 1
+
+    @pytest.mark.asyncio
+    async def test_hit_and_miss_counters(self):
+        """Test that a repeated key is a hit and computes once."""
+        cache = TTLCache(maxsize=10, ttl=60)
+        compute = AsyncMock(return_value={"result": 1})
+
+        await cache.get_or_compute("k", compute)
+        await cache.get_or_compute("k", compute)
+
+        assert compute.await_count == 1
+        assert cache.stats()["hits"] == 1
+        assert cache.stats()["misses"] == 1
+
+    @pytest.mark.asyncio
+    async def test_concurrent_requests_share_one_call(self):
+        """Test single-flight deduplication of concurrent identical requests."""
+        cache = TTLCache(maxsize=10, ttl=60)
+        calls = 0
+
+        async def compute():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.01)
+            return {"result": 1}
+
+        results = await asyncio.gather(
+            *(cache.get_or_compute("k", compute) for _ in range(5))
+        )
+
+        assert calls == 1
+        assert all(result == {"result": 1} for result in results)
+        assert cache.stats()["coalesced"] == 4
+
+    @pytest.mark.asyncio
+    async def test_failures_are_shared_and_not_cached(self):
+        """Test that errors reach every waiter and the next call retries."""
+        cache = TTLCache(maxsize=10, ttl=60)
+
+        async def fail():
+            await asyncio.sleep(0.01)
+            raise RuntimeError("boom")
+
+        results = await asyncio.gather(
+            cache.get_or_compute("k", fail),
+            cache.get_or_compute("k", fail),
+            return_exceptions=True,
+        )
+        assert all(isinstance(result, RuntimeError) for result in results)
+
+        compute = AsyncMock(return_value={"result": 2})
+        assert await cache.get_or_compute("k", compute) == {"result": 2}
+
+    @pytest.mark.asyncio
+    async def test_waiter_keeps_cacheable_when_owner_is_cancelled(self):
+        """Test that a waiter computing for a cancelled owner still filters."""
+        cache = TTLCache(maxsize=10, ttl=60)
+        started = asyncio.Event()
+
+        async def slow():
+            started.set()
+            await asyncio.sleep(10)
+
+        owner = asyncio.create_task(cache.get_or_compute("k", slow))
+        await started.wait()
+        waiter = asyncio.create_task(
+            cache.get_or_compute(
+                "k", AsyncMock(return_value={"result": 1}), lambda value: False
+            )
+        )
+        await asyncio.sleep(0)
+        owner.cancel()
+
+        assert await waiter == {"result": 1}
+        assert cache.get("k") is None
+
+
+class TestProjectionCache:
+    """Tests for caching in calculate_projection."""
+
+    @pytest.mark.asyncio
+    async def test_equivalent_inputs_hit_cache(self):
+        """Test that 33 and 0.33 tax normalize to the same cache entry."""
+        remote = AsyncMock(return_value={"opsparing_ar": 1.0, "result": 2.0})
+        kwargs = dict(
+            manedslon=50000,
+            alder=30,
+            pensionInd_ar=60000,
+            forbrugsmal_md=25000,
+            frie_midler=100000,
+            holding_midler=0,
+            rate_and_liv=500000,
+            fire_alder=55,
+        )
+        with (
+            patch.object(calculator.settings, "FIRE_BACKEND", "remote"),
+            patch.object(calculator, "fetch_remote_projection", remote),
+        ):
+            await calculate_projection(
+                FireCalculatorInput(skat_percentage=33.0, **kwargs)
+            )
+            await calculate_projection(
+                FireCalculatorInput(skat_percentage=0.33, **kwargs)
+            )
+
+        remote.assert_awaited_once()
+        assert projection_cache.stats()["hits"] == 1
+
+    @pytest.mark.asyncio
+    async def test_cache_can_be_disabled(self):
+        """Test that every call reaches the backend when caching is off."""
+        remote = AsyncMock(return_value={"opsparing_ar": 1.0, "result": 2.0})
+        calculator_input = FireCalculatorInput(
+            manedslon=50000,
+            alder=30,
+            pensionInd_ar=60000,
+            skat_percentage=35,
+            forbrugsmal_md=25000,
+            frie_midler=100000,
+            holding_midler=0,
+            rate_and_liv=500000,
+            fire_alder=55,
+        )
+        with (
+            patch.object(calculator.settings, "FIRE_BACKEND", "remote"),
+            patch.object(calculator.settings, "FIRE_CACHE_ENABLED", False),
+            patch.object(calculator, "fetch_remote_projection", remote),
+        ):
+            await calculate_projection(calculator_input)
+            await calculate_projection(calculator_input)
+
+        assert remote.await_count == 2
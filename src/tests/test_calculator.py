@@ -0,0 +1,98 @@
+"""Tests for the projection backend selection."""
+
+import pytest
+from unittest.mock import AsyncMock, patch
+
+from pension_planning_agent import calculator
+from pension_planning_agent.calculator import build_payload, calculate_projection
+from pension_planning_agent.schemas import FireCalculatorInput
+
+CALCULATOR_INPUT = FireCalculatorInput(
+    manedslon=75700.0,
+    alder=52,
+    pensionInd_ar=85000.0,
+    skat_percentage=33.0,
+    forbrugsmal_md=34100.0,
+    frie_midler=935000.0,
+    holding_midler=0.0,
+    rate_and_liv=4190000.0,
+    fire_alder=62,
+)
+
+
+class TestBuildPayload:
+    """Tests for BusinessLogic payload construction."""
+
+    @pytest.mark.asyncio
+    async def test_payload_converts_tax_and_adds_state_pension_age(self):
+        """Test that tax is a fraction and the state pension age is included."""
+        payload = await build_payload(CALCULATOR_INPUT)
+
+        assert payload["skat_percentage"] == 0.33
+        assert payload["folkepensionsalder"] == calculator.FOLKEPENSIONSALDER
+        assert payload["fire_alder"] == 62
+
+
+class TestCalculateProjection:
+    """Tests for the configured projection backend."""
+
+    @pytest.mark.asyncio
+    async def test_remote_backend(self):
+        """Test that the remote backend calls the BusinessLogic API."""
+        remote = AsyncMock(return_value={"opsparing_ar": 1.0, "result": 2.0})
+        with (
+            patch.object(calculator.settings, "FIRE_BACKEND", "remote"),
+            patch.object(calculator, "fetch_remote_projection", remote),
+        ):
+            response = await calculate_projection(CALCULATOR_INPUT)
+
+        assert response == {"opsparing_ar": 1.0, "result": 2.0, "engine": "remote"}
+        remote.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_local_backend(self, local_backend):
+        """Test that the local backend never calls the API."""
+        remote = AsyncMock()
+        with patch.object(calculator, "fetch_remote_projection", remote):
+            response = await calculate_projection(CALCULATOR_INPUT)
+
+        assert response["opsparing_ar"] == pytest.approx(93787.76)
+        assert response["engine"] == "local"
+        remote.assert_not_awaited()
+
+    @pytest.mark.asyncio
+    async def test_local_with_remote_verify_logs_mismatch(self):
+        """Test that the verify backend answers locally and checks the API."""
+        remote = AsyncMock(return_value={"opsparing_ar": 93788.0, "result": 0.0})
+        with (
+            patch.object(
+                calculator.settings, "FIRE_BACKEND", "local-with-remote-verify"
+            ),
+            patch.object(calculator, "fetch_remote_projection", remote),
+            patch.object(calculator.logger, "warning") as warning,
+        ):
+            response = await calculate_projection(CALCULATOR_INPUT)
+            for task in list(calculator._background_tasks):
+                await task
+
+        assert response["result"] != 0.0
+        remote.assert_awaited_once()
+        warning.assert_called_once()
+        assert "'result'" in warning.call_args.args[0]
+
+    @pytest.mark.asyncio
+    async def test_remote_verification_failure_is_logged(self):
+        """Test that a failing verification call does not raise."""
+        remote = AsyncMock(side_effect=RuntimeError("down"))
+        with (
+            patch.object(
+                calculator.settings, "FIRE_BACKEND", "local-with-remote-verify"
+            ),
+            patch.object(calculator, "fetch_remote_projection", remote),
+            patch.object(calculator.logger, "warning") as warning,
+        ):
+            await calculate_projection(CALCULATOR_INPUT)
+            for task in list(calculator._background_tasks):
+                await task
+
+        assert "failed" in warning.call_args.args[0]
@@ -0,0 +1,136 @@
+"""Tests for conversation history compaction."""
+
+from unittest.mock import MagicMock, patch
+
+from google.adk.models import LlmRequest
+from google.genai import types
+
+from pension_planning_agent import compaction
+from pension_planning_agent.compaction import (
+    compact_contents,
+    compact_history,
+    estimate_tokens,
+)
+
+INPUTS = {
+    "manedslon": 75700,
+    "alder": 52,
+    "pensionInd_ar": 85000,
+    "skat_percentage": 33,
+    "forbrugsmal_md": 34100,
+    "frie_midler": 935000,
+    "holding_midler": 0,
+    "rate_and_liv": 4190000,
+    "fire_alder": 62,
+}
+
+
+def user(text):
+    """User message with one text part."""
+    return types.Content(role="user", parts=[types.Part(text=text)])
+
+
+def model(text):
+    """Model reply with one text part."""
+    return types.Content(role="model", parts=[types.Part(text=text)])
+
+
+def tool_round(args, result):
+    """A model tool call followed by the tool response."""
+    return [
+        types.Content(
+            role="model",
+            parts=[
+                types.Part(
+                    function_call=types.FunctionCall(name="fire_calculator", args=args)
+                )
+            ],
+        ),
+        types.Content(
+            role="user",
+            parts=[
+                types.Part(
+                    function_response=types.FunctionResponse(
+                        name="fire_calculator", response={"result": result}
+                    )
+                )
+            ],
+        ),
+    ]
+
+
+def conversation(turns: int) -> list[types.Content]:
+    """History with a calculation in the first turn and `turns` chat turns."""
+    contents = [user("Jeg hedder Carina, er 44 år. " * 20)]
+    contents += tool_round(INPUTS, "Hvis du sparer 93,788 kr. om året")
+    contents.append(model("Her er din plan. " * 20))
+    for i in range(turns):
+        contents += [
+            user(f"Hvad hvis jeg stopper ved {60 + i}? " * 10),
+            model("Ok " * 50),
+        ]
+    return contents
+
+
+class TestCompactContents:
+    """Tests for folding older turns into a summary."""
+
+    def test_short_history_is_unchanged(self):
+        """Test that histories within the limits are sent as they are."""
+        contents = conversation(2)
+        assert compact_contents(contents, keep_turns=4, min_tokens=0) == (contents, 0)
+        assert compact_contents(conversation(8), min_tokens=10**6)[1] == 0
+
+    def test_keeps_last_turns_verbatim(self):
+        """Test that only the last turns survive, prefixed by the summary."""
+        contents = conversation(6)
+        compacted, saved = compact_contents(contents, keep_turns=2, min_tokens=0)
+
+        assert saved > 0
+        assert estimate_tokens(compacted) < estimate_tokens(contents)
+        assert compacted[1:] == contents[-3:]
+        assert compacted[0].role == "user"
+        assert compacted[0].parts[1:] == contents[-4].parts
+
+    def test_summary_has_inputs_and_latest_result(self):
+        """Test that tool inputs and results are kept in structured form."""
+        contents = conversation(6)
+        contents[8:8] = tool_round({**INPUTS, "fire_alder": 60}, "result -1 kr.")
+        compacted, _ = compact_contents(contents, keep_turns=2, min_tokens=0)
+
+        summary = compacted[0].parts[0].text
+        assert "manedslon=75700, alder=52," in summary
+        assert "fire_alder=60" in summary
+        assert "Latest fire_calculator result: result -1 kr." in summary
+        assert "- Jeg hedder Carina" in summary
+
+    def test_tool_responses_do_not_start_turns(self):
+        """Test that a tool call is never separated from its response."""
+        contents = [user("a")] + tool_round(INPUTS, "r") + [user("b"), model("c")]
+        compacted, _ = compact_contents(contents, keep_turns=1, min_tokens=0)
+
+        assert len(compacted) == 2
+        assert compacted[0].parts[1].text == "b"
+
+
+class TestCompactHistory:
+    """Tests for the before-model callback."""
+
+    def test_replaces_request_contents(self):
+        """Test that the request is compacted and the model call proceeds."""
+        request = LlmRequest(contents=conversation(8))
+        with patch.object(compaction.settings, "COMPACTION_MIN_TOKENS", 0):
+            assert compact_history(MagicMock(), request) is None
+
+        assert len(request.contents) == 1 + 2 * 4 - 1
+
+    def test_disabled(self):
+        """Test that compaction can be switched off."""
+        request = LlmRequest(contents=conversation(8))
+        with (
+            patch.object(compaction.settings, "COMPACTION_ENABLED", False),
+            patch.object(compaction.settings, "COMPACTION_MIN_TOKENS", 0),
+        ):
+            compact_history(MagicMock(), request)
+
+        assert request.contents == conversation(8)
@@ -0,0 +1,182 @@
+"""Tests for the local FIRE projection engine."""
+
+import json
+
+import numpy as np
+import pytest
+
+from pension_planning_agent.engine import (
+    END_AGE,
+    TRAJECTORY_COLUMNS,
+    Trajectory,
+    annual_savings,
+    project,
+    project_batch,
+    trajectory,
+)
+from pension_planning_agent.parity import PARITY_PAYLOADS
+
+PAYLOAD = {
+    "manedslon": 50000.0,
+    "alder": 30,
+    "pensionInd_ar": 60000.0,
+    "skat_percentage": 0.35,
+    "forbrugsmal_md": 25000.0,
+    "frie_midler": 100000.0,
+    "holding_midler": 0.0,
+    "rate_and_liv": 500000.0,
+    "folkepensionsalder": 70,
+    "fire_alder": 55,
+}
+
+
+def recorded_responses(resource_dir):
+    """Load recorded BusinessLogic request/response pairs."""
+    with open(resource_dir / "businesslogic_responses.json") as f:
+        return json.load(f)
+
+
+class TestParityWithBusinessLogic:
+    """Parity of the local engine with recorded BusinessLogic API responses."""
+
+    def test_recorded_responses(self, resource_dir):
+        """Test that every recorded response is reproduced by the engine."""
+        recordings = recorded_responses(resource_dir)
+        assert recordings
+
+        for recording in recordings:
+            expected = recording["response"]
+            result = project(recording["payload"])
+
+            assert result["opsparing_ar"] == pytest.approx(
+                expected["opsparing_ar"], abs=1.0
+            )
+            assert result["result"] == pytest.approx(expected["result"], rel=1e-3)
+
+    def test_batch_matches_recorded_responses(self, resource_dir):
+        """Test that all recordings evaluated in one batch match too."""
+        recordings = recorded_responses(resource_dir)
+        assert recordings
+        fields = recordings[0]["payload"].keys()
+        batch = project_batch(
+            **{
+                field: np.array([r["payload"][field] for r in recordings])
+                for field in fields
+            }
+        )
+
+        expected = np.array([r["response"]["result"] for r in recordings])
+        np.testing.assert_allclose(batch["result"], expected, rtol=1e-3)
+
+    def test_parity_payloads_cover_plan_shapes(self):
+        """Test that the payloads to record span the engine's branches."""
+        fire_vs_state_pension = {
+            np.sign(p["fire_alder"] - p["folkepensionsalder"]) for p in PARITY_PAYLOADS
+        }
+
+        assert fire_vs_state_pension == {-1, 0, 1}
+        assert any(p["holding_midler"] > 0 for p in PARITY_PAYLOADS)
+        assert len({p["alder"] for p in PARITY_PAYLOADS}) >= 3
+        assert len({p["skat_percentage"] for p in PARITY_PAYLOADS}) >= 3
+
+    def test_every_parity_payload_is_recorded(self, resource_dir):
+        """Test that the recordings cover every payload of the parity module."""
+        recorded = [r["payload"] for r in recorded_responses(resource_dir)]
+        missing = [p for p in PARITY_PAYLOADS if p not in recorded]
+        assert not missing, (
+            f"{len(missing)} of {len(PARITY_PAYLOADS)} parity payloads are not "
+            "recorded, run `python -m pension_planning_agent.parity` with "
+            "BUSINESSLOGIC_TOKEN set"
+        )
+
+
+class TestAnnualSavings:
+    """Tests for the yearly savings formula."""
+
+    def test_known_value(self):
+        """Test savings after AM-bidrag, pension, tax and consumption."""
+        savings = annual_savings(75700.0, 85000.0, 0.33, 34100.0)
+        assert float(savings) == pytest.approx(93787.76)
+
+
+class TestProjectBatch:
+    """Tests for vectorized projections."""
+
+    def test_batch_matches_single_projections(self):
+        """Test that a batch gives the same answers as one call per scenario."""
+        fire_ages = np.array([45, 55, 65])
+        ages = np.array([25, 30, 40])
+        batch = project_batch(**{**PAYLOAD, "alder": ages, "fire_alder": fire_ages})
+
+        for i, (age, fire_age) in enumerate(zip(ages, fire_ages)):
+            single = project({**PAYLOAD, "alder": age, "fire_alder": fire_age})
+            assert batch["result"][i] == pytest.approx(single["result"])
+            assert batch["opsparing_ar"][i] == pytest.approx(single["opsparing_ar"])
+
+    def test_later_fire_age_improves_result(self):
+        """Test that working longer never makes the result worse."""
+        batch = project_batch(**{**PAYLOAD, "fire_alder": np.arange(40, 70)})
+        assert np.all(np.diff(batch["result"]) > 0)
+
+    def test_higher_consumption_worsens_result(self):
+        """Test that spending more lowers the result."""
+        batch = project_batch(
+            **{**PAYLOAD, "forbrugsmal_md": np.array([20000.0, 25000.0, 30000.0])}
+        )
+        assert np.all(np.diff(batch["result"]) < 0)
+
+    def test_age_past_state_pension_age(self):
+        """Test that payouts start immediately when already past state pension age."""
+        result = project({**PAYLOAD, "alder": 80, "fire_alder": 81})
+        assert np.isfinite(result["result"])
+
+    def test_age_one_year_before_end(self):
+        """Test the shortest possible horizon."""
+        result = project({**PAYLOAD, "alder": END_AGE - 2, "fire_alder": END_AGE - 1})
+        assert np.isfinite(result["result"])
+
+
+class TestTrajectory:
+    """Tests for year-by-year projections."""
+
+    def test_ends_at_result(self):
+        """Test that the trajectory runs to END_AGE and ends at the result."""
+        payload = {**PAYLOAD, "holding_midler": 50000.0}
+        path = trajectory(payload)
+
+        assert (path.age[0], path.age[-1]) == (30, END_AGE)
+        assert path.free_funds[-1] + path.holding[-1] == pytest.approx(
+            project(payload)["result"]
+        )
+
+    def test_flows_follow_the_plan(self):
+        """Test contributions until FIRE, withdrawals after and pension payouts."""
+        path = trajectory(PAYLOAD)
+        savings = project(PAYLOAD)["opsparing_ar"] + PAYLOAD["pensionInd_ar"]
+
+        assert path.at(54)["contributions"] == pytest.approx(savings)
+        assert path.at(55)["contributions"] == 0
+        assert path.at(55)["withdrawals"] == PAYLOAD["forbrugsmal_md"] * 12
+        assert path.at(69)["pension_payout"] == 0
+        assert path.at(70)["pension_payout"] > 0
+        # The pension is paid out in full by END_AGE
+        assert path.pension[-1] == pytest.approx(0, abs=1e-3)
+
+    def test_columns_round_trip(self):
+        """Test that the compact columns rebuild the trajectory."""
+        path = trajectory(PAYLOAD)
+        columns = path.to_columns()
+
+        assert list(columns) == list(TRAJECTORY_COLUMNS)
+        assert all(isinstance(value, int) for value in columns["free_funds"])
+        assert np.allclose(
+            Trajectory.from_columns(columns).free_funds, path.free_funds, atol=0.5
+        )
+        with pytest.raises(ValueError):
+            path.free_funds[0] = 0
+
+    def test_arrow_record_batch(self):
+        """Test the Arrow export."""
+        batch = trajectory(PAYLOAD).to_arrow()
+        assert batch.schema.names == list(TRAJECTORY_COLUMNS)
+        assert batch.num_rows == END_AGE - PAYLOAD["alder"] + 1
@@ -0,0 +1,121 @@
+"""Tests for the deterministic structured-input fast path."""
+
+import pytest
+from unittest.mock import AsyncMock, patch
+
+from google.adk.sessions import InMemorySessionService
+
+from pension_planning_agent import fast_path
+from pension_planning_agent.fast_path import (
+    answer_structured_input,
+    parse_structured_input,
+    run_fast_path,
+)
+from pension_planning_agent.trajectory import TRAJECTORY_STATE_KEY
+
+TEXT = (
+    "manedslon=75700, alder=52, pensionInd_ar=85000, skat_percentage=33, "
+    "forbrugsmal_md=34100, frie_midler=935000, holding_midler=0, "
+    "rate_and_liv=4190000,fire_alder=62"
+)
+
+pytestmark = pytest.mark.usefixtures("local_backend")
+
+
+class TestParseStructuredInput:
+    """Tests for detecting complete structured payloads."""
+
+    def test_key_value_pairs(self):
+        """Test the key=value format used by agent.main()."""
+        values = parse_structured_input(TEXT)
+        assert values["manedslon"] == 75700
+        assert values["fire_alder"] == 62
+
+    def test_json_and_newlines(self):
+        """Test that JSON objects and one pair per line are accepted."""
+        values = parse_structured_input(TEXT)
+        as_json = "{" + ", ".join(f'"{k}": {v}' for k, v in values.items()) + "}"
+        as_lines = TEXT.replace(", ", "\n").replace(",", "\n").replace("=", ": ")
+
+        assert parse_structured_input(as_json) == values
+        assert parse_structured_input(as_lines) == values
+
+    @pytest.mark.parametrize(
+        "text",
+        [
+            TEXT.replace(", alder=52", ""),  # missing field
+            TEXT + ", bonus=10000",  # unknown field
+            TEXT + ", alder=53",  # conflicting duplicate
+            TEXT.replace("75700", "75.700"),  # Danish thousands separator
+            TEXT.replace("75700", "75,700"),
+            TEXT + "\nHvad hvis jeg stopper ved 60?",  # a question as well
+            "Jeg hedder Carina, er 44 år.",
+            '{"manedslon": "mange"}',
+            "{not json",
+        ],
+    )
+    def test_ambiguous_or_incomplete_input_falls_back(self, text):
+        """Test that anything but a complete, unambiguous payload is rejected."""
+        assert parse_structured_input(text) is None
+
+
+class TestAnswerStructuredInput:
+    """Tests for answering without the model."""
+
+    @pytest.mark.asyncio
+    async def test_returns_final_message(self):
+        """Test that the calculator's final message is returned."""
+        reply = await answer_structured_input(TEXT)
+        assert "kr. om året" in reply
+
+    @pytest.mark.asyncio
+    async def test_invalid_values_go_to_the_agent(self):
+        """Test that validation errors are left for the agent to explain."""
+        assert await answer_structured_input(TEXT.replace("=62", "=40")) is None
+
+    @pytest.mark.asyncio
+    async def test_records_exchange_in_session(self):
+        """Test that the question and answer are added to the session."""
+        service = InMemorySessionService()
+        await service.create_session(
+            app_name=fast_path.APP_NAME, user_id="u", session_id="s"
+        )
+        with patch.object(fast_path, "get_session_service", return_value=service):
+            reply = await run_fast_path("u", "s", TEXT)
+
+        session = await service.get_session(
+            app_name=fast_path.APP_NAME, user_id="u", session_id="s"
+        )
+        assert [e.author for e in session.events] == ["user", "fire_pension_agent"]
+        assert session.events[1].content.parts[0].text == reply
+        assert session.state[TRAJECTORY_STATE_KEY]["age"][0] == 52
+
+    @pytest.mark.asyncio
+    async def test_failed_calculation_stores_no_plan(self):
+        """Test that a failed calculation is recorded without its trajectory."""
+        service = InMemorySessionService()
+        await service.create_session(
+            app_name=fast_path.APP_NAME, user_id="u", session_id="s"
+        )
+        failed = AsyncMock(return_value=("Request timed out.", None))
+        with (
+            patch.object(fast_path, "get_session_service", return_value=service),
+            patch.object(fast_path, "calculate_plan", failed),
+        ):
+            assert await run_fast_path("u", "s", TEXT) == "Request timed out."
+
+        session = await service.get_session(
+            app_name=fast_path.APP_NAME, user_id="u", session_id="s"
+        )
+        assert len(session.events) == 2
+        assert TRAJECTORY_STATE_KEY not in session.state
+
+    @pytest.mark.asyncio
+    async def test_no_calculation_for_free_text(self):
+        """Test that free text is not calculated."""
+        with patch.object(
+            fast_path, "calculate_plan", new_callable=AsyncMock
+        ) as calculate_plan:
+            assert await run_fast_path("u", "s", "Hej") is None
+
+        calculate_plan.assert_not_called()
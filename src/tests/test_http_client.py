@@ -0,0 +1,100 @@
+"""Tests for the pooled BusinessLogic HTTP client."""
+
+import asyncio
+
+import pytest
+from unittest.mock import patch
+
+from pension_planning_agent import http_client
+from pension_planning_agent.http_client import (
+    close_http_client,
+    get_http_client,
+    http_client_lifespan,
+)
+
+
+class TestGetHttpClient:
+    """Tests for the per-event-loop shared client."""
+
+    @pytest.mark.asyncio
+    async def test_client_is_reused_within_loop(self):
+        """Test that repeated calls on one loop return the same client."""
+        client = get_http_client()
+        try:
+            assert get_http_client() is client
+        finally:
+            await close_http_client()
+
+    @pytest.mark.asyncio
+    async def test_client_is_recreated_after_close(self):
+        """Test that a closed client is replaced on next use."""
+        client = get_http_client()
+        await close_http_client()
+
+        assert client.is_closed
+        new_client = get_http_client()
+        try:
+            assert new_client is not client
+            assert not new_client.is_closed
+        finally:
+            await close_http_client()
+
+    def test_separate_loops_get_separate_clients(self):
+        """Test that clients are never shared between event loops."""
+
+        async def get_and_close():
+            client = get_http_client()
+            await close_http_client()
+            return client
+
+        first = asyncio.run(get_and_close())
+        second = asyncio.run(get_and_close())
+        assert first is not second
+
+    @pytest.mark.asyncio
+    async def test_close_without_client_is_noop(self):
+        """Test that closing when no client exists does not fail."""
+        await close_http_client()
+
+
+class TestCreateHttpClient:
+    """Tests for client configuration."""
+
+    @pytest.mark.asyncio
+    async def test_pool_limits_from_settings(self):
+        """Test that pool limits and timeout are taken from settings."""
+        with (
+            patch.object(http_client.settings, "HTTP_MAX_CONNECTIONS", 7),
+            patch.object(http_client.settings, "HTTP_TIMEOUT", 5.0),
+            patch("httpx.AsyncClient") as mock_client,
+        ):
+            http_client.create_http_client()
+
+        kwargs = mock_client.call_args.kwargs
+        assert kwargs["limits"].max_connections == 7
+        assert kwargs["timeout"] == 5.0
+
+    @pytest.mark.asyncio
+    async def test_http2_falls_back_without_h2(self):
+        """Test that HTTP/2 is disabled when the h2 package is missing."""
+        with (
+            patch.object(http_client.settings, "HTTP_HTTP2", True),
+            patch.object(http_client, "_http2_available", return_value=False),
+            patch("httpx.AsyncClient") as mock_client,
+        ):
+            http_client.create_http_client()
+
+        assert mock_client.call_args.kwargs["http2"] is False
+
+
+class TestHttpClientLifespan:
+    """Tests for the startup/shutdown hook."""
+
+    @pytest.mark.asyncio
+    async def test_lifespan_closes_client(self):
+        """Test that the client is open inside the block and closed after it."""
+        async with http_client_lifespan() as client:
+            assert not client.is_closed
+            assert get_http_client() is client
+
+        assert client.is_closed
@@ -0,0 +1,166 @@
+"""Tests for the model response cache."""
+
+import pytest
+from unittest.mock import Mock, patch
+
+from google.adk.models import LlmRequest, LlmResponse
+from google.genai import types
+
+from pension_planning_agent import agent, metrics
+from pension_planning_agent.cache import TTLCache
+from pension_planning_agent.llm_cache import (
+    DiskCache,
+    LlmCachePlugin,
+    is_cacheable,
+    request_key,
+)
+
+MODEL = "openrouter/test-model"
+PARAMS = {"reasoning_effort": "high"}
+
+
+def user(text: str) -> types.Content:
+    return types.Content(role="user", parts=[types.Part(text=text)])
+
+
+def model(text: str) -> types.Content:
+    return types.Content(role="model", parts=[types.Part(text=text)])
+
+
+def make_request(*contents: types.Content, system: str = "Be nice") -> LlmRequest:
+    return LlmRequest(
+        contents=list(contents),
+        config=types.GenerateContentConfig(system_instruction=system),
+    )
+
+
+def key(llm_request: LlmRequest, **kwargs) -> str | None:
+    options = dict(model=MODEL, params=PARAMS, max_user_turns=2)
+    return request_key(llm_request, **{**options, **kwargs})
+
+
+class TestRequestKey:
+    """Tests for what makes two model requests identical."""
+
+    def test_whitespace_is_normalized(self):
+        """Test that whitespace differences map to the same key."""
+        assert key(make_request(user("Hej  med dig\n"))) == key(
+            make_request(user("Hej med dig"))
+        )
+
+    def test_key_covers_model_parameters_and_prompt(self):
+        """Test that the model, its parameters and the system prompt change the key."""
+        request = make_request(user("Hej"))
+        keys = {
+            key(request),
+            key(request, model="openrouter/other-model"),
+            key(request, params={"reasoning_effort": "low"}),
+            key(make_request(user("Hej"), system="Be brief")),
+        }
+        assert len(keys) == 4
+
+    def test_user_numbers_are_not_cached(self):
+        """Test that a history with numbers from the user is never cached."""
+        assert key(make_request(user("Jeg hedder Carina, er 44 år"))) is None
+
+    def test_tool_use_is_not_cached(self):
+        """Test that histories with tool calls are never cached."""
+        call = types.Content(
+            role="model",
+            parts=[types.Part.from_function_call(name="fire_calculator", args={})],
+        )
+        assert key(make_request(user("Hej"), call)) is None
+
+    def test_only_opening_turns_are_cached(self):
+        """Test that histories beyond `max_user_turns` user messages are not cached."""
+        request = make_request(user("Hej"), model("Hvad hedder du?"), user("Carina"))
+        assert key(request, max_user_turns=2) is not None
+        assert key(request, max_user_turns=1) is None
+
+    def test_only_complete_text_responses_are_stored(self):
+        """Test which model responses are cacheable."""
+        assert is_cacheable(LlmResponse(content=model("Hej")))
+        assert not is_cacheable(LlmResponse(content=model("He"), partial=True))
+        assert not is_cacheable(LlmResponse(error_code="429"))
+
+
+class TestDiskCache:
+    """Tests for the SQLite tier."""
+
+    def test_survives_reopening(self, tmp_path):
+        """Test that entries are kept across processes."""
+        path = str(tmp_path / "llm_cache.db")
+        DiskCache(path, maxsize=10, ttl=60).set("key", "value")
+        assert DiskCache(path, maxsize=10, ttl=60).get("key") == "value"
+
+    def test_expiry_and_lru_bound(self, tmp_path):
+        """Test that expired and least recently used entries are dropped."""
+        now = [0.0]
+        cache = DiskCache(
+            str(tmp_path / "llm_cache.db"), maxsize=2, ttl=60, clock=lambda: now[0]
+        )
+        cache.set("a", "1")
+        now[0] = 1
+        cache.set("b", "2")
+        now[0] = 2
+        cache.get("a")
+        now[0] = 3
+        cache.set("c", "3")
+        assert (cache.get("a"), cache.get("b"), cache.get("c")) == ("1", None, "3")
+
+        now[0] = 100
+        assert cache.get("a") is None
+
+
+class TestLlmCachePlugin:
+    """Tests for serving model requests from the cache."""
+
+    @pytest.mark.asyncio
+    async def test_disk_hit_fills_memory(self, tmp_path):
+        """Test that a response stored on disk is served after a restart."""
+        disk = DiskCache(str(tmp_path / "llm_cache.db"), maxsize=10, ttl=60)
+        context = Mock(invocation_id="invocation")
+        request = make_request(user("Hej"))
+
+        first = LlmCachePlugin(MODEL, PARAMS, TTLCache(10, 60), disk)
+        assert (
+            await first.before_model_callback(
+                callback_context=context, llm_request=request
+            )
+            is None
+        )
+        await first.after_model_callback(
+            callback_context=context, llm_response=LlmResponse(content=model("Hej!"))
+        )
+
+        restarted = LlmCachePlugin(MODEL, PARAMS, TTLCache(10, 60), disk)
+        disk_hits = metrics.LLM_CACHE_REQUESTS.value(status="disk_hit")
+        response = await restarted.before_model_callback(
+            callback_context=context, llm_request=request
+        )
+        assert response.content.parts[0].text == "Hej!"
+        assert response.usage_metadata is None
+        assert metrics.LLM_CACHE_REQUESTS.value(status="disk_hit") == disk_hits + 1
+        assert restarted.memory.get(key(request)) is not None
+
+    @pytest.mark.asyncio
+    async def test_opening_turn_skips_the_model(self, fake_agent):
+        """Test that a repeated opening turn is answered without a model call."""
+        from benchmarks import e2e
+
+        fake_agent.config.questions = ("Hvad hedder du, og hvor gammel er du?",)
+        with (
+            patch.object(agent.settings, "LLM_CACHE_ENABLED", True),
+            patch.object(agent.settings, "LLM_CACHE_DB_PATH", ""),
+        ):
+            agent.get_runner.cache_clear()
+            replies = []
+            for session_id in ("llm-cache-1", "llm-cache-2"):
+                await agent.get_session_service().create_session(
+                    app_name=agent.APP_NAME, user_id="u", session_id=session_id
+                )
+                turn = await e2e.run_turn("u", session_id, "Hej")
+                replies.append(turn["reply"])
+
+        assert replies == [fake_agent.config.questions[0]] * 2
+        assert fake_agent.stats.chat_requests == 1
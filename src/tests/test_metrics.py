@@ -0,0 +1,187 @@
+"""Tests for latency metrics and the Prometheus endpoint."""
+
+import urllib.request
+
+import httpx
+import pytest
+from unittest.mock import Mock, patch
+
+from benchmarks.fakes import SCRIPTED_INPUTS, FakeConfig, FakeServices
+from pension_planning_agent import calculator, metrics
+from pension_planning_agent.metrics import Counter, Histogram
+
+
+@pytest.fixture
+def registry():
+    """Metrics created in a test are removed from the registry afterwards"""
+    before = list(metrics.REGISTRY)
+    yield
+    metrics.REGISTRY[:] = before
+
+
+class TestPrometheusFormat:
+    """Tests for the text exposition of counters and histograms."""
+
+    def test_counter(self, registry):
+        """Test that counters are rendered per label combination."""
+        counter = Counter("test_requests_total", "Requests.", ("status",))
+        counter.inc(status="hit")
+        counter.inc(2, status="miss")
+
+        assert counter.collect() == [
+            "# HELP test_requests_total Requests.",
+            "# TYPE test_requests_total counter",
+            'test_requests_total{status="hit"} 1',
+            'test_requests_total{status="miss"} 2',
+        ]
+
+    def test_histogram_buckets_are_cumulative(self, registry):
+        """Test that buckets count every observation up to their bound."""
+        histogram = Histogram("test_seconds", "Durations.", buckets=(0.1, 1.0))
+        for value in (0.05, 0.5, 0.7, 3.0):
+            histogram.observe(value)
+
+        lines = histogram.collect()
+        assert 'test_seconds_bucket{le="0.1"} 1' in lines
+        assert 'test_seconds_bucket{le="1"} 3' in lines
+        assert 'test_seconds_bucket{le="+Inf"} 4' in lines
+        assert "test_seconds_sum 4.25" in lines
+        assert "test_seconds_count 4" in lines
+
+    def test_label_values_are_escaped(self, registry):
+        """Test that quotes and backslashes in label values are escaped."""
+        counter = Counter("test_escape_total", "Escaping.", ("model",))
+        counter.inc(model='a"b\\c')
+        assert 'test_escape_total{model="a\\"b\\\\c"} 1' in counter.collect()
+
+    def test_wrong_labels_raise(self, registry):
+        """Test that observations must use exactly the declared labels."""
+        histogram = Histogram("test_labels_seconds", "Labels.", ("stage",))
+        with pytest.raises(ValueError):
+            histogram.observe(1.0, phase="connect")
+
+
+class TestMetricsServer:
+    """Tests for the /metrics endpoint."""
+
+    def test_serves_metrics(self):
+        """Test that /metrics returns all registered metrics."""
+        server = metrics.start_metrics_server.__wrapped__("127.0.0.1", 0)
+        try:
+            url = f"http://127.0.0.1:{server.server_port}/metrics"
+            with urllib.request.urlopen(url) as response:
+                body = response.read().decode()
+                content_type = response.headers["Content-Type"]
+        finally:
+            server.shutdown()
+            server.server_close()
+
+        assert content_type == metrics.CONTENT_TYPE
+        assert "# TYPE agent_turn_seconds histogram" in body
+        assert "# TYPE projection_cache_requests_total counter" in body
+
+
+class TestInstrumentation:
+    """Tests for the measurements taken around each stage."""
+
+    @pytest.mark.asyncio
+    async def test_businesslogic_call_phases(self):
+        """Test that a BusinessLogic call is split into connect, wait and transfer."""
+        config = FakeConfig(execute_delay=0)
+        before = {
+            phase: metrics.HTTP_SECONDS.count(phase=phase)
+            for phase in ("connect", "wait", "transfer", "total")
+        }
+        with (
+            FakeServices(config) as services,
+            patch.object(
+                calculator.settings, "BUSINESSLOGIC_URL", services.execute_url
+            ),
+        ):
+            async with httpx.AsyncClient() as client:
+                with patch.object(calculator, "get_http_client", return_value=client):
+                    await calculator.fetch_remote_projection(
+                        {**SCRIPTED_INPUTS, "folkepensionsalder": 70}
+                    )
+
+        for phase, count in before.items():
+            assert metrics.HTTP_SECONDS.count(phase=phase) == count + 1
+
+    @pytest.mark.asyncio
+    async def test_cache_status(self, local_backend):
+        """Test that projection cache hits and misses are counted."""
+        from pension_planning_agent.schemas import FireCalculatorInput
+
+        calculator_input = FireCalculatorInput(
+            manedslon=51234,
+            alder=40,
+            pensionInd_ar=60000,
+            skat_percentage=37,
+            forbrugsmal_md=25000,
+            frie_midler=100000,
+            holding_midler=0,
+            rate_and_liv=500000,
+            fire_alder=60,
+        )
+        misses = metrics.CACHE_REQUESTS.value(status="miss")
+        hits = metrics.CACHE_REQUESTS.value(status="hit")
+        with patch.object(calculator.settings, "FIRE_CACHE_ENABLED", True):
+            calculator.projection_cache.clear()
+            await calculator.calculate_projection(calculator_input)
+            await calculator.calculate_projection(calculator_input)
+
+        assert metrics.CACHE_REQUESTS.value(status="miss") == misses + 1
+        assert metrics.CACHE_REQUESTS.value(status="hit") == hits + 1
+
+    @pytest.mark.asyncio
+    async def test_agent_turn_records_model_and_tool(self, fake_agent):
+        """Test that the runner plugin times model requests and tool calls."""
+        from benchmarks import e2e
+        from pension_planning_agent import agent
+
+        model = agent.settings.LLM_MODEL
+        llm_calls = metrics.LLM_SECONDS.count(model=model, outcome="ok")
+        tool_calls = metrics.TOOL_SECONDS.count(tool="fire_calculator", outcome="ok")
+        prompt_tokens = metrics.LLM_TOKENS.value(model=model, kind="prompt")
+
+        await agent.get_session_service().create_session(
+            app_name=agent.APP_NAME, user_id="u", session_id="metrics"
+        )
+        await e2e.run_turn("u", "metrics", e2e.USER_MESSAGE)
+
+        assert metrics.LLM_SECONDS.count(model=model, outcome="ok") == llm_calls + 2
+        assert (
+            metrics.TOOL_SECONDS.count(tool="fire_calculator", outcome="ok")
+            == tool_calls + 1
+        )
+        assert metrics.LLM_TOKENS.value(model=model, kind="prompt") > prompt_tokens
+
+    @pytest.mark.asyncio
+    async def test_unfinished_calls_are_forgotten(self):
+        """Test that calls without an after-callback do not accumulate."""
+        from pension_planning_agent import instrumentation
+        from pension_planning_agent.instrumentation import MetricsPlugin
+
+        plugin = MetricsPlugin()
+        for i in range(3):
+            await plugin.before_tool_callback(
+                tool=Mock(),
+                tool_args={},
+                tool_context=Mock(invocation_id="cancelled", function_call_id=f"{i}"),
+            )
+        await plugin.before_model_callback(
+            callback_context=Mock(invocation_id="cancelled"),
+            llm_request=Mock(model="m"),
+        )
+        await plugin.after_run_callback(
+            invocation_context=Mock(invocation_id="cancelled")
+        )
+        assert not plugin._tool_calls and not plugin._model_calls
+
+        with patch.object(instrumentation, "MAX_PENDING_CALLS", 2):
+            for i in range(5):
+                await plugin.before_model_callback(
+                    callback_context=Mock(invocation_id=f"{i}"),
+                    llm_request=Mock(model="m"),
+                )
+        assert list(plugin._model_calls) == ["3", "4"]
@@ -0,0 +1,301 @@
+"""Tests for retries, hedged requests and the circuit breaker."""
+
+import asyncio
+
+import httpx
+import pytest
+from unittest.mock import AsyncMock, Mock, patch
+
+from pension_planning_agent import calculator, metrics
+from pension_planning_agent.agent import fire_calculator
+from pension_planning_agent.resilience import (
+    CircuitBreaker,
+    CircuitOpenError,
+    LatencyTracker,
+    hedge,
+    is_client_error,
+    is_retryable,
+    retry,
+)
+from tests.test_calculator import CALCULATOR_INPUT
+
+
+def status_error(status_code: int) -> httpx.HTTPStatusError:
+    response = Mock(status_code=status_code, text="")
+    return httpx.HTTPStatusError("Error", request=Mock(), response=response)
+
+
+class FakeClock:
+    """Manually advanced monotonic clock"""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class TestRetry:
+    """Tests for retries with backoff."""
+
+    def test_retryable_errors(self):
+        """Test which failures are retried."""
+        assert is_retryable(httpx.ConnectError("refused"))
+        assert is_retryable(httpx.ReadTimeout("slow"))
+        assert is_retryable(status_error(503))
+        assert not is_retryable(status_error(400))
+        assert not is_retryable(ValueError("bad"))
+
+    def test_client_errors(self):
+        """Test which failures are blamed on the request rather than the API."""
+        assert is_client_error(status_error(422))
+        assert not is_client_error(status_error(429))
+        assert not is_client_error(status_error(503))
+        assert not is_client_error(httpx.ConnectError("refused"))
+
+    @pytest.mark.asyncio
+    async def test_retries_until_success(self):
+        """Test that transient failures are retried."""
+        call = AsyncMock(side_effect=[httpx.ConnectError("refused"), {"ok": 1}])
+        retried = []
+
+        result = await retry(call, 2, 0, 0, on_retry=retried.append)
+
+        assert result == {"ok": 1}
+        assert call.await_count == 2
+        assert isinstance(retried[0], httpx.ConnectError)
+
+    @pytest.mark.asyncio
+    async def test_gives_up_after_attempts(self):
+        """Test that the last error is raised once the retries are used up."""
+        call = AsyncMock(side_effect=status_error(503))
+        with pytest.raises(httpx.HTTPStatusError):
+            await retry(call, 2, 0, 0)
+        assert call.await_count == 3
+
+    @pytest.mark.asyncio
+    async def test_client_errors_are_not_retried(self):
+        """Test that non-retryable errors are raised immediately."""
+        call = AsyncMock(side_effect=status_error(422))
+        with pytest.raises(httpx.HTTPStatusError):
+            await retry(call, 2, 0, 0)
+        assert call.await_count == 1
+
+
+class TestHedge:
+    """Tests for hedged requests."""
+
+    @pytest.mark.asyncio
+    async def test_slow_primary_is_hedged(self):
+        """Test that a hedge answers when the primary is slower than the delay."""
+        delays = iter([1.0, 0.0])
+
+        async def call():
+            delay = next(delays)
+            await asyncio.sleep(delay)
+            return delay
+
+        result, winner = await hedge(call, delay=0.01)
+        assert (result, winner) == (0.0, "hedge")
+
+    @pytest.mark.asyncio
+    async def test_fast_primary_is_not_hedged(self):
+        """Test that no hedge is sent when the primary answers in time."""
+        call = AsyncMock(return_value="primary")
+        result, winner = await hedge(call, delay=1.0)
+
+        assert (result, winner) == ("primary", None)
+        call.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_failed_hedge_waits_for_primary(self):
+        """Test that a failing hedge does not fail a primary that succeeds."""
+        calls = 0
+
+        async def call():
+            nonlocal calls
+            calls += 1
+            if calls == 2:
+                raise httpx.ConnectError("refused")
+            await asyncio.sleep(0.05)
+            return "primary"
+
+        result, winner = await hedge(call, delay=0.01)
+        assert (result, winner) == ("primary", "primary")
+
+    def test_latency_quantile(self):
+        """Test that the quantile needs enough samples."""
+        tracker = LatencyTracker()
+        for i in range(1, 101):
+            tracker.record(i / 100)
+
+        assert tracker.quantile(0.95, min_samples=10) == pytest.approx(0.96)
+        assert tracker.quantile(0.95, min_samples=1000) is None
+
+
+class TestCircuitBreaker:
+    """Tests for the breaker state machine."""
+
+    def make_breaker(self, clock: FakeClock) -> CircuitBreaker:
+        return CircuitBreaker(
+            error_rate=0.5, min_requests=4, window=10, cooldown=5, clock=clock
+        )
+
+    def test_opens_at_error_rate(self):
+        """Test that the breaker opens once enough calls failed."""
+        breaker = self.make_breaker(FakeClock())
+        for _ in range(2):
+            breaker.record_success()
+        breaker.record_failure()
+        assert breaker.state == CircuitBreaker.CLOSED
+
+        breaker.record_failure()
+        assert breaker.state == CircuitBreaker.OPEN
+        assert not breaker.allow()
+
+    def test_old_outcomes_leave_the_window(self):
+        """Test that only failures within the window count."""
+        clock = FakeClock()
+        breaker = self.make_breaker(clock)
+        for _ in range(3):
+            breaker.record_failure()
+        clock.now = 20
+        breaker.record_failure()
+        assert breaker.state == CircuitBreaker.CLOSED
+
+    def test_half_open_trial(self):
+        """Test that one trial call is admitted after the cooldown."""
+        clock = FakeClock()
+        breaker = self.make_breaker(clock)
+        for _ in range(4):
+            breaker.record_failure()
+
+        clock.now = 5
+        assert breaker.state == CircuitBreaker.HALF_OPEN
+        assert breaker.allow()
+        assert not breaker.allow()
+
+        breaker.record_success()
+        assert breaker.state == CircuitBreaker.CLOSED
+
+    def test_failed_trial_reopens(self):
+        """Test that a failing trial call opens the breaker again."""
+        clock = FakeClock()
+        breaker = self.make_breaker(clock)
+        for _ in range(4):
+            breaker.record_failure()
+        clock.now = 5
+        assert breaker.allow()
+
+        breaker.record_failure()
+        assert breaker.state == CircuitBreaker.OPEN
+
+
+class TestResilientProjection:
+    """Tests for the BusinessLogic call with retries and the breaker."""
+
+    @pytest.mark.asyncio
+    async def test_transient_failure_is_retried(self):
+        """Test that a 503 is retried and counted."""
+        remote = AsyncMock(side_effect=[status_error(503), {"result": 1.0}])
+        retries = metrics.RETRIES.value(reason="HTTPStatusError")
+        with (
+            patch.object(calculator.settings, "FIRE_RETRY_BACKOFF", 0),
+            patch.object(calculator, "fetch_remote_projection", remote),
+        ):
+            response = await calculator.fetch_resilient_projection({})
+
+        assert response == {"result": 1.0, "engine": "remote"}
+        assert metrics.RETRIES.value(reason="HTTPStatusError") == retries + 1
+
+    @pytest.mark.asyncio
+    async def test_retries_stop_at_the_deadline(self):
+        """Test that retries of a slow API end at the overall deadline."""
+
+        async def slow(payload):
+            await asyncio.sleep(10)
+
+        with (
+            patch.object(calculator.settings, "FIRE_TOTAL_TIMEOUT", 0.05),
+            patch.object(calculator, "fetch_remote_projection", slow),
+            patch.object(calculator.remote_breaker, "record_failure") as failure,
+        ):
+            with pytest.raises(httpx.TimeoutException):
+                await calculator.fetch_resilient_projection({})
+            result = await fire_calculator(**CALCULATOR_INPUT.model_dump())
+
+        assert "timed out" in result
+        assert failure.call_count == 2
+
+    @pytest.mark.asyncio
+    async def test_open_breaker_falls_back_to_local_engine(self):
+        """Test that an open breaker answers with the local engine."""
+        payload = await calculator.build_payload(CALCULATOR_INPUT)
+        remote = AsyncMock()
+        with (
+            patch.object(calculator.settings, "FIRE_BREAKER_FALLBACK", "local"),
+            patch.object(calculator.remote_breaker, "allow", return_value=False),
+            patch.object(calculator, "fetch_remote_projection", remote),
+        ):
+            response = await calculator.fetch_resilient_projection(payload)
+
+        assert response["result"] == calculator.engine.project(payload)["result"]
+        assert response["engine"] == "local"
+        remote.assert_not_awaited()
+
+    @pytest.mark.asyncio
+    async def test_fallback_is_not_cached(self):
+        """Test that the API answers again once the breaker closes."""
+        remote = AsyncMock(return_value={"opsparing_ar": 1.0, "result": 2.0})
+        with (
+            patch.object(calculator.settings, "FIRE_BACKEND", "remote"),
+            patch.object(calculator.settings, "FIRE_BREAKER_FALLBACK", "local"),
+            patch.object(calculator, "fetch_remote_projection", remote),
+        ):
+            with patch.object(calculator.remote_breaker, "allow", return_value=False):
+                fallback = await calculator.calculate_projection(CALCULATOR_INPUT)
+            response = await calculator.calculate_projection(CALCULATOR_INPUT)
+
+        assert fallback["engine"] == "local"
+        assert response == {"opsparing_ar": 1.0, "result": 2.0, "engine": "remote"}
+        remote.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_open_breaker_fails_fast(self):
+        """Test that an open breaker without fallback fails the tool call fast."""
+        with (
+            patch.object(calculator.settings, "FIRE_BACKEND", "remote"),
+            patch.object(calculator.settings, "FIRE_BREAKER_FALLBACK", "error"),
+            patch.object(calculator.remote_breaker, "allow", return_value=False),
+        ):
+            with pytest.raises(CircuitOpenError):
+                await calculator.fetch_resilient_projection({})
+            result = await fire_calculator(**CALCULATOR_INPUT.model_dump())
+
+        assert "temporarily unavailable" in result
+
+    @pytest.mark.asyncio
+    async def test_outage_opens_breaker(self):
+        """Test that repeated failures open the breaker and update the gauge."""
+        remote = AsyncMock(side_effect=httpx.ConnectError("refused"))
+        with (
+            patch.object(calculator.settings, "FIRE_RETRY_ATTEMPTS", 0),
+            patch.object(calculator, "fetch_remote_projection", remote),
+        ):
+            for _ in range(calculator.remote_breaker.min_requests):
+                with pytest.raises(httpx.ConnectError):
+                    await calculator.fetch_resilient_projection({})
+
+        assert calculator.remote_breaker.state == CircuitBreaker.OPEN
+        assert metrics.BREAKER_STATE.value() == 2
+
+    @pytest.mark.asyncio
+    async def test_client_errors_keep_breaker_closed(self):
+        """Test that rejected requests are not counted as an outage."""
+        remote = AsyncMock(side_effect=status_error(422))
+        with patch.object(calculator, "fetch_remote_projection", remote):
+            for _ in range(calculator.remote_breaker.min_requests):
+                with pytest.raises(httpx.HTTPStatusError):
+                    await calculator.fetch_resilient_projection({})
+
+        assert calculator.remote_breaker.state == CircuitBreaker.CLOSED
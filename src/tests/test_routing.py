@@ -0,0 +1,166 @@
+"""Tests for per-turn model and reasoning-effort routing."""
+
+import asyncio
+
+import pytest
+from unittest.mock import patch
+
+from google.adk.models import BaseLlm, LlmRequest, LlmResponse
+from google.genai import types
+
+from pension_planning_agent import metrics
+from pension_planning_agent.routing import RoutedLlm, classify_request
+
+
+def user(text: str) -> types.Content:
+    return types.Content(role="user", parts=[types.Part(text=text)])
+
+
+class FakeLlm(BaseLlm):
+    """Model answering after `delay` seconds, or failing with `error`."""
+
+    delay: float = 0.0
+    error: str | None = None
+
+    async def generate_content_async(self, llm_request, stream=False):
+        await asyncio.sleep(self.delay)
+        if self.error:
+            raise RuntimeError(self.error)
+        if stream:
+            yield LlmResponse(content=user(self.model), partial=True)
+        yield LlmResponse(content=user(self.model))
+
+
+def make_router(chain, models) -> RoutedLlm:
+    router = RoutedLlm(
+        model="default", routes={"collect": chain}, first_response_slo=0.05
+    )
+    router._models.update(
+        {(llm.model, effort): llm for (_, effort), llm in zip(chain, models)}
+    )
+    return router
+
+
+async def generate(router: RoutedLlm, stream: bool = False) -> list[LlmResponse]:
+    request = LlmRequest(contents=[user("Carina")])
+    return [
+        response
+        async for response in router.generate_content_async(request, stream=stream)
+    ]
+
+
+class TestClassifyRequest:
+    """Tests for classifying model requests into routes."""
+
+    @pytest.mark.parametrize(
+        ("text", "route"),
+        [
+            ("Jeg hedder Carina", "collect"),
+            ("Hvad er frie midler?", "explain"),
+            ("forklar holding midler", "explain"),
+            ("What does FIRE mean", "explain"),
+        ],
+    )
+    def test_user_messages(self, text, route):
+        """Test that questions are explained and answers collected."""
+        assert classify_request([user(text)]) == route
+
+    def test_tool_result_is_interpreted(self):
+        """Test that a request after a tool result is routed to interpret."""
+        result = types.Content(
+            role="user",
+            parts=[
+                types.Part.from_function_response(
+                    name="fire_calculator", response={"result": "ok"}
+                )
+            ],
+        )
+        assert classify_request([user("Hvad er frie midler?"), result]) == "interpret"
+
+
+class TestRoutedLlm:
+    """Tests for serving requests through a route's fallback chain."""
+
+    @pytest.mark.asyncio
+    async def test_response_records_route(self):
+        """Test that responses say which route, model and effort served them."""
+        router = make_router([("fast", "low")], [FakeLlm(model="fast")])
+        served = metrics.LLM_ROUTED_REQUESTS.value(
+            route="collect", model="fast", reasoning_effort="low"
+        )
+
+        responses = await generate(router, stream=True)
+
+        assert [response.partial for response in responses] == [True, None]
+        assert responses[-1].custom_metadata == {
+            "route": "collect",
+            "model": "fast",
+            "reasoning_effort": "low",
+        }
+        assert (
+            metrics.LLM_ROUTED_REQUESTS.value(
+                route="collect", model="fast", reasoning_effort="low"
+            )
+            == served + 1
+        )
+
+    @pytest.mark.asyncio
+    async def test_slow_model_falls_back(self):
+        """Test that a model missing the first-response SLO is replaced."""
+        router = make_router(
+            [("slow", "high"), ("fast", "low")],
+            [FakeLlm(model="slow", delay=1.0), FakeLlm(model="fast")],
+        )
+        fallbacks = metrics.LLM_ROUTE_FALLBACKS.value(route="collect", reason="slo")
+
+        responses = await generate(router)
+
+        assert responses[-1].custom_metadata["model"] == "fast"
+        assert (
+            metrics.LLM_ROUTE_FALLBACKS.value(route="collect", reason="slo")
+            == fallbacks + 1
+        )
+
+    @pytest.mark.asyncio
+    async def test_failing_model_falls_back(self):
+        """Test that a model failing before its first response is replaced."""
+        router = make_router(
+            [("broken", "high"), ("fast", "low")],
+            [FakeLlm(model="broken", error="429"), FakeLlm(model="fast")],
+        )
+        responses = await generate(router)
+        assert responses[-1].custom_metadata["model"] == "fast"
+
+    @pytest.mark.asyncio
+    async def test_last_model_has_no_deadline(self):
+        """Test that the last model of a chain is awaited beyond the SLO."""
+        router = make_router([("slow", "high")], [FakeLlm(model="slow", delay=0.1)])
+        responses = await generate(router)
+        assert responses[-1].custom_metadata["model"] == "slow"
+
+    @pytest.mark.asyncio
+    async def test_agent_turn_is_routed(self, fake_agent):
+        """Test that an agent turn collects with low and interprets with high effort."""
+        from benchmarks import e2e
+        from pension_planning_agent import agent
+
+        model = agent.settings.LLM_MODEL
+        before = {
+            (route, effort): metrics.LLM_ROUTED_REQUESTS.value(
+                route=route, model=model, reasoning_effort=effort
+            )
+            for route, effort in (("collect", "low"), ("interpret", "high"))
+        }
+        with patch.object(agent.settings, "LLM_ROUTING_ENABLED", True):
+            await agent.get_session_service().create_session(
+                app_name=agent.APP_NAME, user_id="u", session_id="routing"
+            )
+            await e2e.run_turn("u", "routing", "Jeg hedder Carina")
+
+        for (route, effort), count in before.items():
+            assert (
+                metrics.LLM_ROUTED_REQUESTS.value(
+                    route=route, model=model, reasoning_effort=effort
+                )
+                == count + 1
+            )
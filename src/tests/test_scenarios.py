@@ -0,0 +1,127 @@
+"""Tests for batched scenario-grid evaluation."""
+
+import asyncio
+
+import pytest
+from unittest.mock import patch
+
+from pension_planning_agent import calculator, scenarios
+from pension_planning_agent.scenarios import (
+    expand_grid,
+    fire_scenario_grid,
+    run_scenario_grid,
+)
+
+BASE_AXES = {
+    "manedslon": [50000.0],
+    "alder": [30],
+    "pensionInd_ar": [60000.0],
+    "skat_percentage": [35.0],
+    "forbrugsmal_md": [25000.0],
+    "frie_midler": [100000.0],
+    "holding_midler": [0.0],
+    "rate_and_liv": [500000.0],
+    "fire_alder": [55],
+}
+
+
+class TestExpandGrid:
+    """Tests for the Cartesian product of input values."""
+
+    def test_product_of_lists_and_ranges(self):
+        """Test that lists and ranges combine into every combination."""
+        grid = expand_grid({"fire_alder": range(58, 63, 2), "forbrugsmal_md": [1, 2]})
+
+        assert len(grid) == 6
+        assert {"fire_alder": 62, "forbrugsmal_md": 2} in grid
+
+    def test_duplicate_values_are_dropped(self):
+        """Test that repeated values do not create duplicate scenarios."""
+        assert len(expand_grid({"alder": [30, 30, 31]})) == 2
+
+
+class TestRunScenarioGrid:
+    """Tests for grid evaluation and table output."""
+
+    @pytest.mark.asyncio
+    async def test_local_grid_table(self, local_backend):
+        """Test a 3x3 grid evaluated with the local engine."""
+        axes = {
+            **BASE_AXES,
+            "fire_alder": [58, 60, 62],
+            "forbrugsmal_md": [20000.0, 22000.0, 25000.0],
+        }
+        table = await run_scenario_grid(axes)
+
+        lines = table.splitlines()
+        assert lines[0].startswith("Fixed: manedslon=50,000")
+        assert lines[1] == "| forbrugsmal_md | fire_alder | opsparing_ar | result |"
+        assert len(lines) == 3 + 9
+
+    @pytest.mark.asyncio
+    async def test_invalid_combinations_are_reported_per_row(self, local_backend):
+        """Test that an invalid scenario does not fail the whole grid."""
+        axes = {**BASE_AXES, "fire_alder": [25, 55]}
+        table = await run_scenario_grid(axes)
+
+        assert "invalid: fire_alder" in table
+        assert table.count("invalid") == 1
+
+    @pytest.mark.asyncio
+    async def test_too_many_scenarios(self):
+        """Test that oversized grids are rejected before any calculation."""
+        axes = {**BASE_AXES, "fire_alder": list(range(40, 70))}
+        with patch.object(scenarios.settings, "FIRE_GRID_MAX_SCENARIOS", 10):
+            message = await run_scenario_grid(axes)
+
+        assert "Too many scenarios (30)" in message
+
+    @pytest.mark.asyncio
+    async def test_missing_field(self):
+        """Test that an empty value list is reported."""
+        message = await run_scenario_grid({**BASE_AXES, "alder": []})
+        assert message == "Missing values for: alder"
+
+    @pytest.mark.asyncio
+    async def test_remote_grid_bounded_concurrency(self):
+        """Test that remote scenarios run concurrently up to the limit."""
+        in_flight = 0
+        peak = 0
+
+        async def fake_remote(payload):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+            return {"opsparing_ar": 1.0, "result": float(payload["fire_alder"])}
+
+        axes = {**BASE_AXES, "fire_alder": list(range(40, 52))}
+        with (
+            patch.object(calculator.settings, "FIRE_BACKEND", "remote"),
+            patch.object(calculator.settings, "FIRE_GRID_CONCURRENCY", 3),
+            patch.object(calculator, "fetch_remote_projection", fake_remote),
+        ):
+            table = await fire_scenario_grid(**axes)
+
+        assert peak == 3
+        assert "| 51 | 1 | 51 |" in table
+
+    @pytest.mark.asyncio
+    async def test_remote_failure_is_reported_per_row(self):
+        """Test that a failing backend call marks only its own row."""
+
+        async def flaky_remote(payload):
+            if payload["fire_alder"] == 56:
+                raise RuntimeError("boom")
+            return {"opsparing_ar": 1.0, "result": 2.0}
+
+        axes = {**BASE_AXES, "fire_alder": [55, 56]}
+        with (
+            patch.object(calculator.settings, "FIRE_BACKEND", "remote"),
+            patch.object(calculator, "fetch_remote_projection", flaky_remote),
+        ):
+            table = await run_scenario_grid(axes)
+
+        assert "| 56 | calculation failed |  |" in table
+        assert "| 55 | 1 | 2 |" in table
@@ -3,7 +3,15 @@
 import pytest
 from pydantic import ValidationError
 
-from pension_planning_agent.schemas import FireCalculatorInput, FireCalculatorOutput
+from pension_planning_agent.engine import TRAJECTORY_COLUMNS
+from benchmarks.fakes import SCRIPTED_INPUTS
+from pension_planning_agent.schemas import (
+    FireCalculatorInput,
+    FireCalculatorOutput,
+    format_validation_error,
+    format_validation_error_line,
+    validate_calculator_input,
+)
 
 
 class TestFireCalculatorInput:
@@ -154,6 +162,32 @@ class TestFireCalculatorInput:
         assert any(e["loc"] == ("forbrugsmal_md",) for e in errors)
 
 
+class TestValidateCalculatorInput:
+    """Tests for the validation shared by the calculator tools."""
+
+    def test_other_arguments_are_ignored(self):
+        """Test that tool arguments other than the inputs are dropped."""
+        result = validate_calculator_input({**SCRIPTED_INPUTS, "step_percent": 5})
+        assert result == FireCalculatorInput(**SCRIPTED_INPUTS)
+
+    def test_invalid_input_returns_message(self):
+        """Test that invalid input becomes a message naming the field."""
+        result = validate_calculator_input({**SCRIPTED_INPUTS, "manedslon": -1})
+        assert isinstance(result, str)
+        assert "manedslon" in result
+
+    def test_one_line_format_matches_message(self):
+        """Test that both formats list the same fields and messages."""
+        with pytest.raises(ValidationError) as info:
+            FireCalculatorInput(**{**SCRIPTED_INPUTS, "manedslon": -1, "alder": 0})
+
+        line = format_validation_error_line(info.value)
+        assert "\n" not in line
+        assert line.count("; ") == 1
+        for part in line.split("; "):
+            assert f"- {part}" in format_validation_error(info.value)
+
+
 class TestFireCalculatorOutput:
     """Tests for FireCalculatorOutput validation."""
 
@@ -169,3 +203,11 @@ class TestFireCalculatorOutput:
         output = FireCalculatorOutput(opsparing_ar=50000.0, result=-100000.0)
 
         assert output.result == -100000.0
+
+    def test_trajectory_serializes_as_columns(self):
+        """Test that the trajectory is serialized and validated as columns."""
+        columns = {column: [1, 2] for column in TRAJECTORY_COLUMNS}
+        output = FireCalculatorOutput(opsparing_ar=1.0, result=2.0, trajectory=columns)
+
+        assert output.trajectory.age.tolist() == [1, 2]
+        assert output.model_dump()["trajectory"] == columns
@@ -0,0 +1,74 @@
+"""Tests for the sensitivity analysis tool."""
+
+import pytest
+
+from benchmarks.fakes import SCRIPTED_INPUTS
+from pension_planning_agent.sensitivity import analyze_sensitivity, fire_sensitivity
+
+
+class TestAnalyzeSensitivity:
+    """Tests for the batched perturbation of every input."""
+
+    @pytest.mark.asyncio
+    async def test_central_difference(self, local_backend, local_result):
+        """Test that the impact is the central difference over one step."""
+        sensitivity = await analyze_sensitivity(SCRIPTED_INPUTS, step_percent=10)
+        rows = {row.field: row for row in sensitivity.rows}
+
+        spending = rows["forbrugsmal_md"]
+        assert spending.step == pytest.approx(3410)
+        assert spending.result_up == pytest.approx(local_result(forbrugsmal_md=37510))
+        assert spending.impact == pytest.approx(
+            (spending.result_up - spending.result_down) / 2
+        )
+        assert spending.impact < 0
+        assert rows["fire_alder"].step == 1
+        assert rows["fire_alder"].impact > 0
+        assert sensitivity.result == pytest.approx(local_result())
+
+    @pytest.mark.asyncio
+    async def test_ranked_by_absolute_impact(self, local_backend):
+        """Test that rows are ranked and zero values are not perturbed."""
+        sensitivity = await analyze_sensitivity(SCRIPTED_INPUTS)
+
+        impacts = [abs(row.impact) for row in sensitivity.rows if row.impact]
+        assert impacts == sorted(impacts, reverse=True)
+        assert sensitivity.rows[-1].field == "holding_midler"
+        assert sensitivity.rows[-1].impact is None
+        # The plan itself and two scenarios per non-zero input
+        assert sensitivity.evaluations == 1 + 2 * 8
+
+    @pytest.mark.asyncio
+    async def test_one_sided_at_validation_boundary(self, local_backend):
+        """Test that an invalid perturbation falls back to the valid side."""
+        sensitivity = await analyze_sensitivity({**SCRIPTED_INPUTS, "fire_alder": 53})
+        fire_age = next(row for row in sensitivity.rows if row.field == "fire_alder")
+
+        assert fire_age.result_down is None
+        assert fire_age.impact == pytest.approx(fire_age.result_up - sensitivity.result)
+
+    @pytest.mark.asyncio
+    async def test_one_concurrent_batch(self, fake_agent):
+        """Test that every scenario goes through the BusinessLogic API at once."""
+        sensitivity = await analyze_sensitivity(SCRIPTED_INPUTS)
+        assert fake_agent.stats.execute_requests == sensitivity.evaluations
+
+
+class TestFireSensitivityTool:
+    """Tests for the agent tool wrapper."""
+
+    @pytest.mark.asyncio
+    async def test_ranked_table(self, local_backend):
+        """Test that the tool returns one ranked row per input."""
+        message = await fire_sensitivity(**SCRIPTED_INPUTS, step_percent=5)
+
+        rows = message.splitlines()[3:]
+        assert len(rows) == len(SCRIPTED_INPUTS)
+        assert rows[0].startswith("| 1 |")
+        assert "n/a (value is 0)" in rows[-1]
+
+    @pytest.mark.asyncio
+    async def test_invalid_input(self, local_backend):
+        """Test that invalid plans are reported like fire_calculator does."""
+        message = await fire_sensitivity(**{**SCRIPTED_INPUTS, "alder": 15})
+        assert "Invalid input parameters" in message
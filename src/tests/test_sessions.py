@@ -0,0 +1,154 @@
+"""Tests for the pooled SQLite session service."""
+
+import pytest
+from unittest.mock import patch
+
+from google.adk.events import Event
+from google.adk.sessions import InMemorySessionService
+from google.genai import types
+
+from pension_planning_agent import sessions
+from pension_planning_agent.sessions import (
+    PooledSqliteSessionService,
+    create_session_service,
+)
+
+APP = "fire_pension_agent"
+
+
+@pytest.fixture
+async def service(tmp_path):
+    """Session service on a fresh database file"""
+    service = PooledSqliteSessionService(str(tmp_path / "sessions.db"), pool_size=2)
+    yield service
+    await service.close()
+
+
+def make_event(text: str, timestamp: float | None = None) -> Event:
+    """User event with a single text part."""
+    event = Event(
+        invocation_id="inv",
+        author="user",
+        content=types.Content(role="user", parts=[types.Part(text=text)]),
+    )
+    if timestamp is not None:
+        event.timestamp = timestamp
+    return event
+
+
+class TestPooledSqliteSessionService:
+    """Tests for persistence, pooling and eviction."""
+
+    @pytest.mark.asyncio
+    async def test_events_round_trip(self, service):
+        """Test that appended events are read back in order."""
+        session = await service.create_session(
+            app_name=APP, user_id="u", session_id="s"
+        )
+        for text in ("hej", "alder=52"):
+            await service.append_event(session, make_event(text))
+
+        stored = await service.get_session(app_name=APP, user_id="u", session_id="s")
+        assert [e.content.parts[0].text for e in stored.events] == ["hej", "alder=52"]
+
+    @pytest.mark.asyncio
+    async def test_sessions_survive_restart(self, tmp_path):
+        """Test that a new service instance resumes stored conversations."""
+        db_path = str(tmp_path / "sessions.db")
+        first = PooledSqliteSessionService(db_path)
+        session = await first.create_session(app_name=APP, user_id="u", session_id="s")
+        await first.append_event(session, make_event("hej"))
+        await first.close()
+
+        second = PooledSqliteSessionService(db_path)
+        stored = await second.get_session(app_name=APP, user_id="u", session_id="s")
+        await second.close()
+
+        assert len(stored.events) == 1
+
+    @pytest.mark.asyncio
+    async def test_connections_are_reused(self, service):
+        """Test that sequential operations share one pooled connection."""
+        with patch.object(
+            service, "_open_connection", wraps=service._open_connection
+        ) as open_connection:
+            for i in range(5):
+                await service.create_session(
+                    app_name=APP, user_id="u", session_id=f"{i}"
+                )
+
+        assert open_connection.call_count == 1
+
+    @pytest.mark.asyncio
+    async def test_wal_mode(self, service):
+        """Test that connections use write-ahead logging."""
+        async with service._get_db_connection() as db:
+            async with db.execute("PRAGMA journal_mode") as cursor:
+                assert (await cursor.fetchone())[0] == "wal"
+
+    @pytest.mark.asyncio
+    async def test_failed_transaction_is_rolled_back(self, service):
+        """Test that a connection is returned to the pool without open writes."""
+        with pytest.raises(RuntimeError):
+            async with service._get_db_connection() as db:
+                await db.execute(
+                    "INSERT INTO sessions VALUES (?, ?, ?, '{}', 0, 0)", (APP, "u", "x")
+                )
+                raise RuntimeError("boom")
+
+        assert (
+            await service.get_session(app_name=APP, user_id="u", session_id="x") is None
+        )
+
+    @pytest.mark.asyncio
+    async def test_evicts_idle_sessions_with_events(self, service):
+        """Test that sessions idle for too long are deleted with their events."""
+        old = await service.create_session(app_name=APP, user_id="u", session_id="old")
+        await service.append_event(old, make_event("hej", timestamp=1000.0))
+        new = await service.create_session(app_name=APP, user_id="u", session_id="new")
+        await service.append_event(new, make_event("hej", timestamp=9000.0))
+
+        service._max_idle = 5000.0
+        assert await service.evict_sessions(now=10000.0) == 1
+
+        remaining = await service.list_sessions(app_name=APP, user_id="u")
+        assert [s.id for s in remaining.sessions] == ["new"]
+        async with service._get_db_connection() as db:
+            rows = await db.execute_fetchall("SELECT session_id FROM events")
+        assert [row["session_id"] for row in rows] == ["new"]
+
+    @pytest.mark.asyncio
+    async def test_evicts_oldest_beyond_limit(self, service):
+        """Test that only the most recently used sessions are kept."""
+        for i in range(5):
+            session = await service.create_session(
+                app_name=APP, user_id="u", session_id=f"{i}"
+            )
+            await service.append_event(session, make_event("hej", timestamp=100.0 + i))
+
+        service._max_sessions = 2
+        assert await service.evict_sessions(now=200.0) == 3
+
+        remaining = await service.list_sessions(app_name=APP, user_id="u")
+        assert sorted(s.id for s in remaining.sessions) == ["3", "4"]
+
+
+class TestCreateSessionService:
+    """Tests for selecting the session backend from settings."""
+
+    def test_default_is_in_memory(self):
+        """Test that the in-memory service is used by default."""
+        with patch.object(sessions.settings, "SESSION_BACKEND", "memory"):
+            assert isinstance(create_session_service(), InMemorySessionService)
+
+    def test_sqlite_backend(self, tmp_path):
+        """Test that the SQLite service uses the configured path."""
+        db_path = str(tmp_path / "sessions.db")
+        with (
+            patch.object(sessions.settings, "SESSION_BACKEND", "sqlite"),
+            patch.object(sessions.settings, "SESSION_DB_PATH", db_path),
+        ):
+            service = create_session_service()
+
+        assert isinstance(service, PooledSqliteSessionService)
+        assert service._db_path == db_path
@@ -0,0 +1,107 @@
+"""Tests for the Monte Carlo simulation."""
+
+import numpy as np
+import pytest
+from unittest.mock import patch
+
+from pension_planning_agent import simulation
+from pension_planning_agent.engine import END_AGE
+from pension_planning_agent.simulation import fire_monte_carlo, simulate
+
+PAYLOAD = {
+    "manedslon": 75700.0,
+    "alder": 52,
+    "pensionInd_ar": 85000.0,
+    "skat_percentage": 0.33,
+    "forbrugsmal_md": 30000.0,
+    "frie_midler": 935000.0,
+    "holding_midler": 0.0,
+    "rate_and_liv": 4190000.0,
+    "folkepensionsalder": 70,
+    "fire_alder": 62,
+}
+
+
+class TestSimulate:
+    """Tests for path generation and percentile bands."""
+
+    def test_shapes_and_bounds(self):
+        """Test that bands cover every age and are ordered."""
+        result = simulate(PAYLOAD, paths=1000, seed=1)
+
+        assert result.ages[0] == PAYLOAD["alder"]
+        assert result.ages[-1] == END_AGE
+        assert len(result.p50) == len(result.ages)
+        assert 0.0 <= result.success_probability <= 1.0
+        assert np.all(np.array(result.p10) <= np.array(result.p50))
+        assert np.all(np.array(result.p50) <= np.array(result.p90))
+
+    def test_seed_is_reproducible(self):
+        """Test that the same seed gives the same result."""
+        first = simulate(PAYLOAD, paths=500, seed=7)
+        second = simulate(PAYLOAD, paths=500, seed=7)
+
+        assert first.p50 == second.p50
+        assert first.success_probability == second.success_probability
+
+    def test_chunk_size_does_not_change_result(self):
+        """Test that chunked generation gives the same paths as one chunk."""
+        chunked = simulate(PAYLOAD, paths=1000, seed=3, chunk_size=128)
+        single = simulate(PAYLOAD, paths=1000, seed=3, chunk_size=1000)
+
+        np.testing.assert_allclose(chunked.p10, single.p10)
+        assert chunked.success_probability == single.success_probability
+
+    def test_no_volatility_collapses_bands(self):
+        """Test that without uncertainty every path is identical."""
+        with (
+            patch.object(simulation.settings, "FIRE_MC_RETURN_STD", 0.0),
+            patch.object(simulation.settings, "FIRE_MC_INFLATION_STD", 0.0),
+        ):
+            result = simulate(PAYLOAD, paths=100)
+
+        np.testing.assert_allclose(result.p10, result.p90)
+        assert result.success_probability in (0.0, 1.0)
+
+    def test_ten_thousand_paths_within_budget(self):
+        """Test that a full-size simulation fits in a chat turn."""
+        result = simulate({**PAYLOAD, "alder": 25, "fire_alder": 60}, paths=10_000)
+        assert result.elapsed_ms < 1000
+
+
+class TestFireMonteCarloTool:
+    """Tests for the agent tool wrapper."""
+
+    @pytest.mark.asyncio
+    async def test_tool_output(self):
+        """Test that the tool reports probability and percentile rows."""
+        message = await fire_monte_carlo(
+            manedslon=75700.0,
+            alder=52,
+            pensionInd_ar=85000.0,
+            skat_percentage=33.0,
+            forbrugsmal_md=30000.0,
+            frie_midler=935000.0,
+            holding_midler=0.0,
+            rate_and_liv=4190000.0,
+            fire_alder=62,
+        )
+
+        assert "Probability that free funds last until age 95" in message
+        assert "| 95 |" in message
+
+    @pytest.mark.asyncio
+    async def test_invalid_input(self):
+        """Test that invalid input is reported."""
+        message = await fire_monte_carlo(
+            manedslon=75700.0,
+            alder=52,
+            pensionInd_ar=85000.0,
+            skat_percentage=33.0,
+            forbrugsmal_md=30000.0,
+            frie_midler=935000.0,
+            holding_midler=0.0,
+            rate_and_liv=4190000.0,
+            fire_alder=50,
+        )
+        assert "Invalid input parameters" in message
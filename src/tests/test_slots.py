@@ -0,0 +1,144 @@
+"""Tests for collecting the calculator inputs by slot filling."""
+
+import pytest
+from unittest.mock import AsyncMock, patch
+
+from benchmarks.fakes import SCRIPTED_INPUTS
+from pension_planning_agent import agent, slots
+from pension_planning_agent.slots import (
+    SLOT_QUESTIONS,
+    SLOTS_STATE_KEY,
+    ask_for_slots,
+    merge_slots,
+    run_slot_filling,
+)
+
+
+def pairs(*names: str, **overrides) -> str:
+    """`name=value` message for the scripted profile's `names`."""
+    values = {name: SCRIPTED_INPUTS[name] for name in names} | overrides
+    return ", ".join(f"{name}={value}" for name, value in values.items())
+
+
+async def new_session(session_id: str):
+    return await agent.get_session_service().create_session(
+        app_name=agent.APP_NAME, user_id="u", session_id=session_id
+    )
+
+
+async def get_session(session_id: str):
+    return await agent.get_session_service().get_session(
+        app_name=agent.APP_NAME, user_id="u", session_id=session_id
+    )
+
+
+@pytest.fixture(autouse=True)
+def slot_filling_enabled():
+    """Slot filling is opt-in"""
+    with patch.object(slots.settings, "SLOT_FILLING_ENABLED", True):
+        yield
+
+
+class TestSlots:
+    """Tests for merging extracted values and asking for the rest."""
+
+    def test_invalid_values_are_rejected(self):
+        """Test that values breaking a field constraint do not fill the slot."""
+        slots_, rejected = merge_slots({"alder": 52}, {"alder": 10, "manedslon": 75700})
+        assert slots_ == {"alder": 52, "manedslon": 75700}
+        assert rejected == ["alder"]
+
+    def test_only_missing_slots_are_asked_for(self):
+        """Test that the reply lists exactly the missing slots."""
+        reply = ask_for_slots(["frie_midler", "rate_and_liv"], [])
+        assert SLOT_QUESTIONS["frie_midler"] in reply
+        assert SLOT_QUESTIONS["rate_and_liv"] in reply
+        assert SLOT_QUESTIONS["alder"] not in reply
+
+
+class TestRunSlotFilling:
+    """Tests for the slot-filling pre-router."""
+
+    @pytest.mark.asyncio
+    async def test_profile_in_two_messages(self, fake_agent):
+        """Test that the plan is calculated once the slots are complete."""
+        await new_session("slots-two")
+        first = list(SCRIPTED_INPUTS)[:3]
+
+        ask = await run_slot_filling("u", "slots-two", pairs(*first))
+        reply = await run_slot_filling(
+            "u", "slots-two", pairs(*list(SCRIPTED_INPUTS)[3:])
+        )
+
+        assert all(SLOT_QUESTIONS[name] not in ask for name in first)
+        assert "Hvis du sparer" in reply
+        assert fake_agent.stats.extraction_requests == 2
+        assert fake_agent.stats.chat_requests == 2
+
+        session = await get_session("slots-two")
+        assert session.state[SLOTS_STATE_KEY] == SCRIPTED_INPUTS
+        calls = [
+            call for event in session.events for call in event.get_function_calls()
+        ]
+        assert [call.name for call in calls] == ["fire_calculator"]
+        # Follow-ups go to the agent once the plan is calculated
+        assert await run_slot_filling("u", "slots-two", "Tak") is None
+
+    @pytest.mark.asyncio
+    async def test_failed_calculation_is_retried(self, fake_agent):
+        """Test that a failed calculation does not end slot filling."""
+        await new_session("slots-failed")
+        failed = AsyncMock(return_value=("Request timed out.", None))
+        with patch.object(slots, "calculate_plan", failed):
+            reply = await run_slot_filling("u", "slots-failed", pairs(*SCRIPTED_INPUTS))
+
+        assert reply == "Request timed out."
+        session = await get_session("slots-failed")
+        assert session.state[SLOTS_STATE_KEY] == SCRIPTED_INPUTS
+        assert not any(event.get_function_calls() for event in session.events)
+        retry = await run_slot_filling("u", "slots-failed", pairs("fire_alder"))
+        assert "Hvis du sparer" in retry
+
+    @pytest.mark.asyncio
+    async def test_cross_field_error_asks_again(self, fake_agent):
+        """Test that a FIRE age below the current age is asked for again."""
+        await new_session("slots-invalid")
+
+        reply = await run_slot_filling(
+            "u", "slots-invalid", pairs(*SCRIPTED_INPUTS, fire_alder=40)
+        )
+
+        assert SLOT_QUESTIONS["fire_alder"] in reply
+        assert "FIRE age must be greater than current age" in reply
+        assert fake_agent.stats.execute_requests == 0
+        session = await get_session("slots-invalid")
+        assert "fire_alder" not in session.state[SLOTS_STATE_KEY]
+
+    @pytest.mark.asyncio
+    async def test_questions_go_to_the_agent(self, fake_agent):
+        """Test that questions are handed over without an extraction call."""
+        await new_session("slots-question")
+        assert (
+            await run_slot_filling("u", "slots-question", "Hvad er frie midler?")
+            is None
+        )
+        assert fake_agent.stats.chat_requests == 0
+
+    @pytest.mark.asyncio
+    async def test_message_without_inputs_goes_to_the_agent(self, fake_agent):
+        """Test that a greeting is answered by the agent, not a fixed list."""
+        await new_session("slots-greeting")
+
+        assert (
+            await run_slot_filling("u", "slots-greeting", "Jeg hedder Carina") is None
+        )
+        session = await get_session("slots-greeting")
+        assert fake_agent.stats.extraction_requests == 1
+        assert not session.events
+
+    @pytest.mark.asyncio
+    async def test_failed_extraction_goes_to_the_agent(self, fake_agent):
+        """Test that an extraction error hands the message over to the agent."""
+        await new_session("slots-error")
+        with patch.object(slots, "extract_slots", AsyncMock(side_effect=TimeoutError)):
+            assert await run_slot_filling("u", "slots-error", "Jeg er 52") is None
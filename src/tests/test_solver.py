@@ -0,0 +1,102 @@
+"""Tests for the goal-seek solver."""
+
+import pytest
+
+from benchmarks.fakes import SCRIPTED_INPUTS
+from pension_planning_agent.solver import fire_goal_seek, goal_seek
+
+pytestmark = pytest.mark.usefixtures("local_backend")
+
+
+class TestGoalSeek:
+    """Tests for the batched k-section search."""
+
+    @pytest.mark.asyncio
+    async def test_earliest_fire_age(self, local_result):
+        """Test that the earliest FIRE age is the first one with result >= 0."""
+        goal = await goal_seek(SCRIPTED_INPUTS, "fire_alder")
+
+        assert goal.converged
+        assert goal.increasing
+        assert local_result(fire_alder=goal.value) >= 0
+        assert local_result(fire_alder=goal.value - 1) < 0
+
+    @pytest.mark.asyncio
+    async def test_maximum_consumption(self, local_result):
+        """Test that the spending limit is found within the tolerance."""
+        goal = await goal_seek(SCRIPTED_INPUTS, "forbrugsmal_md", tolerance=10)
+
+        assert goal.converged
+        assert not goal.increasing
+        assert goal.result >= 0
+        assert local_result(forbrugsmal_md=goal.value + 10) < 0
+
+    @pytest.mark.asyncio
+    async def test_probes_are_batched_per_round(self):
+        """Test that more probes per round need fewer rounds."""
+        few = await goal_seek(SCRIPTED_INPUTS, "forbrugsmal_md", probes=1)
+        many = await goal_seek(SCRIPTED_INPUTS, "forbrugsmal_md", probes=16)
+
+        assert many.rounds < few.rounds
+        assert many.value == pytest.approx(few.value, abs=200)
+
+    @pytest.mark.asyncio
+    async def test_unreachable_goal(self):
+        """Test that no value is returned when the goal is out of range."""
+        goal = await goal_seek(SCRIPTED_INPUTS, "fire_alder", upper=55)
+
+        assert goal.value is None
+        assert goal.evaluations == 2
+
+    @pytest.mark.asyncio
+    async def test_empty_search_range(self):
+        """Test that no FIRE age is searched when none is after the current age."""
+        goal = await goal_seek(
+            {**SCRIPTED_INPUTS, "alder": 94, "fire_alder": 95}, "fire_alder"
+        )
+
+        assert goal.value is None
+        assert goal.evaluations == 0
+
+    @pytest.mark.asyncio
+    async def test_goal_already_reached(self):
+        """Test that the lower bound is returned when every value works."""
+        goal = await goal_seek(SCRIPTED_INPUTS, "fire_alder", lower=70, upper=80)
+
+        assert goal.value == 70
+        assert goal.result >= 0
+
+
+class TestFireGoalSeekTool:
+    """Tests for the agent tool wrapper."""
+
+    @pytest.mark.asyncio
+    async def test_reports_value_and_evaluations(self):
+        """Test that the tool message has the answer and evaluation stats."""
+        message = await fire_goal_seek(**SCRIPTED_INPUTS, solve_for="fire_alder")
+
+        assert "fire_alder must be at least" in message
+        assert "evaluations in" in message
+        assert " ms)" in message
+
+    @pytest.mark.asyncio
+    async def test_no_feasible_fire_age(self):
+        """Test that an empty FIRE age range gets a clear message."""
+        message = await fire_goal_seek(
+            **{**SCRIPTED_INPUTS, "alder": 94, "fire_alder": 95}, solve_for="fire_alder"
+        )
+        assert "no feasible FIRE age" in message
+
+    @pytest.mark.asyncio
+    async def test_unsupported_field(self):
+        """Test that non-lever fields are rejected."""
+        message = await fire_goal_seek(**SCRIPTED_INPUTS, solve_for="skat_percentage")
+        assert "Cannot solve for 'skat_percentage'" in message
+
+    @pytest.mark.asyncio
+    async def test_invalid_input(self):
+        """Test that invalid plans are reported like fire_calculator does."""
+        message = await fire_goal_seek(
+            **{**SCRIPTED_INPUTS, "alder": 15}, solve_for="forbrugsmal_md"
+        )
+        assert "Invalid input parameters" in message
@@ -0,0 +1,105 @@
+"""Tests for streaming agent responses to the Streamlit UI."""
+
+import pytest
+from unittest.mock import patch
+
+from google.adk.agents.run_config import StreamingMode
+from google.genai import types
+
+from pension_planning_agent import streamlit as ui
+
+
+class FakeEvent:
+    """Minimal stand-in for an ADK event."""
+
+    def __init__(self, *texts, partial=False, thought=False):
+        self.partial = partial
+        self.content = types.Content(
+            role="model",
+            parts=[types.Part(text=text, thought=thought) for text in texts],
+        )
+
+
+class FakeRunner:
+    """Runner whose `run_async` replays events and records when it is closed."""
+
+    def __init__(self, events):
+        self.events = events
+        self.closed = False
+
+    def run_async(self, **kwargs):
+        self.kwargs = kwargs
+
+        async def generate():
+            try:
+                for event in self.events:
+                    yield event
+            finally:
+                self.closed = True
+
+        return generate()
+
+
+async def collect(runner, limit=None):
+    """Chunks yielded by `stream_agent_response`, stopping after `limit`."""
+    chunks = []
+    with patch.object(ui, "get_runner", return_value=runner):
+        stream = ui.stream_agent_response("user", "session", "Hej")
+        async for chunk in stream:
+            chunks.append(chunk)
+            if limit and len(chunks) == limit:
+                break
+        await stream.aclose()
+    return chunks
+
+
+class TestStreamAgentResponse:
+    """Tests for accumulating streamed agent events into text."""
+
+    @pytest.mark.asyncio
+    async def test_partial_events_accumulate(self):
+        """Test that deltas grow the text and the final event replaces them."""
+        runner = FakeRunner(
+            [
+                FakeEvent("Du kan ", partial=True),
+                FakeEvent("stoppe ved 60.", partial=True),
+                FakeEvent("Du kan stoppe ved 60."),
+            ]
+        )
+        chunks = await collect(runner)
+
+        assert chunks == ["Du kan ", "Du kan stoppe ved 60.", "Du kan stoppe ved 60."]
+        assert runner.kwargs["run_config"].streaming_mode == StreamingMode.SSE
+
+    @pytest.mark.asyncio
+    async def test_text_before_tool_call_is_kept(self):
+        """Test that text from an earlier model turn stays in front."""
+        runner = FakeRunner(
+            [
+                FakeEvent("Jeg regner. "),
+                FakeEvent(),
+                FakeEvent("Resultat", partial=True),
+            ]
+        )
+        chunks = await collect(runner)
+
+        assert chunks[-1] == "Jeg regner. Resultat"
+
+    @pytest.mark.asyncio
+    async def test_thoughts_are_hidden(self):
+        """Test that thought parts are not shown to the user."""
+        runner = FakeRunner(
+            [FakeEvent("hidden", partial=True, thought=True), FakeEvent("Svar")]
+        )
+        assert await collect(runner) == ["Svar"]
+
+    @pytest.mark.asyncio
+    async def test_early_stop_closes_the_agent_turn(self):
+        """Test that stopping the stream cancels the running agent turn."""
+        runner = FakeRunner(
+            [FakeEvent("a", partial=True), FakeEvent("b", partial=True)]
+        )
+        chunks = await collect(runner, limit=1)
+
+        assert chunks == ["a"]
+        assert runner.closed
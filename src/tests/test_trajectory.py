@@ -0,0 +1,103 @@
+"""Tests for answering follow-up questions from a plan's trajectory."""
+
+import pytest
+from unittest.mock import AsyncMock, Mock, patch
+
+from benchmarks.fakes import SCRIPTED_INPUTS
+from pension_planning_agent import agent, calculator, trajectory
+from pension_planning_agent.schemas import FireCalculatorInput
+from pension_planning_agent.trajectory import (
+    TRAJECTORY_STATE_KEY,
+    calculate_output,
+    calculate_trajectory,
+    fire_trajectory,
+    format_trajectory,
+)
+
+
+class TestTrajectoryTool:
+    """Tests for the trajectory tool."""
+
+    @pytest.mark.asyncio
+    async def test_table_from_state(self):
+        """Test that the tool answers from the trajectory in the session state."""
+        trajectory = await calculate_trajectory(FireCalculatorInput(**SCRIPTED_INPUTS))
+        context = Mock(state={TRAJECTORY_STATE_KEY: trajectory.to_columns()})
+
+        table = await fire_trajectory(from_age=60, to_age=70, tool_context=context)
+
+        ages = [line.split(" | ")[0] for line in table.splitlines()[2:]]
+        assert ages == ["| 60", "| 65", "| 70"]
+        assert f"{trajectory.at(65)['pension']:,.0f}" in table
+
+    @pytest.mark.asyncio
+    async def test_no_plan_yet(self):
+        """Test that the tool asks for a calculation first."""
+        assert "fire_calculator" in await fire_trajectory(tool_context=Mock(state={}))
+
+    @pytest.mark.asyncio
+    async def test_last_age_always_shown(self):
+        """Test that the table ends at the requested last age."""
+        trajectory = await calculate_trajectory(FireCalculatorInput(**SCRIPTED_INPUTS))
+        table = format_trajectory(trajectory, step=10)
+        assert table.splitlines()[-1].startswith("| 95 |")
+
+    @pytest.mark.asyncio
+    async def test_local_output_is_one_computation(self, local_backend):
+        """Test that local totals and trajectory come from one engine call."""
+        spy = Mock(wraps=calculator.engine.project_batch)
+        with patch.object(calculator.engine, "project_batch", spy):
+            output = await calculate_output(FireCalculatorInput(**SCRIPTED_INPUTS))
+
+        spy.assert_called_once()
+        assert output.engine == "local"
+        assert float(
+            output.trajectory.free_funds[-1] + output.trajectory.holding[-1]
+        ) == pytest.approx(output.result)
+
+    @pytest.mark.asyncio
+    async def test_remote_output_has_no_trajectory(self):
+        """Test that a remote result is not paired with a local trajectory."""
+        remote = AsyncMock(return_value={"opsparing_ar": 1.0, "result": 2.0})
+        with (
+            patch.object(calculator.settings, "FIRE_BACKEND", "remote"),
+            patch.object(calculator, "fetch_remote_projection", remote),
+        ):
+            output = await calculate_output(FireCalculatorInput(**SCRIPTED_INPUTS))
+
+        assert output.engine == "remote"
+        assert output.result == 2.0
+        assert output.trajectory is None
+
+    @pytest.mark.asyncio
+    async def test_tool_without_trajectory(self):
+        """Test that a plan answered by the API is not served a trajectory."""
+        context = Mock(state={TRAJECTORY_STATE_KEY: None})
+        assert "age 95" in await fire_trajectory(tool_context=context)
+
+    @pytest.mark.asyncio
+    async def test_calculator_stores_trajectory_of_its_projection(self, local_backend):
+        """Test that fire_calculator does not project the plan a second time."""
+        context = Mock(state={})
+        with patch.object(trajectory.engine, "trajectory") as local_trajectory:
+            await agent.fire_calculator(**SCRIPTED_INPUTS, tool_context=context)
+
+        local_trajectory.assert_not_called()
+        assert context.state[TRAJECTORY_STATE_KEY]["age"][0] == SCRIPTED_INPUTS["alder"]
+
+    @pytest.mark.asyncio
+    async def test_agent_turn_stores_trajectory(self, fake_agent, local_backend):
+        """Test that fire_calculator stores the trajectory in the session."""
+        from benchmarks import e2e
+
+        await agent.get_session_service().create_session(
+            app_name=agent.APP_NAME, user_id="u", session_id="trajectory"
+        )
+        await e2e.run_turn("u", "trajectory", "Jeg hedder Carina")
+
+        session = await agent.get_session_service().get_session(
+            app_name=agent.APP_NAME, user_id="u", session_id="trajectory"
+        )
+        columns = session.state[TRAJECTORY_STATE_KEY]
+        assert columns["age"][0] == SCRIPTED_INPUTS["alder"]
+        assert len(columns["free_funds"]) == 95 - SCRIPTED_INPUTS["alder"] + 1
@@ -0,0 +1,92 @@
+"""Tests for what-if scenarios computed without the agent."""
+
+import pytest
+
+from google.adk.events import Event
+from google.genai import types
+
+from benchmarks.fakes import SCRIPTED_INPUTS
+from pension_planning_agent import calculator, what_if
+from pension_planning_agent.fast_path import parse_structured_input
+from pension_planning_agent.routing import QUESTION_PATTERN
+from pension_planning_agent.schemas import FireCalculatorInput
+from pension_planning_agent.what_if import (
+    format_scenario_prompt,
+    last_calculator_input,
+    project_what_if,
+    slider_range,
+)
+
+BASE = FireCalculatorInput(**SCRIPTED_INPUTS)
+
+
+def call_event(**args) -> Event:
+    part = types.Part.from_function_call(name="fire_calculator", args=args)
+    return Event(
+        invocation_id="e-1",
+        author="fire_pension_agent",
+        content=types.Content(role="model", parts=[part]),
+    )
+
+
+def text_event(text: str, invocation_id: str = "e-1") -> Event:
+    return Event(
+        invocation_id=invocation_id,
+        author="user",
+        content=types.Content(role="user", parts=[types.Part(text=text)]),
+    )
+
+
+class TestLastCalculatorInput:
+    """Tests for finding the input the panel starts from."""
+
+    def test_latest_valid_call(self):
+        """Test that the latest call that validates is used."""
+        events = [
+            call_event(**SCRIPTED_INPUTS),
+            text_event("Hvad hvis jeg stopper ved 60?"),
+            call_event(**{**SCRIPTED_INPUTS, "fire_alder": 60}),
+            call_event(**{**SCRIPTED_INPUTS, "fire_alder": 40}),
+        ]
+        assert last_calculator_input(events).fire_alder == 60
+
+    def test_fast_path_message(self):
+        """Test that structured input answered by the fast path counts."""
+        message = ", ".join(f"{key}={value}" for key, value in SCRIPTED_INPUTS.items())
+        events = [text_event("Hej"), text_event(message, invocation_id="fast-1")]
+        assert last_calculator_input(events) == BASE
+
+    def test_no_calculation(self):
+        """Test that a session without a calculation has no input."""
+        assert last_calculator_input([text_event("Hej")]) is None
+
+
+class TestWhatIf:
+    """Tests for projecting and handing over what-if scenarios."""
+
+    def test_slider_range_includes_value(self):
+        """Test that a value outside the default range widens the slider."""
+        assert slider_range("manedslon", 400_000)["max_value"] == 400_000
+        assert slider_range("fire_alder", 62)["min_value"] == 19
+
+    @pytest.mark.asyncio
+    async def test_project_what_if(self, local_backend):
+        """Test that the scenario, its base and nearby FIRE ages are projected."""
+        scenario = BASE.model_copy(update={"fire_alder": 55})
+        projection = await project_what_if(scenario, BASE)
+        expected = await calculator.calculate_projection(scenario)
+
+        assert projection["scenario"]["result"] == pytest.approx(expected["result"])
+        ages = [row["fire_alder"] for row in projection["sweep"]]
+        assert ages == list(range(53, 55 + what_if.settings.WHATIF_SWEEP_YEARS + 1))
+
+    def test_scenario_prompt_goes_to_the_agent(self):
+        """Test that the prompt lists the changes and is not a shortcut input."""
+        scenario = BASE.model_copy(update={"fire_alder": 60})
+        prompt = format_scenario_prompt(scenario, BASE)
+
+        assert "FIRE-alder: 62 → 60" in prompt
+        assert "rate_and_liv=4190000" in prompt
+        assert "Frie midler" not in prompt
+        assert parse_structured_input(prompt) is None
+        assert QUESTION_PATTERN.search(prompt)